@@ -0,0 +1,3 @@
+"""
+API 基准测试套件（SQLite 替代 MySQL，可按规模造数），用法见 benchmarks/runner.py
+"""
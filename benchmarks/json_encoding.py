@@ -0,0 +1,85 @@
+"""
+JSON 编码微基准
+
+    python -m benchmarks.json_encoding --sizes 100 1000 --repeat 20
+
+用 flask seed 的数据生成器造出船员列表，比较：
+- flask jsonify：Flask 默认 provider（标准库、ASCII 转义），即切换前 success() 的路径
+- stdlib / orjson：json_codec 的两种实现单独编码
+- success() stdlib / orjson：在请求上下文中调用 success()（字节信封 + Response 构造）
+输出每种方式的中位耗时、响应体大小与相对 flask jsonify 的加速比
+"""
+import argparse
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+from flask import Flask, jsonify
+
+
+def crew_payload(size: int, seed: int = 42) -> list:
+    from onepiece.models import CrewMember
+    from onepiece.services.seed_service import SyntheticData
+
+    data = SyntheticData(seed)
+    items = []
+    for i in range(size):
+        row = SimpleNamespace(id=i + 1, pirate_group_id=i // 100 + 1, **data.crew(is_captain=i % 100 == 0))
+        items.append(CrewMember.serialize(row, f'海贼团{i // 100 + 1}'))
+    return items
+
+
+def _median_us(fn, repeat: int) -> float:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1e6
+
+
+def measure(size: int, repeat: int) -> list:
+    from onepiece.app import create_app
+    from onepiece.utils.json_provider import orjson, orjson_dumps, stdlib_dumps
+    from onepiece.utils.response import success
+
+    items = crew_payload(size)
+    body = {'success': True, 'data': items, 'next_cursor': 'abc'}
+    results = []
+
+    baseline_app = Flask('baseline')
+    with baseline_app.test_request_context():
+        results.append(('flask jsonify', _median_us(lambda: jsonify(body).get_data(), repeat),
+                        len(jsonify(body).get_data())))
+
+    results.append(('stdlib', _median_us(lambda: stdlib_dumps(body), repeat), len(stdlib_dumps(body)) + 1))
+    if orjson is not None:
+        results.append(('orjson', _median_us(lambda: orjson_dumps(body), repeat), len(orjson_dumps(body)) + 1))
+
+    for provider in ('stdlib', 'orjson') if orjson is not None else ('stdlib',):
+        app = create_app({'JSON_PROVIDER': provider, 'LOG_LEVEL': 'WARNING'})
+        with app.test_request_context():
+            elapsed = _median_us(lambda: success(data=items, next_cursor='abc').get_data(), repeat)
+            results.append((f'success() {provider}', elapsed, len(success(data=items, next_cursor='abc').get_data())))
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.json_encoding', description='JSON 编码微基准')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000], help='船员列表长度')
+    parser.add_argument('--repeat', type=int, default=20, help='每种方式的重复次数')
+    args = parser.parse_args(argv)
+
+    print(f'{"items":>7}  {"encoder":<20}{"median":>12}{"bytes":>12}{"speedup":>10}')
+    for size in args.sizes:
+        results = measure(size, args.repeat)
+        baseline = results[0][1]
+        for name, elapsed, length in results:
+            print(f'{size:>7}  {name:<20}{elapsed:>10.0f}us{length:>12}{baseline / elapsed:>9.1f}x')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
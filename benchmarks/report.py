@@ -0,0 +1,85 @@
+"""
+基准报告 - 延迟分位数统计、JSON 报告读写、与基线对比
+"""
+import json
+import math
+from typing import List
+
+# 与基线对比时，p95 变慢超过该比例视为回归
+DEFAULT_TOLERANCE = 0.25
+# 绝对差值低于该值（毫秒）不判定回归，避免亚毫秒级接口的抖动误报
+NOISE_FLOOR_MS = 1.0
+# 并发模式受线程调度与 GIL 影响波动更大，阈值按该倍数放宽
+CONCURRENT_TOLERANCE_FACTOR = 2.0
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """最近秩法分位数，sorted_values 需已升序排列"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int, wall: float) -> dict:
+    """latencies / wall 单位为秒，输出毫秒与每秒请求数"""
+    values = sorted(latencies)
+    ms = [v * 1000 for v in values]
+    count = len(values)
+    return {
+        'requests': count,
+        'errors': errors,
+        'p50_ms': round(percentile(ms, 50), 3),
+        'p95_ms': round(percentile(ms, 95), 3),
+        'p99_ms': round(percentile(ms, 99), 3),
+        'max_ms': round(ms[-1], 3) if ms else 0.0,
+        'mean_ms': round(sum(ms) / count, 3) if count else 0.0,
+        'rps': round(count / wall, 1) if wall else 0.0
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE,
+            noise_floor_ms: float = NOISE_FLOOR_MS) -> List[str]:
+    """
+    与基线报告逐场景对比 p95、并发吞吐量与错误数
+
+    Returns:
+        List[str]: 回归描述，空列表表示没有回归
+    """
+    regressions = []
+    for mode, results in current['results'].items():
+        base_results = baseline.get('results', {}).get(mode, {})
+        for name, stats in results.items():
+            base = base_results.get(name)
+            if base is None:
+                continue
+            limit = tolerance * CONCURRENT_TOLERANCE_FACTOR if mode == 'concurrent' else tolerance
+            p95, base_p95 = stats['p95_ms'], base['p95_ms']
+            if p95 > base_p95 * (1 + limit) and p95 - base_p95 > noise_floor_ms:
+                regressions.append(f'[{mode}] {name}: p95 {base_p95}ms -> {p95}ms')
+            # 单线程模式的吞吐只是平均延迟的倒数，只在并发模式下比较
+            if mode == 'concurrent' and stats['rps'] < base['rps'] / (1 + limit):
+                regressions.append(f'[{mode}] {name}: 吞吐 {base["rps"]}/s -> {stats["rps"]}/s')
+            if stats['errors'] > base['errors']:
+                regressions.append(f'[{mode}] {name}: 错误 {base["errors"]} -> {stats["errors"]}')
+    return regressions
+
+
+def write_report(path: str, report: dict):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def load_report(path: str) -> dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def format_table(results: dict) -> str:
+    """终端输出用的对齐表格"""
+    header = f'{"scenario":<36}{"n":>6}{"err":>5}{"p50":>9}{"p95":>9}{"p99":>9}{"rps":>9}'
+    lines = [header, '-' * len(header)]
+    for name, s in results.items():
+        lines.append(f'{name:<36}{s["requests"]:>6}{s["errors"]:>5}'
+                     f'{s["p50_ms"]:>9.2f}{s["p95_ms"]:>9.2f}{s["p99_ms"]:>9.2f}{s["rps"]:>9.1f}')
+    return '\n'.join(lines)
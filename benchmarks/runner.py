@@ -0,0 +1,302 @@
+"""
+基准测试入口
+
+    python -m benchmarks --scale 10000 --requests 200 --concurrency 8
+    python -m benchmarks --scale 10000 --baseline benchmarks/results/baseline-10000.json
+
+使用本地 SQLite 文件代替 MySQL：按规模造数后缓存为只读模板，每次运行复制一份再测，
+写场景不会污染后续运行的数据；进程内通过 Flask test client 发起请求：
+- single：单线程逐个请求，衡量单请求延迟
+- concurrent：多线程各自持有 client 并发请求，衡量吞吐与排队后的延迟
+
+--asgi 改测 ASGI 应用（onepiece.asgi，aiosqlite 驱动）：所有线程的请求提交到同一个事件循环，
+与 Flask 应用对比同一数据、同一场景下的并发表现
+"""
+import argparse
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from benchmarks.report import (
+    DEFAULT_TOLERANCE, compare, format_table, load_report, summarize, write_report
+)
+from benchmarks.scenarios import BenchContext, build_scenarios, check_coverage
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='API 基准测试')
+    parser.add_argument('--scale', type=int, default=1000, help='船员数量（10^2 ~ 10^6）')
+    parser.add_argument('--requests', type=int, default=200, help='每个场景的请求数')
+    parser.add_argument('--warmup', type=int, default=10, help='每个场景正式计时前的预热请求数')
+    parser.add_argument('--concurrency', type=int, default=8, help='并发模式的线程数')
+    parser.add_argument('--mode', choices=['single', 'concurrent', 'both'], default='both')
+    parser.add_argument('--only', help='只运行名称包含该字符串的场景')
+    parser.add_argument('--no-cache', action='store_true', help='关闭 Service 读缓存')
+    parser.add_argument('--db', help='SQLite 文件路径，默认 benchmarks/.data/bench-<scale>.db')
+    parser.add_argument('--fresh', action='store_true', help='删除已有数据库重新造数')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--output', help='JSON 报告路径，默认 benchmarks/results/<时间>-<scale>.json')
+    parser.add_argument('--baseline', help='与该基线报告对比，发现回归时退出码为 1')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='回归判定的相对阈值')
+    parser.add_argument('--asgi', action='store_true', help='测试 ASGI 应用（需安装 .[asgi]）')
+    return parser.parse_args(argv)
+
+
+def bench_config(db_path: str, use_cache: bool) -> dict:
+    return {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        # SQLite 写锁等待时间放宽，避免并发写场景直接报 database is locked
+        'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'timeout': 30}},
+        'CACHE_BACKEND': 'memory' if use_cache else 'none',
+        # 登录场景测量哈希本身的吞吐，不让有界队列拒绝并发请求
+        'PASSWORD_HASH_MAX_PENDING': 64,
+        'LOG_LEVEL': 'WARNING'
+    }
+
+
+def create_bench_app(db_path: str, use_cache: bool):
+    from onepiece.app import create_app
+
+    return create_app(bench_config(db_path, use_cache))
+
+
+class AsgiResponse:
+    """httpx 响应 -> Flask 测试响应的接口"""
+
+    def __init__(self, response):
+        self._response = response
+        self.status_code = response.status_code
+
+    def get_json(self):
+        return self._response.json()
+
+    def get_data(self):
+        return self._response.content
+
+    def close(self):
+        self._response.close()
+
+
+class AsgiClient:
+    """与 Flask test client 相同的 open/get/post 接口，请求经共享的 TestClient 提交到事件循环"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def open(self, path, method='GET', **kwargs):
+        return AsgiResponse(self._client.request(method, path, **kwargs))
+
+    def get(self, path, **kwargs):
+        return self.open(path, 'GET', **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.open(path, 'POST', **kwargs)
+
+
+class AsgiBenchApp:
+    """ASGI 应用的基准封装：test_client / app_context 与 Flask 应用用法一致"""
+
+    def __init__(self, db_path: str, use_cache: bool):
+        from starlette.testclient import TestClient
+
+        from onepiece.asgi import create_asgi_app
+
+        app = create_asgi_app(bench_config(db_path, use_cache))
+        self.flask_app = app.state.flask_app
+        self.routes = app.routes
+        # 进入上下文后所有请求共用一个事件循环（并执行 lifespan）
+        self._client = TestClient(app)
+        self._client.__enter__()
+
+    def test_client(self):
+        return AsgiClient(self._client)
+
+    def app_context(self):
+        return self.flask_app.app_context()
+
+    def close(self):
+        self._client.__exit__(None, None, None)
+
+
+def prepare_template(db_path: str, scale: int, seed: int):
+    """建表、写入默认数据并用 SeedService 补足到目标规模，结果作为后续运行复制的模板"""
+    from onepiece.models import CrewMember, db
+    from onepiece.models.database import init_db
+    from onepiece.services import SeedService
+
+    app = create_bench_app(db_path, use_cache=False)
+    with app.app_context():
+        init_db()
+        missing = scale - CrewMember.query.count()
+        if missing > 0:
+            started = time.perf_counter()
+            groups = max(missing // 100, 1)
+            _, _, message = SeedService(batch_size=10000).seed(groups, missing // groups, seed)
+            print(f'{message}, 耗时 {time.perf_counter() - started:.1f}s')
+        db.session.remove()
+        db.engine.dispose()
+
+
+def data_bounds(app):
+    from onepiece.models import db, CrewMember, PirateGroup
+
+    with app.app_context():
+        db.session.execute(db.text('PRAGMA journal_mode=WAL'))
+        crew_max_id = db.session.query(db.func.max(CrewMember.id)).scalar()
+        group_max_id = db.session.query(db.func.max(PirateGroup.id)).scalar()
+    return crew_max_id, group_max_id
+
+
+def _timed_request(client, scenario, ctx, rng):
+    path, kwargs = scenario.build(ctx, rng)
+    start = time.perf_counter()
+    rv = client.open(path, method=scenario.method, **kwargs)
+    rv.get_data()
+    elapsed = time.perf_counter() - start
+    ok = rv.status_code in scenario.expect
+    rv.close()
+    return elapsed, ok
+
+
+def run_single(app, scenario, ctx, count: int, warmup: int, seed: int) -> dict:
+    if scenario.prepare:
+        scenario.prepare(ctx, count + warmup)
+    client, rng = app.test_client(), random.Random(seed)
+    for _ in range(warmup):
+        _timed_request(client, scenario, ctx, rng)
+
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for _ in range(count):
+        elapsed, ok = _timed_request(client, scenario, ctx, rng)
+        latencies.append(elapsed)
+        errors += not ok
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def run_concurrent(app, scenario, ctx, count: int, workers: int, seed: int) -> dict:
+    per_worker = max(count // workers, 1)
+    if scenario.prepare:
+        scenario.prepare(ctx, per_worker * workers)
+
+    def worker(index):
+        client, rng = app.test_client(), random.Random(seed + index)
+        results = [_timed_request(client, scenario, ctx, rng) for _ in range(per_worker)]
+        return results
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        batches = list(pool.map(worker, range(workers)))
+    wall = time.perf_counter() - started
+
+    results = [r for batch in batches for r in batch]
+    return summarize([r[0] for r in results], sum(not r[1] for r in results), wall)
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                         cwd=BENCH_DIR, stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'commit': commit
+    }
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    data_dir = os.path.join(BENCH_DIR, '.data')
+    db_path = os.path.abspath(args.db or os.path.join(data_dir, f'bench-{args.scale}.db'))
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    if args.fresh and os.path.exists(db_path):
+        os.remove(db_path)
+
+    prepare_template(db_path, args.scale, args.seed)
+    workdir = tempfile.mkdtemp(prefix='onepiece-bench-')
+    try:
+        work_db = os.path.join(workdir, 'bench.db')
+        shutil.copyfile(db_path, work_db)
+        if not args.asgi:
+            return run(args, create_bench_app(work_db, use_cache=not args.no_cache))
+        app = AsgiBenchApp(work_db, use_cache=not args.no_cache)
+        try:
+            return run(args, app)
+        finally:
+            app.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run(args, app) -> int:
+    crew_max_id, group_max_id = data_bounds(app)
+
+    scenarios = build_scenarios()
+    missing = check_coverage(app, scenarios)
+    if missing:
+        print(f'以下端点缺少基准场景: {", ".join(missing)}', file=sys.stderr)
+        return 2
+    if args.only:
+        scenarios = [s for s in scenarios if args.only in s.name]
+
+    ctx = BenchContext(app.test_client(), crew_max_id, group_max_id)
+    ctx.login()
+
+    modes = ['single', 'concurrent'] if args.mode == 'both' else [args.mode]
+    results = {mode: {} for mode in modes}
+    for scenario in scenarios:
+        count = min(args.requests, scenario.max_requests or args.requests)
+        if 'single' in modes:
+            results['single'][scenario.name] = run_single(app, scenario, ctx, count, args.warmup, args.seed)
+        if 'concurrent' in modes:
+            results['concurrent'][scenario.name] = run_concurrent(
+                app, scenario, ctx, count, args.concurrency, args.seed)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'scale': args.scale,
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'cache': not args.no_cache,
+            'server': 'asgi' if args.asgi else 'wsgi',
+            'crew_max_id': crew_max_id,
+            'group_max_id': group_max_id,
+            'environment': environment()
+        },
+        'results': results
+    }
+
+    output = args.output or os.path.join(
+        BENCH_DIR, 'results', f'{datetime.now():%Y%m%d-%H%M%S}-{args.scale}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    write_report(output, report)
+
+    for mode in modes:
+        print(f'\n== {mode} ==')
+        print(format_table(results[mode]))
+    print(f'\n报告已写入 {output}')
+
+    if args.baseline:
+        regressions = compare(report, load_report(args.baseline), args.tolerance)
+        if regressions:
+            print('\n发现性能回归:')
+            for line in regressions:
+                print(f'  {line}')
+            return 1
+        print('与基线相比未发现回归')
+    return 0
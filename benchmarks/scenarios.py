@@ -0,0 +1,193 @@
+"""
+基准场景 - 覆盖 crew / pirate_group / index / common 蓝图的每一个路由
+
+每个场景描述一种请求：build(ctx, rng) 返回 (路径, test_client 参数)。
+会消耗数据的场景（删除）通过 prepare 预先创建好足够的数据，不计入耗时。
+"""
+import uuid
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 被基准覆盖的蓝图，check_coverage 会确认其中每个端点至少有一个场景
+BLUEPRINTS = ('crew', 'pirate_group', 'index', 'common')
+
+SEARCH_KEYWORDS = ['路飞', '海贼', '剑士', '船长', '果实', '红发', '罗', '航海士']
+SORTS = ['id', '-id', 'name', '-bounty', '-created_at']
+# 批量接口每次请求的条数
+BULK_SIZE = 100
+
+
+class BenchContext:
+    """场景共享的状态：数据规模、可用 id、登录 token、待删除的 id 池"""
+
+    def __init__(self, client, crew_max_id: int, group_max_id: int):
+        self.client = client
+        self.crew_max_id = crew_max_id
+        self.group_max_id = group_max_id
+        self.token = None
+        self.spare_crew = deque()
+        self.spare_groups = deque()
+        self.spare_tokens = deque()
+
+    def login(self):
+        rv = self.client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+        self.token = rv.get_json()['data']['token']
+
+    def create_spare_tokens(self, count: int):
+        """登录拿到待注销的 token"""
+        for _ in range(count):
+            rv = self.client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+            self.spare_tokens.append(rv.get_json()['data']['token'])
+
+    def crew_id(self, rng) -> int:
+        return rng.randint(1, self.crew_max_id)
+
+    def group_id(self, rng) -> int:
+        return rng.randint(1, self.group_max_id)
+
+    def create_spare_crew(self, count: int):
+        """通过批量接口创建待删除的船员"""
+        for start in range(0, count, 1000):
+            items = [_crew_payload(f'待删除船员-{uuid.uuid4().hex[:12]}', None)
+                     for _ in range(min(1000, count - start))]
+            results = self.client.post('/api/crew/bulk', json=items).get_json()['data']['results']
+            self.spare_crew.extend(r['id'] for r in results if r['success'])
+
+    def create_spare_groups(self, count: int):
+        """通过批量接口创建没有船员、可直接删除的海贼团"""
+        for start in range(0, count, 1000):
+            items = [_group_payload(f'待删除海贼团-{uuid.uuid4().hex[:12]}')
+                     for _ in range(min(1000, count - start))]
+            results = self.client.post('/api/pirate-groups/bulk', json=items).get_json()['data']['results']
+            self.spare_groups.extend(r['id'] for r in results if r['success'])
+
+
+class Scenario:
+    def __init__(self, name: str, endpoint: str, method: str,
+                 build: Callable[[BenchContext, object], Tuple[str, dict]],
+                 expect: Tuple[int, ...] = (200,), max_requests: Optional[int] = None,
+                 prepare: Callable[[BenchContext, int], None] = None):
+        self.name = name
+        self.endpoint = endpoint
+        self.method = method
+        self.build = build
+        self.expect = expect
+        self.max_requests = max_requests
+        self.prepare = prepare
+
+
+def _crew_payload(name: str, group_id: Optional[int]) -> dict:
+    return {
+        'name': name, 'role': '船员', 'bounty': '1000万贝里', 'pirate_group_id': group_id,
+        'description': '基准测试数据', 'haki_types': '见闻色'
+    }
+
+
+def _group_payload(name: str) -> dict:
+    return {'name': name, 'captain': '基准船长', 'total_bounty': '1亿贝里', 'origin': '东海'}
+
+
+def _unique(prefix: str) -> str:
+    return f'{prefix}-{uuid.uuid4().hex[:12]}'
+
+
+def build_scenarios() -> List[Scenario]:
+    return [
+        # common
+        Scenario('common.ping', 'common.ping', 'GET', lambda ctx, rng: ('/api/common/ping', {})),
+        Scenario('common.version', 'common.version', 'GET', lambda ctx, rng: ('/api/common/version', {})),
+        Scenario('common.cache_stats', 'common.cache_stats', 'GET', lambda ctx, rng: ('/api/common/cache-stats', {})),
+        Scenario('common.pool_stats', 'common.pool_stats', 'GET', lambda ctx, rng: ('/api/common/pool-stats', {})),
+        Scenario('common.metrics', 'common.metrics_text', 'GET', lambda ctx, rng: ('/api/common/metrics', {})),
+
+        # index（认证）
+        Scenario('auth.login', 'index.login', 'POST', lambda ctx, rng: (
+            '/api/auth/login', {'json': {'username': 'admin', 'password': 'admin123'}})),
+        Scenario('auth.verify', 'index.verify', 'GET', lambda ctx, rng: (
+            '/api/auth/verify', {'headers': {'Authorization': ctx.token}})),
+        Scenario('auth.logout', 'index.logout', 'POST', lambda ctx, rng: (
+            '/api/auth/logout', {'headers': {'Authorization': ctx.spare_tokens.pop()}}),
+            max_requests=50, prepare=lambda ctx, n: ctx.create_spare_tokens(n)),
+
+        # crew 读
+        Scenario('crew.get_all', 'crew.get_all', 'GET', lambda ctx, rng: ('/api/crew', {})),
+        Scenario('crew.get_all.sorted_page', 'crew.get_all', 'GET', lambda ctx, rng: (
+            f'/api/crew?sort={rng.choice(SORTS)}&limit={rng.choice([20, 50, 100])}', {})),
+        Scenario('crew.get_all.by_group', 'crew.get_all', 'GET', lambda ctx, rng: (
+            f'/api/crew?pirate_group_id={ctx.group_id(rng)}', {})),
+        Scenario('crew.get_all.bounty_range', 'crew.get_all', 'GET', lambda ctx, rng: (
+            f'/api/crew?min_bounty={rng.randint(0, 10 ** 9)}&sort=-bounty', {})),
+        Scenario('crew.get_one', 'crew.get_one', 'GET', lambda ctx, rng: (
+            f'/api/crew/{ctx.crew_id(rng)}', {})),
+        Scenario('crew.search', 'crew.search', 'GET', lambda ctx, rng: (
+            f'/api/crew/search?q={rng.choice(SEARCH_KEYWORDS)}', {})),
+        Scenario('crew.export', 'crew.export', 'GET', lambda ctx, rng: (
+            f'/api/crew/export?pirate_group_id={ctx.group_id(rng)}&format={rng.choice(["ndjson", "csv"])}', {}),
+            max_requests=50),
+
+        # crew 写
+        Scenario('crew.create', 'crew.create', 'POST', lambda ctx, rng: (
+            '/api/crew', {'json': _crew_payload(_unique('基准船员'), ctx.group_id(rng))}), expect=(201,)),
+        Scenario('crew.update', 'crew.update', 'PUT', lambda ctx, rng: (
+            f'/api/crew/{ctx.crew_id(rng)}', {'json': {'description': _unique('更新')}})),
+        Scenario('crew.delete', 'crew.delete', 'DELETE', lambda ctx, rng: (
+            f'/api/crew/{ctx.spare_crew.pop()}', {}),
+            prepare=lambda ctx, n: ctx.create_spare_crew(n)),
+        Scenario('crew.bulk_create', 'crew.bulk_create', 'POST', lambda ctx, rng: (
+            '/api/crew/bulk', {'json': [_crew_payload(_unique('批量船员'), ctx.group_id(rng))
+                                        for _ in range(BULK_SIZE)]}), max_requests=50),
+        Scenario('crew.bulk_update', 'crew.bulk_update', 'PUT', lambda ctx, rng: (
+            '/api/crew/bulk', {'json': [{'id': ctx.crew_id(rng), 'role': rng.choice(['船员', '战斗员'])}
+                                        for _ in range(BULK_SIZE)]}), max_requests=50),
+        Scenario('crew.bulk_delete', 'crew.bulk_delete', 'DELETE', lambda ctx, rng: (
+            '/api/crew/bulk', {'json': [ctx.spare_crew.pop() for _ in range(BULK_SIZE)]}),
+            max_requests=50, prepare=lambda ctx, n: ctx.create_spare_crew(n * BULK_SIZE)),
+
+        # pirate_group 读
+        Scenario('pirate_group.get_all', 'pirate_group.get_all', 'GET', lambda ctx, rng: ('/api/pirate-groups', {})),
+        Scenario('pirate_group.get_all.sorted_page', 'pirate_group.get_all', 'GET', lambda ctx, rng: (
+            f'/api/pirate-groups?sort={rng.choice(["id", "-id", "name"])}&limit=100', {})),
+        Scenario('pirate_group.get_one', 'pirate_group.get_one', 'GET', lambda ctx, rng: (
+            f'/api/pirate-groups/{ctx.group_id(rng)}', {})),
+        Scenario('pirate_group.get_one.with_members', 'pirate_group.get_one', 'GET', lambda ctx, rng: (
+            f'/api/pirate-groups/{ctx.group_id(rng)}?include_members=true', {})),
+        Scenario('pirate_group.get_members', 'pirate_group.get_members', 'GET', lambda ctx, rng: (
+            f'/api/pirate-groups/{ctx.group_id(rng)}/members', {})),
+        Scenario('pirate_group.bounty_totals', 'pirate_group.bounty_totals', 'GET', lambda ctx, rng: (
+            '/api/pirate-groups/bounty-totals', {}), max_requests=50),
+        Scenario('pirate_group.search', 'pirate_group.search', 'GET', lambda ctx, rng: (
+            f'/api/pirate-groups/search?q={rng.choice(SEARCH_KEYWORDS)}', {})),
+        Scenario('pirate_group.export', 'pirate_group.export', 'GET', lambda ctx, rng: (
+            f'/api/pirate-groups/export?format={rng.choice(["ndjson", "csv"])}', {}), max_requests=20),
+
+        # pirate_group 写
+        Scenario('pirate_group.create', 'pirate_group.create', 'POST', lambda ctx, rng: (
+            '/api/pirate-groups', {'json': _group_payload(_unique('基准海贼团'))}), expect=(201,)),
+        Scenario('pirate_group.update', 'pirate_group.update', 'PUT', lambda ctx, rng: (
+            f'/api/pirate-groups/{ctx.group_id(rng)}', {'json': {'description': _unique('更新')}})),
+        Scenario('pirate_group.delete', 'pirate_group.delete', 'DELETE', lambda ctx, rng: (
+            f'/api/pirate-groups/{ctx.spare_groups.pop()}', {}),
+            prepare=lambda ctx, n: ctx.create_spare_groups(n)),
+        Scenario('pirate_group.bulk_create', 'pirate_group.bulk_create', 'POST', lambda ctx, rng: (
+            '/api/pirate-groups/bulk', {'json': [_group_payload(_unique('批量海贼团'))
+                                                 for _ in range(BULK_SIZE)]}), max_requests=50),
+        Scenario('pirate_group.bulk_update', 'pirate_group.bulk_update', 'PUT', lambda ctx, rng: (
+            '/api/pirate-groups/bulk', {'json': [{'id': ctx.group_id(rng), 'origin': rng.choice(['东海', '新世界'])}
+                                                 for _ in range(BULK_SIZE)]}), max_requests=50),
+        Scenario('pirate_group.bulk_delete', 'pirate_group.bulk_delete', 'DELETE', lambda ctx, rng: (
+            '/api/pirate-groups/bulk', {'json': [ctx.spare_groups.pop() for _ in range(BULK_SIZE)]}),
+            max_requests=50, prepare=lambda ctx, n: ctx.create_spare_groups(n * BULK_SIZE)),
+    ]
+
+
+def check_coverage(app, scenarios: List[Scenario]) -> List[str]:
+    """返回被覆盖蓝图中没有任何场景的端点（新增路由时提醒补充场景）"""
+    covered = {s.endpoint for s in scenarios}
+    endpoints: Dict[str, None] = {}
+    # ASGI 应用的路由名与 Flask 端点名一致
+    names = [route.name for route in app.routes] if hasattr(app, 'routes') \
+        else [rule.endpoint for rule in app.url_map.iter_rules()]
+    for name in names:
+        if name.rpartition('.')[0] in BLUEPRINTS:
+            endpoints[name] = None
+    return [e for e in endpoints if e not in covered]
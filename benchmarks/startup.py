@@ -0,0 +1,58 @@
+"""
+冷启动耗时
+
+    python -m benchmarks.startup --runs 10
+
+每轮启动一个新的 Python 进程，分别计时：导入 onepiece.app、create_app()、
+第一个请求（/api/common/ping，不访问数据库），输出各阶段的中位数与最大值
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.runner import BENCH_DIR
+
+_PROBE = '''
+import json, time
+started = time.perf_counter()
+from onepiece.app import create_app
+imported = time.perf_counter()
+app = create_app({'LOG_LEVEL': 'WARNING'})
+created = time.perf_counter()
+rv = app.test_client().get('/api/common/ping')
+assert rv.status_code == 200, rv.status_code
+served = time.perf_counter()
+print(json.dumps({'import_ms': (imported - started) * 1000, 'create_app_ms': (created - imported) * 1000,
+                  'first_request_ms': (served - created) * 1000, 'total_ms': (served - started) * 1000}))
+'''
+
+
+def measure(runs: int) -> dict:
+    root = os.path.dirname(BENCH_DIR)
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', _PROBE], cwd=root, check=True,
+                             capture_output=True, text=True).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+    return {
+        key: {'median': round(statistics.median(s[key] for s in samples), 1),
+              'max': round(max(s[key] for s in samples), 1)}
+        for key in samples[0]
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.startup', description='冷启动耗时')
+    parser.add_argument('--runs', type=int, default=10, help='启动次数')
+    args = parser.parse_args(argv)
+
+    for key, stats in measure(args.runs).items():
+        print(f'{key:<18}{stats["median"]:>9.1f}ms (max {stats["max"]:.1f}ms)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
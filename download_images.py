@@ -1,15 +1,32 @@
 """
 使用 Jikan API 下载海贼王角色头像
+
+    python download_images.py                          # 下载 CHARACTERS 中的角色
+    python download_images.py --characters chars.json  # {"名称": MAL 角色 ID, ...}
+    python download_images.py --revalidate             # 已下载的图片用 ETag / Last-Modified 条件请求检查更新
+
+- 线程池并发，令牌桶限速（Jikan 限制约 3 次/秒），每个线程对每个主机保持一条 keep-alive 连接
+- 图片先写临时文件再原子替换，中断不会留下半个文件
+- 每完成一个角色就写一次清单（图片地址、ETag、Last-Modified、大小），再次运行时跳过已完成的角色
+- 429 / 5xx 按 Retry-After 或指数退避重试；TLS 证书校验始终开启
 """
+import argparse
+import hashlib
+import http.client
+import json
 import os
-import urllib.request
 import ssl
-import json
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional
+from urllib.parse import urljoin, urlsplit
 
-ssl._create_default_https_context = ssl._create_unverified_context
-
-IMAGE_DIR = 'onepiece/static/images'
+API_BASE = 'https://api.jikan.moe/v4'
+IMAGE_DIR = 'frontend/public/images'
+MANIFEST_PATH = 'instance/images-manifest.json'
+USER_AGENT = 'onepiece-image-fetcher/1.0'
 
 # MyAnimeList 角色 ID
 CHARACTERS = {
@@ -25,48 +42,292 @@ CHARACTERS = {
     'jinbe': 16158,
 }
 
-def get_image_url(char_id):
-    """通过 Jikan API 获取角色图片 URL"""
-    api_url = f'https://api.jikan.moe/v4/characters/{char_id}'
-    headers = {'User-Agent': 'Mozilla/5.0'}
-
-    req = urllib.request.Request(api_url, headers=headers)
-    with urllib.request.urlopen(req, timeout=10) as response:
-        data = json.loads(response.read().decode())
-        return data['data']['images']['jpg']['image_url']
-
-def download_image(url, filepath):
-    """下载图片"""
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    req = urllib.request.Request(url, headers=headers)
-    with urllib.request.urlopen(req, timeout=15) as response:
-        with open(filepath, 'wb') as f:
-            f.write(response.read())
-    return os.path.getsize(filepath)
-
-def main():
-    os.makedirs(IMAGE_DIR, exist_ok=True)
-
-    for name, char_id in CHARACTERS.items():
-        filepath = os.path.join(IMAGE_DIR, f'{name}.jpg')
-
-        # 跳过已下载的大文件
-        if os.path.exists(filepath) and os.path.getsize(filepath) > 5000:
-            print(f'✓ {name}.jpg 已存在')
-            continue
-
-        print(f'获取 {name} 图片URL...', end=' ')
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+
+class FetchError(Exception):
+    pass
+
+
+class TokenBucket:
+    """线程安全的令牌桶：平均 rate 次/秒，允许 burst 次突发"""
+
+    def __init__(self, rate: float, burst: int = 1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(burst)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """取一个令牌，返回等待的秒数"""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # 先预定令牌再等待，多个线程按到达顺序排队
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            self._sleep(wait)
+        return wait
+
+
+class ConnectionPool:
+    """每个线程对每个主机复用一条 HTTP/1.1 连接"""
+
+    def __init__(self, timeout: float, ssl_context: ssl.SSLContext):
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self.connections = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def request(self, url: str, headers: dict):
+        """
+        发送 GET 请求；调用方读完响应体后连接即可复用
+
+        复用的连接可能已被服务端关闭，此时重新建立连接重试一次
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path + (f'?{parts.query}' if parts.query else '')
+        pool = self._local.__dict__.setdefault('connections', {})
+
+        for attempt in range(2):
+            conn = pool.get(key)
+            reused = conn is not None
+            if conn is None:
+                conn = pool[key] = self._connect(parts)
+            try:
+                conn.request('GET', path, headers={'User-Agent': USER_AGENT, **headers})
+                return conn.getresponse()
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                    ConnectionResetError, BrokenPipeError):
+                self.discard(url)
+                if not reused or attempt:
+                    raise
+
+    def discard(self, url: str):
+        parts = urlsplit(url)
+        conn = self._local.__dict__.get('connections', {}).pop((parts.scheme, parts.netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def _connect(self, parts) -> http.client.HTTPConnection:
+        with self._lock:
+            self.connections += 1
+        if parts.scheme == 'https':
+            return http.client.HTTPSConnection(parts.netloc, timeout=self.timeout, context=self.ssl_context)
+        return http.client.HTTPConnection(parts.netloc, timeout=self.timeout)
+
+
+class ImageFetcher:
+    def __init__(self, image_dir: str = IMAGE_DIR, manifest_path: str = MANIFEST_PATH, api_base: str = API_BASE,
+                 rate: float = 3.0, burst: int = 3, workers: int = 4, timeout: float = 15.0, retries: int = 3,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        self.image_dir = image_dir
+        self.manifest_path = manifest_path
+        self.api_base = api_base.rstrip('/')
+        self.workers = workers
+        self.retries = retries
+        self.bucket = TokenBucket(rate, burst)
+        self.pool = ConnectionPool(timeout, ssl_context or ssl.create_default_context())
+        self.manifest = self._load_manifest()
+        self._manifest_lock = threading.Lock()
+
+    def run(self, characters: Dict[str, int], revalidate: bool = False, force: bool = False) -> Dict[str, int]:
+        """
+        下载全部角色头像
+
+        Returns:
+            Dict[str, int]: 各结果的数量（downloaded / not_modified / skipped / failed）
+        """
+        os.makedirs(self.image_dir, exist_ok=True)
+        stats = {'downloaded': 0, 'not_modified': 0, 'skipped': 0, 'failed': 0}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.fetch, name, char_id, revalidate, force): name
+                       for name, char_id in characters.items()}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    result, size = future.result()
+                except Exception as e:
+                    stats['failed'] += 1
+                    print(f'✗ {name}: {e}')
+                    continue
+                stats[result] += 1
+                if result == 'downloaded':
+                    print(f'✓ {name}.jpg ({size} bytes)')
+        return stats
+
+    def fetch(self, name: str, char_id: int, revalidate: bool = False, force: bool = False):
+        """下载一个角色头像，返回 (结果, 字节数)"""
+        path = os.path.join(self.image_dir, f'{name}.jpg')
+        entry = self.manifest.get(name)
+        complete = (entry is not None and entry.get('char_id') == char_id
+                    and os.path.exists(path) and os.path.getsize(path) == entry.get('size'))
+        if complete and not revalidate and not force:
+            return 'skipped', entry['size']
+
+        image_url = entry.get('image_url') if complete else None
+        if image_url is None:
+            data = json.loads(self._get(f'{self.api_base}/characters/{char_id}'))
+            image_url = data['data']['images']['jpg']['image_url']
+
+        headers = {}
+        if complete and not force:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        status, response_headers, size, digest = self._download(image_url, path, headers)
+        if status == 304:
+            return 'not_modified', entry['size']
+
+        self._record(name, {
+            'char_id': char_id,
+            'image_url': image_url,
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+            'size': size,
+            'sha256': digest
+        })
+        return 'downloaded', size
+
+    def _get(self, url: str) -> bytes:
+        """限速 + 重试 + 跟随跳转的 GET，返回响应体"""
+        result = []
+        self._request(url, {}, lambda response: result.append(response.read()))
+        return result[0]
+
+    def _download(self, url: str, path: str, headers: dict):
+        """流式写入临时文件，完整写完后原子替换目标文件"""
+        digest, size = hashlib.sha256(), [0]
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                def write(response):
+                    for chunk in iter(lambda: response.read(65536), b''):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size[0] += len(chunk)
+                    expected = response.getheader('Content-Length')
+                    if expected is not None and int(expected) != size[0]:
+                        raise FetchError(f'响应不完整: {size[0]}/{expected} bytes')
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                status, response_headers = self._request(url, headers, write)
+            if status == 304:
+                os.unlink(tmp)
+            else:
+                os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return status, response_headers, size[0], digest.hexdigest()
+
+    def _request(self, url: str, headers: dict, consume, redirects: int = 3):
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            try:
+                response = self.pool.request(url, headers)
+            except (OSError, http.client.HTTPException) as e:
+                if attempt == self.retries:
+                    raise FetchError(f'{url}: {e}') from e
+                time.sleep(2 ** attempt)
+                continue
+
+            try:
+                status = response.status
+                if status in REDIRECT_STATUSES and redirects:
+                    response.read()
+                    location = urljoin(url, response.getheader('Location'))
+                    return self._request(location, headers, consume, redirects - 1)
+                if status in RETRY_STATUSES and attempt < self.retries:
+                    response.read()
+                    time.sleep(_retry_after(response.getheader('Retry-After'), attempt))
+                    continue
+                if status == 304:
+                    response.read()
+                    return status, response.headers
+                if status != 200:
+                    response.read()
+                    raise FetchError(f'{url}: HTTP {status}')
+                consume(response)
+                return status, response.headers
+            except BaseException:
+                # 响应未读完的连接不再复用
+                self.pool.discard(url)
+                raise
+            finally:
+                if response.will_close:
+                    self.pool.discard(url)
+        raise FetchError(f'{url}: 重试 {self.retries} 次后仍失败')
+
+    def _load_manifest(self) -> dict:
         try:
-            # Jikan API 限流，需要间隔请求
-            time.sleep(0.5)
-            url = get_image_url(char_id)
-            print(f'下载中...', end=' ')
-            size = download_image(url, filepath)
-            print(f'✓ 完成 ({size} bytes)')
-        except Exception as e:
-            print(f'✗ 失败: {e}')
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _record(self, name: str, entry: dict):
+        """更新清单并原子写回，中断后已完成的角色不会丢失"""
+        with self._manifest_lock:
+            self.manifest[name] = entry
+            directory = os.path.dirname(os.path.abspath(self.manifest_path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp, self.manifest_path)
+
+
+def _retry_after(value: Optional[str], attempt: int) -> float:
+    try:
+        return min(float(value), 60.0)
+    except (TypeError, ValueError):
+        return 2 ** attempt
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='下载海贼王角色头像')
+    parser.add_argument('--characters', help='角色 JSON 文件 {"名称": MAL 角色 ID}，默认内置的草帽一伙')
+    parser.add_argument('--image-dir', default=IMAGE_DIR, help='图片目录')
+    parser.add_argument('--manifest', default=MANIFEST_PATH, help='清单路径（断点续传）')
+    parser.add_argument('--api-base', default=API_BASE, help='Jikan API 地址')
+    parser.add_argument('--rate', type=float, default=3.0, help='每秒请求数上限')
+    parser.add_argument('--burst', type=int, default=3, help='允许的突发请求数')
+    parser.add_argument('--workers', type=int, default=4, help='并发线程数')
+    parser.add_argument('--revalidate', action='store_true', help='已下载的图片发送条件请求检查更新')
+    parser.add_argument('--force', action='store_true', help='忽略清单重新下载')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    characters = CHARACTERS
+    if args.characters:
+        with open(args.characters, encoding='utf-8') as f:
+            characters = json.load(f)
+
+    fetcher = ImageFetcher(args.image_dir, args.manifest, args.api_base,
+                           rate=args.rate, burst=args.burst, workers=args.workers)
+    started = time.perf_counter()
+    stats = fetcher.run(characters, revalidate=args.revalidate, force=args.force)
+    print(f'\n完成！下载 {stats["downloaded"]}，未变化 {stats["not_modified"]}，跳过 {stats["skipped"]}，'
+          f'失败 {stats["failed"]}；{fetcher.pool.connections} 个连接，耗时 {time.perf_counter() - started:.1f}s')
+    return 1 if stats['failed'] else 0
+
 
 if __name__ == '__main__':
     print('使用 Jikan API 下载海贼王角色头像\n')
-    main()
-    print('\n完成！')
+    raise SystemExit(main())
@@ -1,60 +1,141 @@
 from flask import Flask, send_from_directory, jsonify, request, redirect
+from flask.cli import AppGroup
 from flask_cors import CORS
 from onepiece.config import Config
-from onepiece.models import db, init_db
+from onepiece.models import db
+from onepiece.utils.assets import assets
+from onepiece.utils.auth import token_auth
+from onepiece.utils.cache import cache
+from onepiece.utils.db_pool import pool_monitor
+from onepiece.utils.images import image_variants
+from onepiece.utils.json_provider import json_codec
+from onepiece.utils.log_config import log_pipeline
+from onepiece.utils.metrics import metrics
+from onepiece.utils.password import password_hasher
+from onepiece.utils.query_monitor import query_monitor
 from onepiece.views.registry import register_blueprints
 import logging
+import random
+import time
 
-# 配置日志
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s [%(levelname)s] %(filename)s:%(lineno)d - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 
-def create_app():
-    """应用工厂函数"""
+class LazyCommandGroup(AppGroup):
+    """
+    flask 命令行第一次查找命令时才导入 onepiece.commands
+
+    命令模块依赖导入、种子数据、索引建议等服务，服务进程用不到，不在 create_app 时导入
+    """
+
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
+        self.loaded = False
+
+    def _load(self):
+        if not self.loaded:
+            self.loaded = True
+            from onepiece.commands import register_commands
+            register_commands(self.app)
+
+    def get_command(self, ctx, name):
+        self._load()
+        return super().get_command(ctx, name)
+
+    def list_commands(self, ctx):
+        self._load()
+        return super().list_commands(ctx)
+
+
+def create_app(config: dict = None):
+    """
+    应用工厂函数
+
+    Args:
+        config: 可选，覆盖 Config 中的配置项（测试、基准测试用）
+
+    不访问数据库：建表与默认数据由 flask init-db 完成，搜索索引在首次搜索时构建
+    """
+    started = time.perf_counter()
     app = Flask(__name__)
 
     # 加载配置
     app.config.from_object(Config)
+    app.config.update(config or {})
+
+    # JSON 编码（orjson 优先，输出与标准库一致）
+    json_codec.init_app(app)
+
+    # 配置日志（队列 + 后台线程输出）
+    log_pipeline.init_app(app)
 
     # 初始化CORS
     # CORS(app)
 
-    # 初始化数据库
+    # 初始化数据库（连接池参数需在创建引擎前补全）
+    pool_monitor.init_app(app)
     db.init_app(app)
 
+    # 初始化 Service 读缓存
+    cache.init_app(app)
+
+    # 密码哈希参数与校验线程池
+    password_hasher.init_app(app)
+
+    # 前端静态资源（指纹、预压缩清单）
+    assets.init_app(app)
+
+    # 图片变体（缩略图与格式转换）
+    image_variants.init_app(app)
+
+    # 认证服务（每个应用一个实例，缓存已验证的 token）
+    token_auth.init_app(app)
 
-    # 自动发现并注册所有蓝图
+    # 请求与 SQL 指标采集、慢查询与 N+1 检测
+    metrics.init_app(app)
+    query_monitor.init_app(app)
+
+    # 按静态注册表注册蓝图
     register_blueprints(app)
 
+    # 注册命令行工具（执行 flask 命令时才导入）
+    app.cli = LazyCommandGroup(app)
+
     # 根路径重定向到前端页面
     @app.route('/')
     def index():
         return redirect('/frontend/')
 
-    # 前端静态文件服务
+    # 前端静态文件服务（已执行 build-assets 时按清单返回预压缩变体）
     @app.route('/frontend/')
     def serve_frontend():
-        return send_from_directory('../frontend', 'index.html')
+        return assets.serve('index.html')
 
     @app.route('/frontend/<path:filename>')
     def serve_frontend_files(filename):
-        return send_from_directory('../frontend', filename)
+        return assets.serve(filename)
 
-    # 图片静态文件服务
+    # 图片静态文件服务，带 w / fmt 参数时返回缩放或转换格式后的变体
     @app.route('/images/<path:filename>')
     def serve_images(filename):
-        return send_from_directory('../frontend/public/images', filename)
+        if 'w' in request.args or 'fmt' in request.args:
+            return image_variants.serve(filename)
+        return send_from_directory(image_variants.source_dir, filename)
 
     # 请求前日志 - 记录每个进入的请求
+    dump_sample_rate = app.config.get('LOG_REQUEST_SAMPLE_RATE', 0.01)
+
     @app.before_request
     def log_request_info():
-        logger.info(f'>>> 收到请求: {request.method} {request.path}')
-        logger.debug(f'    Headers: {dict(request.headers)}')
-        logger.debug(f'    匹配的端点: {request.endpoint}')
+        logger.info('>>> 收到请求: %s %s', request.method, request.path)
+        # 请求头/请求体转储只按比例抽样，避免每个请求都复制和格式化；
+        # token 与认证接口请求体中的明文密码不转储
+        if logger.isEnabledFor(logging.DEBUG) and random.random() < dump_sample_rate:
+            logger.debug('    Headers: %s', {k: v for k, v in request.headers.items() if k != 'Authorization'})
+            if request.blueprint != 'index':
+                logger.debug('    Body: %s', request.get_data(cache=True)[:1024])
+            logger.debug('    匹配的端点: %s', request.endpoint)
 
     # 全局错误处理（最短反馈路径）
     @app.errorhandler(404)
@@ -67,23 +148,26 @@ def create_app():
 
     @app.errorhandler(405)
     def method_not_allowed(e):
-        logger.error(f'!!! 405错误: {request.method} {request.path}')
-        logger.error(f'    允许的方法: {e.valid_methods}')
+        logger.error('!!! 405错误: %s %s', request.method, request.path)
+        logger.error('    允许的方法: %s', e.valid_methods)
         return jsonify({'success': False, 'message': '请求方法不允许'}), 405
 
-    # 创建表和初始化数据
-    with app.app_context():
-        init_db()
-
-    # 打印所有注册的路由
-    logger.info('=== 已注册的路由 ===')
-    for rule in app.url_map.iter_rules():
-        logger.info(f'    {rule.rule} -> {rule.endpoint} [{", ".join(rule.methods)}]')
+    # 打印所有注册的路由（仅 DEBUG）
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('=== 已注册的路由 ===')
+        for rule in app.url_map.iter_rules():
+            logger.debug('    %s -> %s [%s]', rule.rule, rule.endpoint, ', '.join(rule.methods))
 
+    elapsed = time.perf_counter() - started
+    metrics.startup.set(elapsed)
+    logger.info('应用初始化完成，耗时 %.1fms', elapsed * 1000)
     return app
 
 
 if __name__ == '__main__':
+    # 仅用于本地开发；生产环境请使用 python -m onepiece.server
+    import os
+
     app = create_app()
 
     print("=" * 70)
@@ -94,4 +178,4 @@ if __name__ == '__main__':
     print(f"👤 测试账号: admin/admin123 或 user/user123")
     print("=" * 70)
 
-    app.run(host='0.0.0.0', debug=True, port=8080)
\ No newline at end of file
+    app.run(host='0.0.0.0', debug=os.getenv('FLASK_DEBUG', '0') == '1', port=8080)
\ No newline at end of file
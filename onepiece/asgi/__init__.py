@@ -0,0 +1,15 @@
+"""
+ASGI 服务模式 - 与 Flask 应用相同的路由与响应，视图与数据库访问为异步实现
+
+    python -m onepiece.asgi
+
+依赖 starlette、uvicorn 与异步数据库驱动：pip install -e .[asgi]
+"""
+try:
+    import starlette  # noqa: F401
+except ImportError as e:
+    raise RuntimeError('ASGI 模式需要安装 starlette、uvicorn 与异步数据库驱动: pip install -e .[asgi]') from e
+
+from onepiece.asgi.app import create_asgi_app
+
+__all__ = ['create_asgi_app']
@@ -0,0 +1,32 @@
+"""
+ASGI 服务入口 - uvicorn 多进程，每个 worker 一个事件循环
+
+    python -m onepiece.asgi
+
+监听地址沿用 WEB_BIND，进程数见 ASGI_WORKERS
+"""
+import os
+
+import uvicorn
+
+from onepiece.config import Config
+
+
+def main(config=Config):
+    host, _, port = config.WEB_BIND.rpartition(':')
+    # worker 进程按工厂函数重新加载配置，进程数经环境变量传入（据此选择缓存后端）
+    os.environ['SERVER_PROCESSES'] = str(config.ASGI_WORKERS)
+    uvicorn.run(
+        'onepiece.asgi:create_asgi_app',
+        factory=True,
+        host=host or '0.0.0.0',
+        port=int(port),
+        workers=config.ASGI_WORKERS,
+        timeout_keep_alive=config.WEB_KEEPALIVE,
+        timeout_graceful_shutdown=config.WEB_GRACEFUL_TIMEOUT,
+        access_log=config.WEB_ACCESS_LOG
+    )
+
+
+if __name__ == '__main__':
+    main()
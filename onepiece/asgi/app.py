@@ -0,0 +1,146 @@
+"""
+ASGI 应用工厂 - 与 create_app 相同的配置、日志、缓存与指标，视图与数据库访问换成异步实现
+
+    uvicorn --factory onepiece.asgi:create_asgi_app
+
+- 配置、日志、缓存、密码哈希等仍由 create_app 初始化，Flask 应用保存在 app.state.flask_app，
+  供线程池中执行的同步 Service（批量写接口）使用
+- 启动时在线程池中完成密码哈希参数校准，并构建搜索索引、加载已注销 token
+- 已注销 token 由后台任务每 AUTH_REVOCATION_RELOAD_SECONDS 秒重新加载
+"""
+import asyncio
+import contextlib
+import logging
+import time
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+
+from onepiece.app import create_app
+from onepiece.asgi.database import AsyncDatabase
+from onepiece.asgi.response import JSONResponse
+from onepiece.asgi.services import AsyncAuthService, ensure_search_indexes
+from onepiece.asgi.views import ROUTES
+from onepiece.utils.auth import token_auth
+from onepiece.utils.metrics import _request_db, metrics
+from onepiece.utils.password import password_hasher
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """请求指标采集（与 Metrics 的 before/after_request 相同的指标与标签）"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        db_stats = [0, 0.0]
+        token = _request_db.set(db_stats)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        metrics.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight.dec()
+            _request_db.reset(token)
+            # 路由在匹配后写入 scope，未匹配路由的请求统一归入 unmatched
+            route = scope.get('route')
+            endpoint = getattr(route, 'name', None) or 'unmatched'
+            blueprint = endpoint.rpartition('.')[0]
+            metrics.latency.observe(time.perf_counter() - start, (blueprint, endpoint))
+            metrics.requests.inc(labels=(blueprint, endpoint, scope['method'], str(status[0])))
+            metrics.request_queries.observe(db_stats[0], (endpoint,))
+            metrics.request_db_time.observe(db_stats[1], (endpoint,))
+
+
+# 与 create_app 中的全局错误处理相同的响应体
+ERROR_MESSAGES = {
+    404: '接口不存在',
+    405: '请求方法不允许',
+    500: '服务器内部错误'
+}
+
+
+async def http_error(request, exc: HTTPException):
+    if exc.status_code == 405:
+        logger.error('!!! 405错误: %s %s', request.method, request.url.path)
+    message = ERROR_MESSAGES.get(exc.status_code, exc.detail)
+    return JSONResponse({'success': False, 'message': message}, status_code=exc.status_code)
+
+
+async def server_error(request, exc: Exception):
+    return JSONResponse({'success': False, 'message': ERROR_MESSAGES[500]}, status_code=500)
+
+
+async def _reload_revocations(app, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with app.state.db.session() as session:
+                await app.state.auth.load_revocations(session)
+        except Exception as e:
+            logger.error('加载已注销token失败: %s', e)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    started = time.perf_counter()
+    await run_in_threadpool(password_hasher.warm_up)
+    try:
+        async with app.state.db.session() as session:
+            await ensure_search_indexes(session)
+            await app.state.auth.load_revocations(session)
+    except Exception as e:
+        # 数据库不可用时不阻塞启动，首次搜索时再构建索引，注销列表由后台任务重试
+        logger.warning('启动时预加载失败: %s', e)
+
+    reloader = asyncio.create_task(_reload_revocations(app, app.state.auth.revocation_reload_seconds))
+    logger.info('ASGI 应用启动完成，耗时 %.1fms', (time.perf_counter() - started) * 1000)
+    try:
+        yield
+    finally:
+        reloader.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await reloader
+        await app.state.db.dispose()
+
+
+def create_asgi_app(config: dict = None) -> Starlette:
+    """
+    ASGI 应用工厂函数
+
+    Args:
+        config: 可选，覆盖 Config 中的配置项（测试、基准测试用）
+    """
+    flask_app = create_app(config)
+
+    app = Starlette(
+        routes=ROUTES,
+        exception_handlers={HTTPException: http_error, Exception: server_error},
+        lifespan=lifespan
+    )
+    if flask_app.config.get('METRICS_ENABLED', True):
+        app.add_middleware(MetricsMiddleware)
+
+    app.state.flask_app = flask_app
+    app.state.db = AsyncDatabase(flask_app.config)
+    app.state.auth = AsyncAuthService(
+        flask_app.config['SECRET_KEY'],
+        token_cache_size=flask_app.config.get('AUTH_TOKEN_CACHE_SIZE', 10000),
+        revocation_reload_seconds=flask_app.config.get('AUTH_REVOCATION_RELOAD_SECONDS', 30)
+    )
+    token_auth.track(app.state.auth)
+    return app
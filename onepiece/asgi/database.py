@@ -0,0 +1,59 @@
+"""
+异步数据库 - 与同步版本共用模型与连接配置，驱动换成异步实现
+
+- mysql+pymysql -> mysql+aiomysql
+- sqlite -> sqlite+aiosqlite
+- ASYNC_DATABASE_URL 可整体覆盖连接串
+"""
+from contextlib import asynccontextmanager
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+# 同步驱动 -> 异步驱动
+ASYNC_DRIVERS = {
+    'mysql': 'mysql+aiomysql',
+    'sqlite': 'sqlite+aiosqlite'
+}
+
+
+def async_database_url(url: str) -> str:
+    """把同步连接串换成对应的异步驱动"""
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f'ASGI 模式不支持的数据库: {url.get_backend_name()}')
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def async_engine_options(config, url: str) -> dict:
+    """
+    沿用 SQLALCHEMY_ENGINE_OPTIONS（连接池大小、超时等）；
+    InstrumentedQueuePool 是同步连接池，异步引擎使用默认的 AsyncAdaptedQueuePool
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    options.pop('poolclass', None)
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        # 内存库只存在于单个连接中
+        return {'poolclass': StaticPool, 'connect_args': options.get('connect_args', {})}
+    return options
+
+
+class AsyncDatabase:
+    """异步引擎与会话工厂，每个 ASGI 应用一个"""
+
+    def __init__(self, config):
+        url = async_database_url(config.get('ASYNC_DATABASE_URL') or config['SQLALCHEMY_DATABASE_URI'])
+        self.engine = create_async_engine(url, **async_engine_options(config, url))
+        # 提交后不过期对象属性，序列化时无需再次查询
+        self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def session(self) -> AsyncSession:
+        async with self.sessionmaker() as session:
+            yield session
+
+    async def dispose(self):
+        await self.engine.dispose()
@@ -0,0 +1,90 @@
+"""
+统一响应格式（ASGI）- 与 onepiece.utils.response 输出相同的响应体与 ETag
+"""
+from functools import wraps
+
+from starlette.responses import JSONResponse as _JSONResponse, Response
+
+from onepiece.utils import data_version
+from onepiece.utils.cache import cache
+from onepiece.utils.json_provider import json_codec
+from onepiece.utils.response import etag_for
+
+
+class JSONResponse(_JSONResponse):
+    """与 Flask 应用相同的编码（json_codec）：UTF-8、键排序、紧凑分隔符、末尾换行"""
+
+    def render(self, content) -> bytes:
+        return json_codec.dumps(content) + b'\n'
+
+
+def success(data=None, message=None, **extra):
+    """成功响应，extra 中的字段（如 next_cursor）直接并入响应体"""
+    resp = {'success': True}
+    if data is not None:
+        resp['data'] = data
+    if message:
+        resp['message'] = message
+    resp.update(extra)
+    return JSONResponse(resp)
+
+
+def error(message, code=400):
+    """错误响应"""
+    return JSONResponse({'success': False, 'message': message}, status_code=code)
+
+
+def not_found(resource='资源'):
+    """404响应"""
+    return error(f'{resource}不存在', 404)
+
+
+def unauthorized(message='未授权'):
+    """401响应"""
+    return error(message, 401)
+
+
+def conditional(*scopes):
+    """
+    条件 GET 装饰器 - 与 onepiece.utils.response.conditional 相同的 ETag 计算方式
+
+    Args:
+        scopes: 响应所依赖的数据，data_version.CREW / GROUP
+    """
+    def decorator(endpoint):
+        @wraps(endpoint)
+        async def wrapper(request):
+            versions = await _data_versions(request, scopes)
+            cache.observe(versions)
+            if len(versions) != len(scopes):
+                return await endpoint(request)
+
+            etag = etag_for(f'{request.url.path}?{request.url.query}', versions)
+            headers = {'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'}
+            if _if_none_match(request, etag):
+                return Response(status_code=304, headers=headers)
+
+            response = await endpoint(request)
+            if response.status_code == 200:
+                response.headers.update(headers)
+            return response
+        return wrapper
+    return decorator
+
+
+async def _data_versions(request, scopes) -> dict:
+    versions = cache.data_versions()
+    if versions is None:
+        generation = cache.generation()
+        async with request.app.state.db.session() as session:
+            versions = dict((await session.execute(data_version.select_statement())).all())
+        cache.store_data_versions(versions, generation)
+    return {scope: versions[scope] for scope in scopes if scope in versions}
+
+
+def _if_none_match(request, etag: str) -> bool:
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    candidates = {value.strip().removeprefix('W/').strip('"') for value in header.split(',')}
+    return etag in candidates or '*' in candidates
@@ -0,0 +1,541 @@
+"""
+异步 Service - CrewService / PirateGroupService / AuthService 的 AsyncSession 版本
+
+与同步版本共用：创建数据校验（build_fields）、排序键、可更新字段、序列化（serialize / row_to_dict）、
+keyset 分页、读缓存（同名方法共用缓存条目和失效标签）、搜索索引与 token 校验缓存。
+返回值同样是 (成功标志, 数据, 消息)；批量写接口直接复用同步 Service（见 views.run_sync）
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+
+import jwt
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from onepiece.models import CrewMember, PirateGroup, RevokedToken, User
+from onepiece.services import AuthService, CrewService, PirateGroupService
+from onepiece.utils import data_version
+from onepiece.utils.bounty import format_bounty
+from onepiece.utils.cache import cache
+from onepiece.utils.pagination import (
+    CursorError, clamp_limit, cursor_offset, keyset_query, keyset_result, offset_cursor, parse_sort
+)
+from onepiece.utils.password import PasswordHasherBusy, password_hasher
+from onepiece.utils.search_index import crew_index, pirate_group_index, stale_indexes
+
+logger = logging.getLogger(__name__)
+
+
+# 后台重建任务（保留引用，避免任务未完成即被回收）
+_rebuild_tasks = set()
+
+
+async def ensure_search_indexes(session: AsyncSession):
+    """
+    与同步版本相同：索引尚未构建时直接构建；数据版本号不一致时在后台任务中用独立会话重建，
+    本次搜索使用旧索引。建索引的计算放在线程池中，不阻塞事件循环
+    """
+    versions = dict((await session.execute(data_version.select_statement())).all())
+    built = False
+    for index, stmt, version in stale_indexes(versions):
+        if not index.built:
+            await _build_index(session, index, stmt, version)
+            built = True
+        elif index.claim_rebuild():
+            task = asyncio.create_task(_rebuild_index(AsyncSession(session.bind), index, stmt, version))
+            _rebuild_tasks.add(task)
+            task.add_done_callback(_rebuild_tasks.discard)
+    if built:
+        logger.info('搜索索引构建完成: 船员 %s 条, 海贼团 %s 条', len(crew_index), len(pirate_group_index))
+
+
+async def _build_index(session: AsyncSession, index, stmt, version):
+    rows = (await session.execute(stmt)).all()
+    await asyncio.to_thread(index.build, [(row.id, row) for row in rows], version)
+
+
+async def _rebuild_index(session: AsyncSession, index, stmt, version):
+    try:
+        async with session:
+            await _build_index(session, index, stmt, version)
+        logger.info('搜索索引后台重建完成: %s 条（版本 %s）', len(index), version)
+    except Exception:
+        logger.exception('搜索索引后台重建失败')
+    finally:
+        index.release_rebuild()
+
+
+async def bump_versions(session: AsyncSession, *scopes: str) -> dict:
+    """data_version.bump 的异步版本：在当前事务中递增版本号，返回递增后的版本号"""
+    await session.execute(data_version.bump_statement(scopes))
+    return dict((await session.execute(data_version.select_statement(scopes))).all())
+
+
+class AsyncCrewService:
+    """船员服务类（异步）"""
+
+    SORT_FIELDS = CrewService.SORT_FIELDS
+    UPDATABLE_FIELDS = CrewService.UPDATABLE_FIELDS
+    EXPORT_BATCH_SIZE = CrewService.EXPORT_BATCH_SIZE
+    EXPORT_COLUMNS = CrewService.EXPORT_COLUMNS
+    build_fields = staticmethod(CrewService.build_fields)
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @cache.cached('crew.get_all', tags=lambda page, *a, **kw: ['crew:list'])
+    async def get_all(self, pirate_group_id: Optional[int] = None, limit: Optional[int] = None,
+                      after: Optional[str] = None, sort: Optional[str] = None,
+                      min_bounty: Optional[int] = None, max_bounty: Optional[int] = None) -> Tuple[bool, Optional[dict], str]:
+        """分页获取船员列表（keyset 游标分页），参数与 CrewService.get_all 相同"""
+        try:
+            sort_key, desc = parse_sort(sort, self.SORT_FIELDS)
+            column, limit = self.SORT_FIELDS[sort_key], clamp_limit(limit)
+            query = CrewMember.list_select()
+            if pirate_group_id:
+                query = query.where(CrewMember.pirate_group_id == pirate_group_id)
+            if min_bounty is not None:
+                query = query.where(CrewMember.bounty_value >= min_bounty)
+            if max_bounty is not None:
+                query = query.where(CrewMember.bounty_value <= max_bounty)
+
+            stmt = keyset_query(query, column, CrewMember.id, sort_key, desc, limit, after)
+            rows = (await self.session.execute(stmt)).all()
+            rows, next_cursor = keyset_result(rows, column, CrewMember.id, sort_key, desc, limit)
+            page = {'items': [CrewMember.row_to_dict(r) for r in rows], 'next_cursor': next_cursor}
+            return True, page, f'获取到 {len(rows)} 名船员'
+        except CursorError as e:
+            return False, None, str(e)
+        except Exception as e:
+            logger.error('获取船员列表失败: %s', e)
+            return False, None, '获取船员列表失败'
+
+    @cache.cached('crew.get_by_id', tags=lambda member, member_id: [
+        f'crew:{member_id}', f'group:{member["pirate_group_id"]}'
+    ])
+    async def get_by_id(self, member_id: int) -> Tuple[bool, Optional[dict], str]:
+        """根据 ID 获取船员详情（与列表相同的单条 LEFT JOIN 查询）"""
+        row = (await self.session.execute(
+            CrewMember.list_select().where(CrewMember.id == member_id)
+        )).first()
+        if not row:
+            return False, None, '船员不存在'
+        return True, CrewMember.row_to_dict(row), '获取成功'
+
+    async def create(self, data: dict) -> Tuple[bool, Optional[dict], str]:
+        """创建船员"""
+        fields, message = self.build_fields(data)
+        if fields is None:
+            return False, None, message
+
+        pirate_group_id, group_name = fields['pirate_group_id'], None
+        if pirate_group_id:
+            group = await self.session.get(PirateGroup, pirate_group_id)
+            if not group:
+                return False, None, '指定的海贼团不存在'
+            group_name = group.name
+
+        try:
+            member = CrewMember(**fields)
+            self.session.add(member)
+            versions = await bump_versions(self.session, data_version.CREW)
+            await self.session.commit()
+            crew_index.add(member.id, member, versions.get(data_version.CREW))
+            cache.invalidate('crew:list', f'group:{pirate_group_id}')
+
+            logger.info('创建船员成功: %s', member.name)
+            return True, CrewMember.serialize(member, group_name), '创建成功'
+        except Exception as e:
+            await self.session.rollback()
+            logger.error('创建船员失败: %s', e)
+            return False, None, '创建船员失败'
+
+    async def update(self, member_id: int, data: dict) -> Tuple[bool, Optional[dict], str]:
+        """更新船员信息"""
+        member = await self.session.get(CrewMember, member_id)
+        if not member:
+            return False, None, '船员不存在'
+
+        pirate_group_id = data.get('pirate_group_id')
+        if pirate_group_id and not await self.session.get(PirateGroup, pirate_group_id):
+            return False, None, '指定的海贼团不存在'
+
+        old_group_id = member.pirate_group_id
+        try:
+            for field in self.UPDATABLE_FIELDS:
+                if field in data:
+                    setattr(member, field, data[field])
+
+            versions = await bump_versions(self.session, data_version.CREW)
+            await self.session.commit()
+            crew_index.add(member.id, member, versions.get(data_version.CREW))
+            cache.invalidate(
+                'crew:list', f'crew:{member_id}',
+                f'group:{old_group_id}', f'group:{member.pirate_group_id}'
+            )
+            group = await self.session.get(PirateGroup, member.pirate_group_id) if member.pirate_group_id else None
+            logger.info('更新船员成功: %s', member.name)
+            return True, CrewMember.serialize(member, group.name if group else None), '更新成功'
+        except Exception as e:
+            await self.session.rollback()
+            logger.error('更新船员失败: %s', e)
+            return False, None, '更新船员失败'
+
+    async def delete(self, member_id: int) -> Tuple[bool, None, str]:
+        """删除船员"""
+        member = await self.session.get(CrewMember, member_id)
+        if not member:
+            return False, None, '船员不存在'
+
+        try:
+            name, group_id = member.name, member.pirate_group_id
+            await self.session.delete(member)
+            versions = await bump_versions(self.session, data_version.CREW)
+            await self.session.commit()
+            crew_index.remove(member_id, versions.get(data_version.CREW))
+            cache.invalidate('crew:list', f'crew:{member_id}', f'group:{group_id}')
+            logger.info('删除船员成功: %s', name)
+            return True, None, f'船员 {name} 已删除'
+        except Exception as e:
+            await self.session.rollback()
+            logger.error('删除船员失败: %s', e)
+            return False, None, '删除船员失败'
+
+    @cache.cached('crew.search', tags=lambda page, *a, **kw: ['crew:list'])
+    async def search(self, keyword: str, limit: Optional[int] = None,
+                     after: Optional[str] = None) -> Tuple[bool, Optional[dict], str]:
+        """搜索船员（进程内倒排索引，按相关度排序）"""
+        if not keyword:
+            return False, None, '搜索关键词不能为空'
+
+        try:
+            scope = f'search:{keyword}'
+            limit, offset = clamp_limit(limit), cursor_offset(after, scope)
+
+            await ensure_search_indexes(self.session)
+            ids, total = crew_index.search(keyword, offset, limit)
+
+            rows = (await self.session.execute(
+                CrewMember.list_select().where(CrewMember.id.in_(ids))
+            )).all() if ids else []
+            rank = {member_id: i for i, member_id in enumerate(ids)}
+            rows.sort(key=lambda r: rank[r.id])
+
+            next_cursor = offset_cursor(scope, offset + limit) if offset + limit < total else None
+            page = {'items': [CrewMember.row_to_dict(r) for r in rows], 'next_cursor': next_cursor}
+            return True, page, f'搜索到 {total} 名船员'
+        except CursorError as e:
+            return False, None, str(e)
+        except Exception as e:
+            logger.error('搜索船员失败: %s', e)
+            return False, None, '搜索失败'
+
+    async def iter_export(self, pirate_group_id: Optional[int] = None) -> AsyncIterator[dict]:
+        """按主键顺序逐行产出船员数据（流式结果集分批拉取）"""
+        query = CrewMember.list_select()
+        if pirate_group_id:
+            query = query.where(CrewMember.pirate_group_id == pirate_group_id)
+
+        rows = await self.session.stream(
+            query.order_by(CrewMember.id).execution_options(yield_per=self.EXPORT_BATCH_SIZE)
+        )
+        async for row in rows:
+            yield CrewMember.row_to_dict(row)
+
+
+class AsyncPirateGroupService:
+    """海贼团服务类（异步）"""
+
+    SORT_FIELDS = PirateGroupService.SORT_FIELDS
+    UPDATABLE_FIELDS = PirateGroupService.UPDATABLE_FIELDS
+    EXPORT_BATCH_SIZE = PirateGroupService.EXPORT_BATCH_SIZE
+    EXPORT_COLUMNS = PirateGroupService.EXPORT_COLUMNS
+    build_fields = staticmethod(PirateGroupService.build_fields)
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @cache.cached('group.get_all', tags=lambda page, *a, **kw: ['group:list'])
+    async def get_all(self, limit: Optional[int] = None, after: Optional[str] = None,
+                      sort: Optional[str] = None) -> Tuple[bool, Optional[dict], str]:
+        """分页获取海贼团列表（keyset 游标分页）"""
+        try:
+            sort_key, desc = parse_sort(sort, self.SORT_FIELDS)
+            column, limit = self.SORT_FIELDS[sort_key], clamp_limit(limit)
+            stmt = keyset_query(select(PirateGroup), column, PirateGroup.id, sort_key, desc, limit, after)
+            groups = (await self.session.execute(stmt)).scalars().all()
+            groups, next_cursor = keyset_result(groups, column, PirateGroup.id, sort_key, desc, limit)
+            page = {'items': [PirateGroup.serialize(g) for g in groups], 'next_cursor': next_cursor}
+            return True, page, f'获取到 {len(groups)} 个海贼团'
+        except CursorError as e:
+            return False, None, str(e)
+        except Exception as e:
+            logger.error('获取海贼团列表失败: %s', e)
+            return False, None, '获取海贼团列表失败'
+
+    @cache.cached('group.get_by_id', tags=lambda group, group_id, *a, **kw: [f'group:{group_id}'])
+    async def get_by_id(self, group_id: int, include_members: bool = False) -> Tuple[bool, Optional[dict], str]:
+        """根据 ID 获取海贼团详情"""
+        group = await self.session.get(PirateGroup, group_id)
+        if not group:
+            return False, None, '海贼团不存在'
+        data = PirateGroup.serialize(group)
+        if include_members:
+            data['members'] = await self._members(group_id)
+        return True, data, '获取成功'
+
+    async def create(self, data: dict) -> Tuple[bool, Optional[dict], str]:
+        """创建海贼团"""
+        fields, message = self.build_fields(data)
+        if fields is None:
+            return False, None, message
+
+        name = fields['name']
+        if await self._name_taken(name):
+            return False, None, f'海贼团 {name} 已存在'
+
+        try:
+            group = PirateGroup(**fields)
+            self.session.add(group)
+            versions = await bump_versions(self.session, data_version.GROUP)
+            await self.session.commit()
+            pirate_group_index.add(group.id, group, versions.get(data_version.GROUP))
+            cache.invalidate('group:list')
+
+            logger.info('创建海贼团成功: %s', name)
+            return True, PirateGroup.serialize(group), '创建成功'
+        except Exception as e:
+            await self.session.rollback()
+            logger.error('创建海贼团失败: %s', e)
+            return False, None, '创建海贼团失败'
+
+    async def update(self, group_id: int, data: dict) -> Tuple[bool, Optional[dict], str]:
+        """更新海贼团信息"""
+        group = await self.session.get(PirateGroup, group_id)
+        if not group:
+            return False, None, '海贼团不存在'
+
+        new_name = data.get('name')
+        if new_name and new_name != group.name and await self._name_taken(new_name):
+            return False, None, f'海贼团名称 {new_name} 已被使用'
+
+        try:
+            for field in self.UPDATABLE_FIELDS:
+                if field in data:
+                    setattr(group, field, data[field])
+
+            versions = await bump_versions(self.session, data_version.GROUP)
+            await self.session.commit()
+            pirate_group_index.add(group.id, group, versions.get(data_version.GROUP))
+            # 船员数据中内嵌了海贼团名称，船员列表一并失效
+            cache.invalidate('group:list', f'group:{group_id}', 'crew:list')
+            logger.info('更新海贼团成功: %s', group.name)
+            return True, PirateGroup.serialize(group), '更新成功'
+        except Exception as e:
+            await self.session.rollback()
+            logger.error('更新海贼团失败: %s', e)
+            return False, None, '更新海贼团失败'
+
+    async def delete(self, group_id: int) -> Tuple[bool, None, str]:
+        """删除海贼团（仍有船员时拒绝）"""
+        group = await self.session.get(PirateGroup, group_id)
+        if not group:
+            return False, None, '海贼团不存在'
+
+        members = await self.session.scalar(
+            select(func.count(CrewMember.id)).where(CrewMember.pirate_group_id == group_id)
+        )
+        if members > 0:
+            return False, None, f'海贼团 {group.name} 下还有船员，无法删除'
+
+        try:
+            name = group.name
+            await self.session.execute(
+                delete(PirateGroup).where(PirateGroup.id == group_id),
+                execution_options={'synchronize_session': False}
+            )
+            versions = await bump_versions(self.session, data_version.GROUP)
+            await self.session.commit()
+            pirate_group_index.remove(group_id, versions.get(data_version.GROUP))
+            cache.invalidate('group:list', f'group:{group_id}')
+            logger.info('删除海贼团成功: %s', name)
+            return True, None, f'海贼团 {name} 已删除'
+        except Exception as e:
+            await self.session.rollback()
+            logger.error('删除海贼团失败: %s', e)
+            return False, None, '删除海贼团失败'
+
+    @cache.cached('group.search', tags=lambda page, *a, **kw: ['group:list'])
+    async def search(self, keyword: str, limit: Optional[int] = None,
+                     after: Optional[str] = None) -> Tuple[bool, Optional[dict], str]:
+        """搜索海贼团（进程内倒排索引，按相关度排序）"""
+        if not keyword:
+            return False, None, '搜索关键词不能为空'
+
+        try:
+            scope = f'search:{keyword}'
+            limit, offset = clamp_limit(limit), cursor_offset(after, scope)
+
+            await ensure_search_indexes(self.session)
+            ids, total = pirate_group_index.search(keyword, offset, limit)
+
+            groups = list((await self.session.execute(
+                select(PirateGroup).where(PirateGroup.id.in_(ids))
+            )).scalars()) if ids else []
+            rank = {group_id: i for i, group_id in enumerate(ids)}
+            groups.sort(key=lambda g: rank[g.id])
+
+            next_cursor = offset_cursor(scope, offset + limit) if offset + limit < total else None
+            page = {'items': [PirateGroup.serialize(g) for g in groups], 'next_cursor': next_cursor}
+            return True, page, f'搜索到 {total} 个海贼团'
+        except CursorError as e:
+            return False, None, str(e)
+        except Exception as e:
+            logger.error('搜索海贼团失败: %s', e)
+            return False, None, '搜索失败'
+
+    @cache.cached('group.get_members', tags=lambda members, group_id: [f'group:{group_id}'])
+    async def get_members(self, group_id: int) -> Tuple[bool, List[dict], str]:
+        """获取海贼团的所有船员"""
+        group = await self.session.get(PirateGroup, group_id)
+        if not group:
+            return False, [], '海贼团不存在'
+
+        members = await self._members(group_id)
+        return True, members, f'{group.name} 共有 {len(members)} 名船员'
+
+    @cache.cached('group.get_bounty_totals', tags=lambda totals: ['group:list', 'crew:list'])
+    async def get_bounty_totals(self) -> Tuple[bool, List[dict], str]:
+        """按海贼团汇总船员悬赏金（数据库 SUM/COUNT 聚合）"""
+        try:
+            crew_total = func.coalesce(func.sum(CrewMember.bounty_value), 0)
+            rows = (await self.session.execute(
+                select(
+                    PirateGroup.id,
+                    PirateGroup.name,
+                    PirateGroup.total_bounty,
+                    crew_total.label('crew_bounty_total'),
+                    func.count(CrewMember.id).label('crew_count')
+                ).outerjoin(
+                    CrewMember, CrewMember.pirate_group_id == PirateGroup.id
+                ).group_by(
+                    PirateGroup.id, PirateGroup.name, PirateGroup.total_bounty
+                ).order_by(crew_total.desc(), PirateGroup.id)
+            )).all()
+
+            totals = [{
+                'pirate_group_id': r.id,
+                'pirate_group_name': r.name,
+                'total_bounty': r.total_bounty,
+                'crew_bounty_total': int(r.crew_bounty_total),
+                'crew_bounty_total_text': format_bounty(int(r.crew_bounty_total)),
+                'crew_count': r.crew_count
+            } for r in rows]
+            return True, totals, f'共统计 {len(totals)} 个海贼团'
+        except Exception as e:
+            logger.error('统计海贼团悬赏金失败: %s', e)
+            return False, [], '统计悬赏金失败'
+
+    async def iter_export(self) -> AsyncIterator[dict]:
+        """按主键顺序逐行产出海贼团数据（流式结果集分批拉取）"""
+        columns = [PirateGroup.id] + [getattr(PirateGroup, c) for c in self.EXPORT_COLUMNS[1:]]
+        rows = await self.session.stream(
+            select(*columns).order_by(PirateGroup.id).execution_options(yield_per=self.EXPORT_BATCH_SIZE)
+        )
+        async for row in rows:
+            yield PirateGroup.serialize(row)
+
+    async def _members(self, group_id: int) -> List[dict]:
+        rows = await self.session.execute(
+            CrewMember.list_select().where(CrewMember.pirate_group_id == group_id).order_by(CrewMember.id)
+        )
+        return [CrewMember.row_to_dict(r) for r in rows]
+
+    async def _name_taken(self, name: str) -> bool:
+        return (await self.session.execute(
+            select(PirateGroup.id).where(PirateGroup.name == name).limit(1)
+        )).first() is not None
+
+
+class AsyncAuthService(AuthService):
+    """
+    认证服务类（异步）
+
+    token 校验缓存与注销列表沿用 AuthService；注销列表由 ASGI 应用的后台任务定期调用
+    load_revocations 加载，verify_token 不访问数据库
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._next_reload = float('inf')
+
+    def reload_revocations(self):
+        """同步加载不适用于事件循环，由 load_revocations 代替"""
+
+    async def load_revocations(self, session: AsyncSession):
+        self._replace_revocations((await session.execute(self._revocations_select())).all())
+
+    async def login(self, session: AsyncSession, username: str, password: str) -> Tuple[bool, Optional[dict], str]:
+        """
+        用户登录（密码校验在哈希线程池中执行，不阻塞事件循环）
+
+        Raises:
+            PasswordHasherBusy: 密码校验线程池已满
+        """
+        logger.info('尝试登录: %s', username)
+
+        # 非字符串（如 JSON 中的数字）同样视为未填写，不进入哈希计算
+        if not isinstance(username, str) or not isinstance(password, str) or not username or not password:
+            return False, None, '用户名和密码不能为空'
+
+        user = (await session.execute(select(User).where(User.username == username).limit(1))).scalar()
+        if not await password_hasher.verify_async(password, user.password if user else None) or not user:
+            logger.warning('登录失败: %s', username)
+            return False, None, '用户名或密码错误'
+        if password_hasher.needs_rehash(user.password):
+            await self._rehash_async(session, user, password)
+
+        token = self._generate_token(user.id, username)
+        logger.info('登录成功: %s', username)
+
+        return True, {
+            'token': token,
+            'user': user.to_dict()
+        }, '登录成功'
+
+    async def revoke(self, session: AsyncSession, token: str) -> Tuple[bool, Optional[dict], str]:
+        """注销 Token（登出）"""
+        try:
+            record, payload = self._revocation_record(token)
+        except jwt.InvalidTokenError:
+            return False, None, '无效的token'
+
+        try:
+            await session.execute(
+                delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow()),
+                execution_options={'synchronize_session': False}
+            )
+            if await session.get(RevokedToken, record.digest) is None:
+                session.add(record)
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            logger.error('注销token失败: %s', e)
+            return False, None, f'注销失败: {str(e)}'
+
+        self._revoked(record.digest, payload)
+        return True, None, '已退出登录'
+
+    @staticmethod
+    async def _rehash_async(session: AsyncSession, user: User, password: str):
+        try:
+            user.password = await asyncio.wrap_future(password_hasher.submit(password_hasher.hash, password))
+            await session.commit()
+            logger.info('已升级密码哈希: %s', user.username)
+        except PasswordHasherBusy:
+            return
+        except Exception as e:
+            await session.rollback()
+            logger.error('升级密码哈希失败: %s', e)
@@ -0,0 +1,482 @@
+"""
+ASGI 视图 - 与 crew / pirate_group / index / common 蓝图相同的路由、参数与响应
+
+路由名与 Flask 端点名一致（如 crew.get_all），指标标签和基准场景共用
+"""
+from functools import wraps
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from onepiece.asgi.response import conditional, error, not_found, success, unauthorized
+from onepiece.asgi.services import AsyncCrewService, AsyncPirateGroupService
+from onepiece.services import CrewService, PirateGroupService
+from onepiece.utils.bulk import read_bulk_items
+from onepiece.utils.data_version import CREW, GROUP
+from onepiece.utils.cache import cache
+from onepiece.utils.db_pool import pool_monitor
+from onepiece.utils.export import EXPORT_FORMATS, csv_stream_async, ndjson_stream_async
+from onepiece.utils.metrics import CONTENT_TYPE, metrics
+from onepiece.utils.password import PasswordHasherBusy
+
+
+def _int_arg(request, name):
+    """与 request.args.get(name, type=int) 相同：缺失或不是整数时返回 None"""
+    try:
+        return int(request.query_params[name])
+    except (KeyError, ValueError):
+        return None
+
+
+async def _json(request):
+    """与 request.get_json(silent=True) 相同：请求体不是 JSON 时返回 None"""
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+async def run_sync(request, fn, *args):
+    """
+    在线程池中以 Flask 应用上下文调用同步 Service
+
+    批量写接口按块提交、逐条汇总结果，逻辑较重且调用频率低，直接复用同步实现
+    """
+    flask_app = request.app.state.flask_app
+
+    def call():
+        with flask_app.app_context():
+            return fn(*args)
+
+    return await run_in_threadpool(call)
+
+
+def login_required(endpoint):
+    """校验 Authorization 头中的 token，通过后用户信息放在 request.state.current_user"""
+
+    @wraps(endpoint)
+    async def wrapper(request):
+        auth = request.app.state.auth
+        ok, user, message = auth.verify_token(request.headers.get('Authorization', ''))
+        if not ok:
+            return unauthorized(message)
+        request.state.current_user = user
+        return await endpoint(request)
+
+    return wrapper
+
+
+# ---------- common ----------
+
+async def ping(request):
+    """健康检查"""
+    return success(message='pong')
+
+
+async def version(request):
+    """获取版本信息"""
+    return success(data={'version': '1.0.0'})
+
+
+async def cache_stats(request):
+    """Service 缓存命中统计"""
+    return success(data=cache.stats())
+
+
+async def pool_stats(request):
+    """异步引擎的连接池状态（当前 worker 进程）"""
+    return success(data=pool_monitor.stats(request.app.state.db.engine.sync_engine))
+
+
+async def metrics_text(request):
+    """运行指标（Prometheus 文本格式，当前 worker 进程）"""
+    return Response(metrics.render(), headers={'Content-Type': CONTENT_TYPE})
+
+
+# ---------- index（认证） ----------
+
+async def login(request):
+    """用户登录 POST /api/auth/login"""
+    data = await _json(request) or {}
+
+    try:
+        async with request.app.state.db.session() as session:
+            ok, result, message = await request.app.state.auth.login(
+                session, data.get('username'), data.get('password'))
+    except PasswordHasherBusy as e:
+        response = error(str(e), 503)
+        response.headers['Retry-After'] = '1'
+        return response
+
+    if ok:
+        return success(data=result, message=message)
+    return unauthorized(message)
+
+
+@login_required
+async def verify(request):
+    """验证token GET /api/auth/verify"""
+    return success(data=request.state.current_user)
+
+
+@login_required
+async def logout(request):
+    """退出登录（注销当前 token） POST /api/auth/logout"""
+    async with request.app.state.db.session() as session:
+        ok, _, message = await request.app.state.auth.revoke(session, request.headers.get('Authorization', ''))
+
+    if ok:
+        return success(message=message)
+    return error(message, 500)
+
+
+# ---------- crew ----------
+
+@conditional(CREW, GROUP)
+async def crew_get_all(request):
+    """获取船员列表 GET /api/crew?pirate_group_id=&min_bounty=&max_bounty=&limit=&after=&sort="""
+    async with request.app.state.db.session() as session:
+        ok, result, message = await AsyncCrewService(session).get_all(
+            _int_arg(request, 'pirate_group_id'),
+            limit=_int_arg(request, 'limit'),
+            after=request.query_params.get('after'),
+            sort=request.query_params.get('sort'),
+            min_bounty=_int_arg(request, 'min_bounty'),
+            max_bounty=_int_arg(request, 'max_bounty')
+        )
+
+    if ok:
+        return success(data=result['items'], message=message, next_cursor=result['next_cursor'])
+    return error(message)
+
+
+@conditional(CREW, GROUP)
+async def crew_get_one(request):
+    """获取船员详情 GET /api/crew/<id>"""
+    async with request.app.state.db.session() as session:
+        ok, result, message = await AsyncCrewService(session).get_by_id(request.path_params['member_id'])
+
+    if ok:
+        return success(data=result)
+    return not_found(message)
+
+
+async def crew_create(request):
+    """创建船员 POST /api/crew"""
+    data = await _json(request) or {}
+    async with request.app.state.db.session() as session:
+        ok, result, message = await AsyncCrewService(session).create(data)
+
+    if ok:
+        response = success(data=result, message=message)
+        response.status_code = 201
+        return response
+    return error(message)
+
+
+async def crew_update(request):
+    """更新船员 PUT /api/crew/<id>"""
+    data = await _json(request) or {}
+    async with request.app.state.db.session() as session:
+        ok, result, message = await AsyncCrewService(session).update(request.path_params['member_id'], data)
+
+    if ok:
+        return success(data=result, message=message)
+    return not_found(message) if '不存在' in message else error(message)
+
+
+async def crew_delete(request):
+    """删除船员 DELETE /api/crew/<id>"""
+    async with request.app.state.db.session() as session:
+        ok, _, message = await AsyncCrewService(session).delete(request.path_params['member_id'])
+
+    if ok:
+        return success(message=message)
+    return not_found(message)
+
+
+async def crew_export(request):
+    """流式导出船员 GET /api/crew/export?format=ndjson|csv&pirate_group_id="""
+    fmt = request.query_params.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return error(f'不支持的导出格式: {fmt}')
+
+    db, pirate_group_id = request.app.state.db, _int_arg(request, 'pirate_group_id')
+
+    async def records():
+        # 会话随响应体一起结束
+        async with db.session() as session:
+            async for record in AsyncCrewService(session).iter_export(pirate_group_id):
+                yield record
+
+    if fmt == 'csv':
+        body = csv_stream_async(records(), AsyncCrewService.EXPORT_COLUMNS)
+    else:
+        body = ndjson_stream_async(records())
+
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename=crew.{fmt}'}
+    )
+
+
+async def crew_bulk_create(request):
+    """批量创建船员 POST /api/crew/bulk  body: [{...}] 或 {"items": [...]}"""
+    items = read_bulk_items(await _json(request))
+    if items is None:
+        return error('请求体应为数组或 {"items": [...]}')
+
+    ok, result, message = await run_sync(request, CrewService().bulk_create, items)
+
+    if ok:
+        return success(data=result, message=message)
+    return error(message)
+
+
+async def crew_bulk_update(request):
+    """批量更新船员 PUT /api/crew/bulk  body: [{"id": 1, ...}] 或 {"items": [...]}"""
+    items = read_bulk_items(await _json(request))
+    if items is None:
+        return error('请求体应为数组或 {"items": [...]}')
+
+    ok, result, message = await run_sync(request, CrewService().bulk_update, items)
+
+    if ok:
+        return success(data=result, message=message)
+    return error(message)
+
+
+async def crew_bulk_delete(request):
+    """批量删除船员 DELETE /api/crew/bulk  body: [1, 2] 或 {"ids": [...]}"""
+    ids = read_bulk_items(await _json(request), key='ids')
+    if ids is None:
+        return error('请求体应为数组或 {"ids": [...]}')
+
+    ok, result, message = await run_sync(request, CrewService().bulk_delete, ids)
+
+    if ok:
+        return success(data=result, message=message)
+    return error(message)
+
+
+@conditional(CREW, GROUP)
+async def crew_search(request):
+    """搜索船员 GET /api/crew/search?q=keyword&limit=&after="""
+    async with request.app.state.db.session() as session:
+        ok, result, message = await AsyncCrewService(session).search(
+            request.query_params.get('q', ''),
+            limit=_int_arg(request, 'limit'),
+            after=request.query_params.get('after')
+        )
+
+    if ok:
+        return success(data=result['items'], message=message, next_cursor=result['next_cursor'])
+    return error(message)
+
+
+# ---------- pirate_group ----------
+
+@conditional(GROUP)
+async def group_get_all(request):
+    """获取海贼团列表 GET /api/pirate-groups?limit=&after=&sort="""
+    async with request.app.state.db.session() as session:
+        ok, result, message = await AsyncPirateGroupService(session).get_all(
+            limit=_int_arg(request, 'limit'),
+            after=request.query_params.get('after'),
+            sort=request.query_params.get('sort')
+        )
+
+    if ok:
+        return success(data=result['items'], message=message, next_cursor=result['next_cursor'])
+    return error(message)
+
+
+@conditional(GROUP, CREW)
+async def group_bounty_totals(request):
+    """海贼团悬赏金汇总 GET /api/pirate-groups/bounty-totals"""
+    async with request.app.state.db.session() as session:
+        ok, result, message = await AsyncPirateGroupService(session).get_bounty_totals()
+
+    if ok:
+        return success(data=result, message=message)
+    return error(message)
+
+
+@conditional(GROUP, CREW)
+async def group_get_one(request):
+    """获取海贼团详情 GET /api/pirate-groups/<id>"""
+    include_members = request.query_params.get('include_members', 'false').lower() == 'true'
+    async with request.app.state.db.session() as session:
+        ok, result, message = await AsyncPirateGroupService(session).get_by_id(
+            request.path_params['group_id'], include_members=include_members)
+
+    if ok:
+        return success(data=result)
+    return not_found(message)
+
+
+async def group_create(request):
+    """创建海贼团 POST /api/pirate-groups"""
+    data = await _json(request) or {}
+    async with request.app.state.db.session() as session:
+        ok, result, message = await AsyncPirateGroupService(session).create(data)
+
+    if ok:
+        response = success(data=result, message=message)
+        response.status_code = 201
+        return response
+    return error(message)
+
+
+async def group_update(request):
+    """更新海贼团 PUT /api/pirate-groups/<id>"""
+    data = await _json(request) or {}
+    async with request.app.state.db.session() as session:
+        ok, result, message = await AsyncPirateGroupService(session).update(request.path_params['group_id'], data)
+
+    if ok:
+        return success(data=result, message=message)
+    return not_found(message) if '不存在' in message else error(message)
+
+
+async def group_delete(request):
+    """删除海贼团 DELETE /api/pirate-groups/<id>"""
+    async with request.app.state.db.session() as session:
+        ok, _, message = await AsyncPirateGroupService(session).delete(request.path_params['group_id'])
+
+    if ok:
+        return success(message=message)
+    if '不存在' in message:
+        return not_found(message)
+    return error(message)
+
+
+async def group_export(request):
+    """流式导出海贼团 GET /api/pirate-groups/export?format=ndjson|csv"""
+    fmt = request.query_params.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return error(f'不支持的导出格式: {fmt}')
+
+    db = request.app.state.db
+
+    async def records():
+        async with db.session() as session:
+            async for record in AsyncPirateGroupService(session).iter_export():
+                yield record
+
+    if fmt == 'csv':
+        body = csv_stream_async(records(), AsyncPirateGroupService.EXPORT_COLUMNS)
+    else:
+        body = ndjson_stream_async(records())
+
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename=pirate_groups.{fmt}'}
+    )
+
+
+async def group_bulk_create(request):
+    """批量创建海贼团 POST /api/pirate-groups/bulk  body: [{...}] 或 {"items": [...]}"""
+    items = read_bulk_items(await _json(request))
+    if items is None:
+        return error('请求体应为数组或 {"items": [...]}')
+
+    ok, result, message = await run_sync(request, PirateGroupService().bulk_create, items)
+
+    if ok:
+        return success(data=result, message=message)
+    return error(message)
+
+
+async def group_bulk_update(request):
+    """批量更新海贼团 PUT /api/pirate-groups/bulk  body: [{"id": 1, ...}] 或 {"items": [...]}"""
+    items = read_bulk_items(await _json(request))
+    if items is None:
+        return error('请求体应为数组或 {"items": [...]}')
+
+    ok, result, message = await run_sync(request, PirateGroupService().bulk_update, items)
+
+    if ok:
+        return success(data=result, message=message)
+    return error(message)
+
+
+async def group_bulk_delete(request):
+    """批量删除海贼团 DELETE /api/pirate-groups/bulk  body: [1, 2] 或 {"ids": [...]}"""
+    ids = read_bulk_items(await _json(request), key='ids')
+    if ids is None:
+        return error('请求体应为数组或 {"ids": [...]}')
+
+    ok, result, message = await run_sync(request, PirateGroupService().bulk_delete, ids)
+
+    if ok:
+        return success(data=result, message=message)
+    return error(message)
+
+
+@conditional(GROUP)
+async def group_search(request):
+    """搜索海贼团 GET /api/pirate-groups/search?q=keyword&limit=&after="""
+    async with request.app.state.db.session() as session:
+        ok, result, message = await AsyncPirateGroupService(session).search(
+            request.query_params.get('q', ''),
+            limit=_int_arg(request, 'limit'),
+            after=request.query_params.get('after')
+        )
+
+    if ok:
+        return success(data=result['items'], message=message, next_cursor=result['next_cursor'])
+    return error(message)
+
+
+@conditional(GROUP, CREW)
+async def group_get_members(request):
+    """获取海贼团船员 GET /api/pirate-groups/<id>/members"""
+    async with request.app.state.db.session() as session:
+        ok, result, message = await AsyncPirateGroupService(session).get_members(request.path_params['group_id'])
+
+    if ok:
+        return success(data=result, message=message)
+    return not_found(message)
+
+
+ROUTES = [
+    Route('/api/common/ping', ping, methods=['GET'], name='common.ping'),
+    Route('/api/common/version', version, methods=['GET'], name='common.version'),
+    Route('/api/common/cache-stats', cache_stats, methods=['GET'], name='common.cache_stats'),
+    Route('/api/common/pool-stats', pool_stats, methods=['GET'], name='common.pool_stats'),
+    Route('/api/common/metrics', metrics_text, methods=['GET'], name='common.metrics_text'),
+
+    Route('/api/auth/login', login, methods=['POST'], name='index.login'),
+    Route('/api/auth/verify', verify, methods=['GET'], name='index.verify'),
+    Route('/api/auth/logout', logout, methods=['POST'], name='index.logout'),
+
+    Route('/api/crew', crew_get_all, methods=['GET'], name='crew.get_all'),
+    Route('/api/crew', crew_create, methods=['POST'], name='crew.create'),
+    Route('/api/crew/export', crew_export, methods=['GET'], name='crew.export'),
+    Route('/api/crew/search', crew_search, methods=['GET'], name='crew.search'),
+    Route('/api/crew/bulk', crew_bulk_create, methods=['POST'], name='crew.bulk_create'),
+    Route('/api/crew/bulk', crew_bulk_update, methods=['PUT'], name='crew.bulk_update'),
+    Route('/api/crew/bulk', crew_bulk_delete, methods=['DELETE'], name='crew.bulk_delete'),
+    Route('/api/crew/{member_id:int}', crew_get_one, methods=['GET'], name='crew.get_one'),
+    Route('/api/crew/{member_id:int}', crew_update, methods=['PUT'], name='crew.update'),
+    Route('/api/crew/{member_id:int}', crew_delete, methods=['DELETE'], name='crew.delete'),
+
+    Route('/api/pirate-groups', group_get_all, methods=['GET'], name='pirate_group.get_all'),
+    Route('/api/pirate-groups', group_create, methods=['POST'], name='pirate_group.create'),
+    Route('/api/pirate-groups/bounty-totals', group_bounty_totals, methods=['GET'],
+          name='pirate_group.bounty_totals'),
+    Route('/api/pirate-groups/export', group_export, methods=['GET'], name='pirate_group.export'),
+    Route('/api/pirate-groups/search', group_search, methods=['GET'], name='pirate_group.search'),
+    Route('/api/pirate-groups/bulk', group_bulk_create, methods=['POST'], name='pirate_group.bulk_create'),
+    Route('/api/pirate-groups/bulk', group_bulk_update, methods=['PUT'], name='pirate_group.bulk_update'),
+    Route('/api/pirate-groups/bulk', group_bulk_delete, methods=['DELETE'], name='pirate_group.bulk_delete'),
+    Route('/api/pirate-groups/{group_id:int}', group_get_one, methods=['GET'], name='pirate_group.get_one'),
+    Route('/api/pirate-groups/{group_id:int}', group_update, methods=['PUT'], name='pirate_group.update'),
+    Route('/api/pirate-groups/{group_id:int}', group_delete, methods=['DELETE'], name='pirate_group.delete'),
+    Route('/api/pirate-groups/{group_id:int}/members', group_get_members, methods=['GET'],
+          name='pirate_group.get_members'),
+]
@@ -0,0 +1,179 @@
+"""
+命令行工具 - 通过 flask --app onepiece.app <命令> 调用
+"""
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from onepiece.models import db, CrewMember, PirateGroup
+from onepiece.migrations import applied_versions, load_migrations, migrate
+from onepiece.migrations.operations import backfill_bounty_values
+from onepiece.models.database import init_db
+from onepiece.services.import_service import (
+    DEFAULT_IMPORT_BATCH_SIZE, IMPORT_FORMATS, ImportService, detect_format, iter_records
+)
+from onepiece.services.seed_service import DEFAULT_SEED_BATCH_SIZE, SeedService
+from onepiece.utils.assets import assets
+from onepiece.utils.cache import cache
+from onepiece.utils.index_advisor import DEFAULT_MIN_ROWS, QueryRecorder, advise, run_service_workload
+from onepiece.utils.password import calibrate, format_params, hash_password
+
+
+def register_commands(app):
+    """注册所有命令到 Flask CLI"""
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(migrate_command)
+    app.cli.add_command(backfill_bounty)
+    app.cli.add_command(import_data)
+    app.cli.add_command(seed)
+    app.cli.add_command(advise_indexes)
+    app.cli.add_command(tune_password_hash)
+    app.cli.add_command(build_assets_command)
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """建表、补齐新增列并写入默认数据（部署时在启动服务前执行，可重复执行）"""
+    init_db()
+
+
+@click.command('migrate')
+@click.option('--status', is_flag=True, help='只列出各迁移的执行状态')
+@with_appcontext
+def migrate_command(status):
+    """执行尚未执行的数据库迁移（onepiece/migrations）"""
+    if status:
+        applied = applied_versions()
+        for module in load_migrations():
+            state = f'已执行 {applied[module.VERSION]:%Y-%m-%d %H:%M}' if module.VERSION in applied else '待执行'
+            click.echo(f'{module.VERSION:04d}  {state:<24}{module.DESCRIPTION}')
+        return
+
+    done = migrate()
+    for item in done:
+        click.echo(f'✅ {item["version"]:04d} {item["description"]}（{item["duration_ms"]}ms）')
+    if not done:
+        click.echo('ℹ️  没有待执行的迁移')
+
+
+@click.command('backfill-bounty')
+@click.option('--batch-size', default=1000, show_default=True, help='每批更新的行数')
+@with_appcontext
+def backfill_bounty(batch_size):
+    """补齐历史数据的数值悬赏金列（一次性任务，可重复执行）"""
+    migrate()
+    for model, text_col, value_col in [
+        (CrewMember, 'bounty', 'bounty_value'),
+        (PirateGroup, 'total_bounty', 'total_bounty_value'),
+    ]:
+        table = model.__table__
+        count = backfill_bounty_values(table, table.c[text_col], table.c[value_col], batch_size)
+        click.echo(f'✅ {table.name}: 已回填 {count} 行')
+
+
+@click.command('import-data')
+@click.argument('target', type=click.Choice(['crew', 'groups']))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(IMPORT_FORMATS), help='文件格式，默认按扩展名推断')
+@click.option('--batch-size', default=DEFAULT_IMPORT_BATCH_SIZE, show_default=True, help='每批插入的行数')
+@click.option('--offset', default=0, show_default=True, help='跳过前 N 条记录（中断后续传）')
+@with_appcontext
+def import_data(target, path, fmt, batch_size, offset):
+    """从 CSV / NDJSON 文件批量导入船员或海贼团（字段与 export 接口一致）"""
+    fmt = fmt or detect_format(path)
+    if fmt is None:
+        raise click.UsageError('无法从扩展名推断格式，请指定 --format')
+
+    def progress(stats):
+        click.echo(f'... offset={stats["offset"]} 已导入 {stats["inserted"]} 行 '
+                   f'跳过 {stats["rejected"]} 行 {stats["rows_per_sec"]} 行/秒')
+
+    service = ImportService(batch_size)
+    run = service.import_crew if target == 'crew' else service.import_groups
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        ok, stats, message = run(iter_records(f, fmt), offset=offset, on_batch=progress)
+
+    for item in stats['errors']:
+        click.echo(f'  第 {item["record"]} 条: {item["message"]}')
+    if not ok:
+        raise click.ClickException(message)
+    click.echo(f'✅ {message}，{stats["rows_per_sec"]} 行/秒')
+
+
+@click.command('seed')
+@click.option('--groups', default=100, show_default=True, help='海贼团数量')
+@click.option('--members', default=100, show_default=True, help='每个海贼团的船员数量')
+@click.option('--seed', 'seed_value', default=42, show_default=True, help='随机种子，相同参数生成相同数据')
+@click.option('--batch-size', default=DEFAULT_SEED_BATCH_SIZE, show_default=True, help='每批插入的船员数')
+@with_appcontext
+def seed(groups, members, seed_value, batch_size):
+    """生成 groups × members 规模的模拟数据（压测 / 基准测试用）"""
+    migrate()
+
+    def progress(stats):
+        click.echo(f'... 已生成 {stats["groups"]} 个海贼团 {stats["members"]} 名船员 {stats["rows_per_sec"]} 行/秒')
+
+    ok, stats, message = SeedService(batch_size).seed(groups, members, seed_value, on_batch=progress)
+    if not ok:
+        raise click.ClickException(message)
+    click.echo(f'✅ {message}，{stats["rows_per_sec"]} 行/秒')
+
+
+@click.command('advise-indexes')
+@click.option('--min-rows', default=DEFAULT_MIN_ROWS, show_default=True, help='行数少于该值的表不给建议')
+@click.option('--repeat', default=3, show_default=True, help='代表性负载的轮数')
+@with_appcontext
+def advise_indexes(min_rows, repeat):
+    """执行各 Service 的代表性查询，检查执行计划并给出缺失索引建议"""
+    backend, cache.backend = cache.backend, None
+    try:
+        with QueryRecorder(db.engine) as recorder:
+            run_service_workload(repeat)
+    finally:
+        cache.backend = backend
+
+    ddl = {}
+    for item in advise(db.engine, recorder.shapes, min_rows):
+        if not item['suggestions']:
+            continue
+        problems = ', '.join(f'{table or "-"}:{kind}' for table, kind in item['problems'])
+        click.echo(f'[{item["count"]} 次 / {item["total_ms"]}ms] {problems}')
+        click.echo(f'    {item["fingerprint"][:200]}')
+        for suggestion in item['suggestions']:
+            click.echo(f'    -> {suggestion["ddl"]}')
+            ddl.setdefault(suggestion['ddl'], item['total_ms'])
+
+    if not ddl:
+        click.echo('✅ 未发现需要新增的索引')
+        return
+    click.echo('\n建议的索引（确认后写成 onepiece/migrations 下的迁移）:')
+    for statement in ddl:
+        click.echo(f'  {statement};')
+
+
+@click.command('tune-password-hash')
+@click.option('--target-ms', default=None, type=int, help='单次哈希的目标耗时，默认取 PASSWORD_HASH_TARGET_MS')
+@with_appcontext
+def tune_password_hash(target_ms):
+    """在本机测量并输出密码哈希参数（多机部署时写入 PASSWORD_HASH_PARAMS 固定下来）"""
+    target_ms = target_ms or current_app.config['PASSWORD_HASH_TARGET_MS']
+    params = calibrate(target_ms)
+    started = time.perf_counter()
+    hash_password('tune-password-hash', params)
+    elapsed = (time.perf_counter() - started) * 1000
+    click.echo(f'PASSWORD_HASH_PARAMS={format_params(params)}  # 单次约 {elapsed:.0f}ms（目标 {target_ms}ms）')
+
+
+@click.command('build-assets')
+@with_appcontext
+def build_assets_command():
+    """为 frontend/ 下的静态资源加指纹并预压缩（gzip / brotli），输出到 ASSETS_DIR"""
+    started = time.perf_counter()
+    stats = assets.build()
+    compressed = '，'.join(f'{encoding} {size / 1024:.1f}KB' for encoding, size in stats['compressed'].items() if size)
+    click.echo(f'✅ 已构建 {stats["files"]} 个文件（{stats["bytes"] / 1024:.1f}KB'
+               f'{"，压缩后 " + compressed if compressed else ""}）-> {assets.output_dir}，'
+               f'耗时 {time.perf_counter() - started:.1f}s')
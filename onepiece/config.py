@@ -2,6 +2,7 @@
 应用配置文件
 """
 import os
+import multiprocessing
 
 
 class Config:
@@ -13,9 +14,100 @@ class Config:
     MYSQL_DATABASE = os.getenv('MYSQL_DATABASE', 'onepiece_db')
 
     # SQLAlchemy配置
-    SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}?charset=utf8mb4"
+    # DATABASE_URL 可整体覆盖连接串（如基准测试使用 sqlite:///bench.db）
+    SQLALCHEMY_DATABASE_URI = os.getenv(
+        'DATABASE_URL',
+        f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}?charset=utf8mb4"
+    )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ECHO = True  # 开发环境打印SQL语句
+    # 逐条打印 SQL 开销大、输出噪声多，默认关闭，仅本地排查时开启；日常使用下方的慢查询日志
+    SQLALCHEMY_ECHO = os.getenv('SQLALCHEMY_ECHO', 'false').lower() == 'true'
+
+    # SQL 监控：慢查询阈值（毫秒）、同一指纹慢查询日志的最短间隔（秒）、
+    # N+1 检测的请求抽样比例（0 关闭）与同一语句在单个请求内的告警次数
+    SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', 200))
+    SLOW_QUERY_LOG_INTERVAL = int(os.getenv('SLOW_QUERY_LOG_INTERVAL', 10))
+    QUERY_SAMPLE_RATE = float(os.getenv('QUERY_SAMPLE_RATE', 0.1))
+    N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', 10))
+
+    # 连接池配置（每个 worker 进程一个池）：同时占用的连接数上限为 DB_POOL_SIZE + DB_MAX_OVERFLOW，
+    # 一般不小于 WEB_THREADS；DB_POOL_RECYCLE 需小于 MySQL 的 wait_timeout
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+
+    # Service 读缓存配置：auto | memory（进程内 LRU+TTL）| redis（多进程共享）| none
+    # memory 的失效只作用于执行写入的进程：多 worker 时其他 worker 在 CACHE_TTL 内仍返回旧数据，
+    # flask import-data / seed 等命令行进程的写入同样要等条目过期。
+    # auto：单进程用 memory；多进程（SERVER_PROCESSES > 1）时设置了 CACHE_REDIS_URL 用 redis，否则不缓存；
+    # 多进程下显式配置 memory 时启动日志给出警告
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'auto')
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 60))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 10000))
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', '')
+    # 条件 GET 使用的数据版本号在缓存中保留的秒数（0 为每次查询数据库）；本进程（redis 时为所有进程）
+    # 的 API 写入立即使其失效，命令行进程与其他 worker（memory）的写入最长在此时间内才反映到 ETag
+    CACHE_VERSION_TTL = float(os.getenv('CACHE_VERSION_TTL', 1))
+
+    # 日志配置：LOG_FORMAT = json | text；请求头/请求体 DEBUG 转储按 LOG_REQUEST_SAMPLE_RATE 抽样
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+    LOG_REQUEST_SAMPLE_RATE = float(os.getenv('LOG_REQUEST_SAMPLE_RATE', 0.01))
+
+    # JSON 编码实现：auto（已安装 orjson 时使用）| orjson | stdlib，输出字节相同
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto')
+
+    # 运行指标采集（/api/common/metrics）
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+
+    # 服务进程数，由 onepiece.server / onepiece.asgi 按 worker 数设置（开发服务器、命令行为 1）
+    SERVER_PROCESSES = int(os.getenv('SERVER_PROCESSES', 1))
+
+    # 生产服务配置（python -m onepiece.server）
+    WEB_BIND = os.getenv('WEB_BIND', '0.0.0.0:8080')
+    WEB_WORKERS = int(os.getenv('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+    WEB_THREADS = int(os.getenv('WEB_THREADS', 1))
+    WEB_TIMEOUT = int(os.getenv('WEB_TIMEOUT', 30))
+    WEB_GRACEFUL_TIMEOUT = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 30))
+    WEB_KEEPALIVE = int(os.getenv('WEB_KEEPALIVE', 5))
+    WEB_MAX_REQUESTS = int(os.getenv('WEB_MAX_REQUESTS', 10000))
+    WEB_ACCESS_LOG = os.getenv('WEB_ACCESS_LOG', 'false').lower() == 'true'
+
+    # ASGI 服务配置（python -m onepiece.asgi）：单进程内由事件循环处理并发请求，进程数一般等于 CPU 核数；
+    # 异步连接串默认由 SQLALCHEMY_DATABASE_URI 换成对应的异步驱动（aiomysql / aiosqlite）
+    ASGI_WORKERS = int(os.getenv('ASGI_WORKERS', multiprocessing.cpu_count()))
+    ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL', '')
+
+    # 密码哈希：PASSWORD_HASH_PARAMS 为空时按 PASSWORD_HASH_TARGET_MS（毫秒）在本机自动调参；
+    # 校验在每进程 PASSWORD_HASH_WORKERS 个线程中执行，排队 + 计算中超过 PASSWORD_HASH_MAX_PENDING 时直接拒绝。
+    # 仅对 WEB_THREADS > 1 与 ASGI 模式生效；同步 worker 一次只处理一个请求，直接在请求线程中计算
+    PASSWORD_HASH_PARAMS = os.getenv('PASSWORD_HASH_PARAMS', '')
+    PASSWORD_HASH_TARGET_MS = int(os.getenv('PASSWORD_HASH_TARGET_MS', 50))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 4))
+
+    # 图片变体（/images/<文件>?w=&fmt=，需安装 Pillow）：宽度档位、编码质量、磁盘缓存目录
+    # （默认 instance/image-cache）与大小上限；列表接口的 thumbnail_url 使用 IMAGE_THUMBNAIL_* 参数
+    IMAGE_WIDTHS = tuple(int(w) for w in os.getenv('IMAGE_WIDTHS', '120,240,480,960').split(','))
+    IMAGE_QUALITY = int(os.getenv('IMAGE_QUALITY', 80))
+    IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR', '')
+    IMAGE_CACHE_MAX_BYTES = int(os.getenv('IMAGE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    IMAGE_THUMBNAIL_WIDTH = int(os.getenv('IMAGE_THUMBNAIL_WIDTH', 240))
+    IMAGE_THUMBNAIL_FORMAT = os.getenv('IMAGE_THUMBNAIL_FORMAT', 'webp')
+    # 生成图片地址时源文件哈希的复用秒数，期间替换的源图最长在此时间后才换用新地址
+    IMAGE_DIGEST_TTL = float(os.getenv('IMAGE_DIGEST_TTL', 5))
+
+    # 前端静态资源：build-assets 的输出目录（默认 instance/assets）；
+    # ASSETS_OFFLOAD = x-accel-redirect（nginx）| x-sendfile | 空（由 worker 发送）
+    ASSETS_DIR = os.getenv('ASSETS_DIR', '')
+    ASSETS_OFFLOAD = os.getenv('ASSETS_OFFLOAD', '')
+    ASSETS_ACCEL_PREFIX = os.getenv('ASSETS_ACCEL_PREFIX', '/_assets/')
 
     # JWT配置
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-change-this-in-production')
+    # 已验证 token 的进程内缓存条数（0 关闭）；注销列表从数据库重新加载的间隔（秒），
+    # 即其他 worker 上的登出在本进程生效的最长延迟
+    AUTH_TOKEN_CACHE_SIZE = int(os.getenv('AUTH_TOKEN_CACHE_SIZE', 10000))
+    AUTH_REVOCATION_RELOAD_SECONDS = int(os.getenv('AUTH_REVOCATION_RELOAD_SECONDS', 30))
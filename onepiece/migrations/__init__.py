@@ -0,0 +1,102 @@
+"""
+版本化数据库迁移
+
+db.create_all() 只会创建缺失的表，已有表的结构变更（加列、加索引）写成迁移：
+mNNNN_<说明>.py 定义 VERSION、DESCRIPTION 和 upgrade()，并登记到 MIGRATIONS。
+已执行的版本记录在 schema_migrations 表，flask migrate 只执行尚未执行的迁移。
+
+迁移需可重复执行（先检查再变更）：全新数据库上 create_all 已按模型建好的列和索引会被跳过
+"""
+import importlib
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table
+
+from onepiece.models.database import db
+
+logger = logging.getLogger(__name__)
+
+# 按版本顺序登记的迁移模块
+MIGRATIONS = (
+    'm0001_bounty_values',
+    'm0002_crew_list_indexes',
+    'm0003_hash_passwords',
+    'm0004_revoked_tokens',
+    'm0005_data_versions',
+    'm0006_backfill_bounty_values',
+)
+
+# 多个实例同时部署时只允许一个执行迁移（MySQL 命名锁）
+LOCK_NAME = 'onepiece_schema_migrations'
+LOCK_TIMEOUT = 300
+
+schema_migrations = Table(
+    'schema_migrations', MetaData(),
+    Column('version', Integer, primary_key=True, autoincrement=False),
+    Column('description', String(200), nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+    Column('duration_ms', Integer, nullable=False)
+)
+
+
+def load_migrations() -> list:
+    """按版本排序的迁移模块"""
+    modules = [importlib.import_module(f'onepiece.migrations.{name}') for name in MIGRATIONS]
+    versions = [m.VERSION for m in modules]
+    if versions != sorted(set(versions)):
+        raise RuntimeError(f'迁移版本号必须唯一且递增: {versions}')
+    return modules
+
+
+def applied_versions() -> dict:
+    """已执行的迁移 {版本: applied_at}"""
+    schema_migrations.create(db.engine, checkfirst=True)
+    with db.engine.connect() as conn:
+        return {r.version: r.applied_at for r in conn.execute(schema_migrations.select())}
+
+
+def pending() -> list:
+    applied = applied_versions()
+    return [m for m in load_migrations() if m.VERSION not in applied]
+
+
+def migrate() -> List[dict]:
+    """
+    依次执行尚未执行的迁移（需在应用上下文中调用）
+
+    Returns:
+        List[dict]: 本次执行的迁移 [{'version', 'description', 'duration_ms'}]
+    """
+    done = []
+    with _migration_lock():
+        for module in pending():
+            started = time.perf_counter()
+            module.upgrade()
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            with db.engine.begin() as conn:
+                conn.execute(schema_migrations.insert().values(
+                    version=module.VERSION, description=module.DESCRIPTION,
+                    applied_at=datetime.utcnow(), duration_ms=duration_ms
+                ))
+            logger.info('已执行迁移 %04d %s（%dms）', module.VERSION, module.DESCRIPTION, duration_ms)
+            done.append({'version': module.VERSION, 'description': module.DESCRIPTION, 'duration_ms': duration_ms})
+    return done
+
+
+@contextmanager
+def _migration_lock():
+    if db.engine.dialect.name != 'mysql':
+        yield
+        return
+    with db.engine.connect() as conn:
+        if not conn.execute(db.text('SELECT GET_LOCK(:name, :timeout)'),
+                            {'name': LOCK_NAME, 'timeout': LOCK_TIMEOUT}).scalar():
+            raise RuntimeError('等待迁移锁超时，可能有其他实例正在执行迁移')
+        try:
+            yield
+        finally:
+            conn.execute(db.text('SELECT RELEASE_LOCK(:name)'), {'name': LOCK_NAME})
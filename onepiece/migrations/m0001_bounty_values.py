@@ -0,0 +1,18 @@
+"""
+船员 / 海贼团增加数值悬赏金列（排序、范围筛选、汇总用）
+"""
+from onepiece.migrations.operations import ensure_column
+
+VERSION = 1
+DESCRIPTION = '增加 bounty_value / total_bounty_value 列'
+
+
+def upgrade():
+    from onepiece.models import CrewMember, PirateGroup
+
+    for table, column_name in [
+        (CrewMember.__table__, 'bounty_value'),
+        (PirateGroup.__table__, 'total_bounty_value'),
+    ]:
+        if ensure_column(table, table.c[column_name]):
+            print(f"✅ 已添加列 {table.name}.{column_name}（数据由迁移 0006 回填）")
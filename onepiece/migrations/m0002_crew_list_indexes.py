@@ -0,0 +1,19 @@
+"""
+船员列表的复合索引（flask advise-indexes 的建议）
+
+- (pirate_group_id, id)：按海贼团筛选 + 按 id 翻页，以及海贼团成员列表
+- (created_at, id)：按创建时间排序的 keyset 翻页
+"""
+from onepiece.migrations.operations import ensure_index
+
+VERSION = 2
+DESCRIPTION = '船员列表复合索引 (pirate_group_id, id) / (created_at, id)'
+
+
+def upgrade():
+    from onepiece.models import CrewMember
+
+    indexes = {index.name: index for index in CrewMember.__table__.indexes}
+    for name in ('ix_crew_members_pirate_group_id_id', 'ix_crew_members_created_at_id'):
+        if ensure_index(indexes[name]):
+            print(f"✅ 已创建索引 {name}")
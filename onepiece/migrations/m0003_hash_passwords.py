@@ -0,0 +1,33 @@
+"""
+把 users 表中的历史明文密码替换为哈希（按主键分批，只处理尚未哈希的行）
+"""
+from onepiece.models.database import db
+from onepiece.utils.password import is_hashed, password_hasher
+
+VERSION = 3
+DESCRIPTION = '历史明文密码改为哈希存储'
+
+BATCH_SIZE = 500
+
+
+def upgrade():
+    from onepiece.models import User
+
+    table = User.__table__
+    stmt = table.update().where(table.c.id == db.bindparam('b_id')).values(password=db.bindparam('b_password'))
+    last_id, total = 0, 0
+    while True:
+        rows = db.session.execute(
+            db.select(table.c.id, table.c.password).where(table.c.id > last_id).order_by(table.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        updates = [{'b_id': r.id, 'b_password': password_hasher.hash(r.password)}
+                   for r in rows if not is_hashed(r.password)]
+        if updates:
+            db.session.execute(stmt, updates)
+            db.session.commit()
+            total += len(updates)
+        last_id = rows[-1].id
+    if total:
+        print(f"✅ 已哈希 {total} 个用户的明文密码")
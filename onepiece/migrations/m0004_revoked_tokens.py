@@ -0,0 +1,13 @@
+"""
+新增 revoked_tokens 表（登出后的 token 注销列表）
+"""
+from onepiece.models.database import db
+
+VERSION = 4
+DESCRIPTION = '新增 token 注销表'
+
+
+def upgrade():
+    from onepiece.models import RevokedToken
+
+    RevokedToken.__table__.create(db.engine, checkfirst=True)
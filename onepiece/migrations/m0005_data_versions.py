@@ -0,0 +1,15 @@
+"""
+新增 data_versions 表（搜索索引等进程内数据感知其他进程写入的版本号）
+"""
+from onepiece.models.database import db
+
+VERSION = 5
+DESCRIPTION = '新增数据版本号表'
+
+
+def upgrade():
+    from onepiece.models import DataVersion
+    from onepiece.utils.data_version import ensure_rows
+
+    DataVersion.__table__.create(db.engine, checkfirst=True)
+    ensure_rows()
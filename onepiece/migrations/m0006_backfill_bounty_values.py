@@ -0,0 +1,25 @@
+"""
+回填历史数据的数值悬赏金列（bounty_value / total_bounty_value）
+
+迁移 0001 只加列；未回填时悬赏金筛选、排序与汇总会漏掉这些行。
+按主键分批，只处理数值列为空的行，可重复执行；flask backfill-bounty 仍可用于全量重算
+"""
+from onepiece.migrations.operations import backfill_bounty_values
+
+VERSION = 6
+DESCRIPTION = '回填数值悬赏金列'
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    from onepiece.models import CrewMember, PirateGroup
+
+    for table, text_column, value_column in [
+        (CrewMember.__table__, 'bounty', 'bounty_value'),
+        (PirateGroup.__table__, 'total_bounty', 'total_bounty_value'),
+    ]:
+        count = backfill_bounty_values(table, table.c[text_column], table.c[value_column], BATCH_SIZE,
+                                       missing_only=True)
+        if count:
+            print(f"✅ {table.name}: 已回填 {count} 行")
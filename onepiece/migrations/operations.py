@@ -0,0 +1,68 @@
+"""
+迁移操作 - 可重复执行的加列 / 加索引（已存在时跳过）与数值列回填
+"""
+from sqlalchemy.schema import CreateIndex
+
+from onepiece.models.database import db
+from onepiece.utils import data_version
+from onepiece.utils.bounty import parse_bounty
+
+
+def ensure_column(table, column) -> bool:
+    """表中缺少该列时执行 ALTER TABLE 补上（含索引），返回是否有变更"""
+    inspector = db.inspect(db.engine)
+    if column.name in {c['name'] for c in inspector.get_columns(table.name)}:
+        return False
+
+    column_type = column.type.compile(dialect=db.engine.dialect)
+    with db.engine.begin() as conn:
+        conn.execute(db.text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+    for index in table.indexes:
+        if column.name in index.columns:
+            ensure_index(index)
+    return True
+
+
+def ensure_index(index) -> bool:
+    """
+    索引不存在时创建，返回是否有变更
+
+    MySQL 使用 ALGORITHM=INPLACE, LOCK=NONE 在线建索引，建索引期间表仍可读写
+    """
+    inspector = db.inspect(db.engine)
+    if index.name in {i['name'] for i in inspector.get_indexes(index.table.name)}:
+        return False
+
+    ddl = str(CreateIndex(index).compile(dialect=db.engine.dialect))
+    if db.engine.dialect.name == 'mysql':
+        ddl += ' ALGORITHM=INPLACE LOCK=NONE'
+    with db.engine.begin() as conn:
+        conn.execute(db.text(ddl))
+    return True
+
+
+def backfill_bounty_values(table, text_column, value_column, batch_size: int = 1000, missing_only: bool = False) -> int:
+    """
+    按主键分批解析悬赏金文本列并批量写回数值列，每批一个事务，返回处理的行数
+
+    missing_only 时只处理数值列为空、文本列不为空的行（迁移中使用，可重复执行）
+    """
+    id_column = table.c.id
+    stmt = table.update().where(id_column == db.bindparam('b_id')).values(
+        {value_column.name: db.bindparam('b_value')}
+    )
+    query = db.select(id_column, text_column)
+    if missing_only:
+        query = query.where(value_column.is_(None), text_column.isnot(None))
+
+    last_id, total = 0, 0
+    while True:
+        rows = db.session.execute(query.where(id_column > last_id).order_by(id_column).limit(batch_size)).all()
+        if not rows:
+            return total
+
+        db.session.execute(stmt, [{'b_id': r[0], 'b_value': parse_bounty(r[1])} for r in rows])
+        data_version.bump(data_version.TABLE_SCOPES[table.name])
+        db.session.commit()
+        last_id = rows[-1][0]
+        total += len(rows)
@@ -5,5 +5,7 @@ from onepiece.models.database import db, init_db
 from onepiece.models.user import User
 from onepiece.models.crew_member import CrewMember
 from onepiece.models.pirate_group import PirateGroup
+from onepiece.models.revoked_token import RevokedToken
+from onepiece.models.data_version import DataVersion
 
-__all__ = ['db', 'init_db', 'User', 'CrewMember', 'PirateGroup']
+__all__ = ['db', 'init_db', 'User', 'CrewMember', 'PirateGroup', 'RevokedToken', 'DataVersion']
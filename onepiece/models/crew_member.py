@@ -1,17 +1,28 @@
 """
 船员模型 - SQLAlchemy ORM
 """
+from sqlalchemy.orm import validates
+
 from onepiece.models.database import db
+from onepiece.utils.bounty import parse_bounty
+from onepiece.utils.images import image_variants
 from datetime import datetime
 
 
 class CrewMember(db.Model):
     __tablename__ = 'crew_members'
+    # 列表热点查询的复合索引（已有库通过迁移 m0002 补建）
+    __table_args__ = (
+        db.Index('ix_crew_members_pirate_group_id_id', 'pirate_group_id', 'id'),
+        db.Index('ix_crew_members_created_at_id', 'created_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(100), nullable=False, index=True)
     role = db.Column(db.String(100), nullable=False)
     bounty = db.Column(db.String(50), nullable=False)
+    # 由 bounty 解析出的贝里数，用于排序、范围筛选和 SUM 汇总
+    bounty_value = db.Column(db.BigInteger, index=True)
     image_url = db.Column(db.String(500))
     description = db.Column(db.Text)
     devil_fruit = db.Column(db.String(200))
@@ -26,21 +37,68 @@ class CrewMember(db.Model):
     def __repr__(self):
         return f'<CrewMember {self.name}>'
 
+    @validates('bounty')
+    def _sync_bounty_value(self, key, value):
+        """写入展示文本时同步解析出数值"""
+        self.bounty_value = parse_bounty(value)
+        return value
+
     def to_dict(self):
+        return self.serialize(self, self.pirate_group.name if self.pirate_group else None)
+
+    @classmethod
+    def list_query(cls):
+        """
+        列表查询：只取序列化所需的列，并 LEFT JOIN 海贼团名称
+
+        返回的是轻量 Row 而不是 ORM 对象，整页只需一条 SQL，配合 row_to_dict 使用
+        """
+        from onepiece.models.pirate_group import PirateGroup
+
+        return db.session.query(*cls._list_columns()).outerjoin(
+            PirateGroup, cls.pirate_group_id == PirateGroup.id)
+
+    @classmethod
+    def list_select(cls):
+        """与 list_query 相同的列和连接，以 select() 形式返回（异步会话使用）"""
+        from onepiece.models.pirate_group import PirateGroup
+
+        return db.select(*cls._list_columns()).outerjoin(
+            PirateGroup, cls.pirate_group_id == PirateGroup.id)
+
+    @classmethod
+    def _list_columns(cls):
+        from onepiece.models.pirate_group import PirateGroup
+
+        return (
+            cls.id, cls.name, cls.role, cls.bounty, cls.image_url, cls.description,
+            cls.devil_fruit, cls.haki_types, cls.special_skills, cls.signature_moves,
+            cls.pirate_group_id, cls.created_at, cls.bounty_value,
+            PirateGroup.name.label('pirate_group_name')
+        )
+
+    @classmethod
+    def row_to_dict(cls, row):
+        """将 list_query 的结果行序列化，输出与 to_dict 完全一致"""
+        return cls.serialize(row, row.pirate_group_name)
+
+    @staticmethod
+    def serialize(src, pirate_group_name):
         return {
-            'id': self.id,
-            'name': self.name,
-            'role': self.role,
-            'bounty': self.bounty,
-            'image_url': self.image_url,
-            'description': self.description,
+            'id': src.id,
+            'name': src.name,
+            'role': src.role,
+            'bounty': src.bounty,
+            'image_url': src.image_url,
+            'thumbnail_url': image_variants.thumbnail_url(src.image_url),
+            'description': src.description,
             'abilities': {
-                'devil_fruit': self.devil_fruit,
-                'haki_types': self.haki_types,
-                'special_skills': self.special_skills,
-                'signature_moves': self.signature_moves
+                'devil_fruit': src.devil_fruit,
+                'haki_types': src.haki_types,
+                'special_skills': src.special_skills,
+                'signature_moves': src.signature_moves
             },
-            'pirate_group_id': self.pirate_group_id,
-            'pirate_group_name': self.pirate_group.name if self.pirate_group else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
\ No newline at end of file
+            'pirate_group_id': src.pirate_group_id,
+            'pirate_group_name': pirate_group_name,
+            'created_at': src.created_at.isoformat() if src.created_at else None
+        }
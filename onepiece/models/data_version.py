@@ -0,0 +1,14 @@
+"""
+数据版本号模型 - 每张业务表一行，写事务提交前在同一事务内递增
+"""
+from onepiece.models.database import db
+
+
+class DataVersion(db.Model):
+    __tablename__ = 'data_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<DataVersion {self.name}={self.version}>'
@@ -13,9 +13,14 @@ def init_db():
     from onepiece.models.user import User
     from onepiece.models.crew_member import CrewMember
     from onepiece.models.pirate_group import PirateGroup
+    from onepiece.models.revoked_token import RevokedToken
+    from onepiece.models.data_version import DataVersion
 
-    # 创建所有表
+    from onepiece.migrations import migrate
+
+    # 创建缺失的表，再执行尚未执行的迁移（已有表的加列、加索引）
     db.create_all()
+    migrate()
     print("✅ 数据表创建成功")
 
     # 初始化默认数据
@@ -29,11 +34,9 @@ def init_users():
     from onepiece.models.user import User
 
     if User.query.count() == 0:
-        users = [
-            User(username='admin', password='admin123'),
-            User(username='user', password='user123')
-        ]
-        for user in users:
+        for username, password in [('admin', 'admin123'), ('user', 'user123')]:
+            user = User(username=username)
+            user.set_password(password)
             db.session.add(user)
         db.session.commit()
         print("✅ 默认用户创建成功")
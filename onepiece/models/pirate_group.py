@@ -1,7 +1,10 @@
 """
 海贼团模型 - SQLAlchemy ORM
 """
+from sqlalchemy.orm import validates
+
 from onepiece.models.database import db
+from onepiece.utils.bounty import parse_bounty
 from datetime import datetime
 
 
@@ -13,6 +16,7 @@ class PirateGroup(db.Model):
     captain = db.Column(db.String(100), nullable=False)
     ship_name = db.Column(db.String(100))
     total_bounty = db.Column(db.String(50))
+    total_bounty_value = db.Column(db.BigInteger)
     flag_description = db.Column(db.String(200))
     origin = db.Column(db.String(50))
     member_count = db.Column(db.Integer, default=0)
@@ -25,21 +29,37 @@ class PirateGroup(db.Model):
     def __repr__(self):
         return f'<PirateGroup {self.name}>'
 
+    @validates('total_bounty')
+    def _sync_total_bounty_value(self, key, value):
+        """写入展示文本时同步解析出数值"""
+        self.total_bounty_value = parse_bounty(value)
+        return value
+
     def to_dict(self, include_members=False):
-        data = {
-            'id': self.id,
-            'name': self.name,
-            'captain': self.captain,
-            'ship_name': self.ship_name,
-            'total_bounty': self.total_bounty,
-            'flag_description': self.flag_description,
-            'origin': self.origin,
-            'member_count': self.member_count,
-            'description': self.description,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        data = self.serialize(self)
 
         if include_members:
-            data['members'] = [member.to_dict() for member in self.crew_members]
+            from onepiece.models.crew_member import CrewMember
 
-        return data
\ No newline at end of file
+            rows = CrewMember.list_query().filter(
+                CrewMember.pirate_group_id == self.id
+            ).order_by(CrewMember.id)
+            data['members'] = [CrewMember.row_to_dict(row) for row in rows]
+
+        return data
+
+    @staticmethod
+    def serialize(src):
+        """序列化 ORM 对象或包含同名列的结果行"""
+        return {
+            'id': src.id,
+            'name': src.name,
+            'captain': src.captain,
+            'ship_name': src.ship_name,
+            'total_bounty': src.total_bounty,
+            'flag_description': src.flag_description,
+            'origin': src.origin,
+            'member_count': src.member_count,
+            'description': src.description,
+            'created_at': src.created_at.isoformat() if src.created_at else None
+        }
@@ -0,0 +1,17 @@
+"""
+已注销 token 模型 - 只保存 token 的 sha256 摘要，过期后可删除
+"""
+from onepiece.models.database import db
+from datetime import datetime
+
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+
+    digest = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<RevokedToken {self.digest[:12]}>'
@@ -2,6 +2,7 @@
 用户模型 - SQLAlchemy ORM
 """
 from onepiece.models.database import db
+from onepiece.utils.password import check_password, password_hasher
 from datetime import datetime
 
 
@@ -28,6 +29,10 @@ class User(db.Model):
         """根据用户名查找用户"""
         return cls.query.filter_by(username=username).first()
 
+    def set_password(self, password):
+        """以当前参数哈希后保存"""
+        self.password = password_hasher.hash(password)
+
     def verify_password(self, password):
-        """验证密码"""
-        return self.password == password
\ No newline at end of file
+        """验证密码（在调用线程中同步计算；登录走 AuthService 的线程池）"""
+        return check_password(password, self.password)
\ No newline at end of file
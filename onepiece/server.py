@@ -0,0 +1,109 @@
+"""
+生产环境服务入口 - 基于 gunicorn 的多进程（可选多线程）服务
+
+    python -m onepiece.server
+
+- master 进程预加载应用（preload）并预建搜索索引，worker 通过 fork 共享已加载的代码、索引等数据；
+  worker 搜索前比对 data_versions 中的版本号，其他进程写入后在本进程重建索引
+- 建表与默认数据不在启动时执行，部署时先运行 flask --app onepiece.app init-db
+- fork 之后每个 worker 丢弃继承来的数据库连接池，各自重新建立连接
+- SIGHUP：平滑重启所有 worker。应用在 master 中预加载，新 worker 沿用 master 启动时的应用与配置，
+  修改环境变量、配置或代码后需完整重启；SIGTERM：停止接收新连接，
+  等待进行中的请求在 WEB_GRACEFUL_TIMEOUT 内处理完再退出
+- worker/线程数等参数见 Config 中的 WEB_* 配置
+"""
+import logging
+
+from gunicorn.app.base import BaseApplication
+
+from onepiece.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def post_fork(server, worker):
+    """
+    worker fork 后丢弃从 master 继承的连接，避免多个进程共用同一个 socket；
+    日志监听线程不会随 fork 复制，需在 worker 内重新启动
+    """
+    from onepiece.models import db
+    from onepiece.utils.log_config import log_pipeline
+
+    log_pipeline.restart()
+
+    app = server.app.load()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    logger.info('worker %s 已就绪', worker.pid)
+
+
+def worker_abort(worker):
+    logger.error('worker %s 处理超时被终止', worker.pid)
+
+
+def build_options(config=Config) -> dict:
+    """由配置生成 gunicorn 参数"""
+    threads = config.WEB_THREADS
+    return {
+        'bind': config.WEB_BIND,
+        'workers': config.WEB_WORKERS,
+        'threads': threads,
+        'worker_class': 'gthread' if threads > 1 else 'sync',
+        'preload_app': True,
+        'timeout': config.WEB_TIMEOUT,
+        'graceful_timeout': config.WEB_GRACEFUL_TIMEOUT,
+        'keepalive': config.WEB_KEEPALIVE,
+        'max_requests': config.WEB_MAX_REQUESTS,
+        'max_requests_jitter': config.WEB_MAX_REQUESTS // 10,
+        'accesslog': '-' if config.WEB_ACCESS_LOG else None,
+        'post_fork': post_fork,
+        'worker_abort': worker_abort,
+    }
+
+
+class OnePieceServer(BaseApplication):
+    """在进程内启动 gunicorn，无需额外的配置文件"""
+
+    def __init__(self, options: dict = None):
+        self.options = options or build_options()
+        self.application = None
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if value is not None and key in self.cfg.settings:
+                self.cfg.set(key, value)
+
+    def load(self):
+        if self.application is None:
+            from onepiece.app import create_app
+            # 各 worker 的进程内数据（缓存等）互不共享，据此选择缓存后端
+            self.application = create_app({'SERVER_PROCESSES': self.options['workers']})
+            preload_search_indexes(self.application)
+            # 密码哈希参数在 master 中测量一次，worker 继承结果
+            from onepiece.utils.password import password_hasher
+            password_hasher.warm_up()
+        return self.application
+
+
+def preload_search_indexes(app):
+    """fork 前构建索引供 worker 共享；数据库不可用时不阻塞启动，首次搜索时再构建"""
+    from onepiece.models import db
+    from onepiece.utils.search_index import build_search_indexes
+
+    with app.app_context():
+        try:
+            build_search_indexes()
+        except Exception as e:
+            logger.warning('启动时构建搜索索引失败，将在首次搜索时重试: %s', e)
+        finally:
+            db.session.remove()
+
+
+def main():
+    OnePieceServer().run()
+
+
+if __name__ == '__main__':
+    main()
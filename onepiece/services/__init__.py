@@ -3,6 +3,8 @@ Service 层 - 业务逻辑处理
 """
 from onepiece.services.auth_service import AuthService
 from onepiece.services.crew_service import CrewService
+from onepiece.services.import_service import ImportService
 from onepiece.services.pirate_group_service import PirateGroupService
+from onepiece.services.seed_service import SeedService
 
-__all__ = ['AuthService', 'CrewService', 'PirateGroupService']
+__all__ = ['AuthService', 'CrewService', 'ImportService', 'PirateGroupService', 'SeedService']
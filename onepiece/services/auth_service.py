@@ -1,22 +1,40 @@
 """
 认证服务 - 处理用户认证相关业务逻辑
 """
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Tuple
 import jwt
 import logging
+import secrets
+import threading
+import time
 
+from onepiece.models.database import db
+from onepiece.models.revoked_token import RevokedToken
 from onepiece.models.user import User
+from onepiece.utils.password import PasswordHasherBusy, password_hasher
+from onepiece.utils.token_cache import RevocationList, TokenCache, token_digest
 
 logger = logging.getLogger(__name__)
 
 
 class AuthService:
-    """认证服务类"""
+    """
+    认证服务类
 
-    def __init__(self, secret_key: str, token_expiry_hours: int = 24):
+    每个应用一个实例（见 onepiece.utils.auth），已验证的 token 缓存在进程内，
+    注销列表每 revocation_reload_seconds 秒从数据库重新加载一次（其他进程的登出在此间隔内生效）
+    """
+
+    def __init__(self, secret_key: str, token_expiry_hours: int = 24,
+                 token_cache_size: int = 10000, revocation_reload_seconds: int = 30):
         self.secret_key = secret_key
         self.token_expiry_hours = token_expiry_hours
+        self.token_cache = TokenCache(token_cache_size)
+        self.revocations = RevocationList()
+        self.revocation_reload_seconds = revocation_reload_seconds
+        self._next_reload = 0.0
+        self._reload_lock = threading.Lock()
 
     def login(self, username: str, password: str) -> Tuple[bool, Optional[dict], str]:
         """
@@ -28,19 +46,26 @@ class AuthService:
 
         Returns:
             Tuple[bool, Optional[dict], str]: (成功标志, 数据, 消息)
+
+        Raises:
+            PasswordHasherBusy: 密码校验线程池已满
         """
-        logger.info(f'尝试登录: {username}')
+        logger.info('尝试登录: %s', username)
 
-        if not username or not password:
+        # 非字符串（如 JSON 中的数字）同样视为未填写，不进入哈希计算
+        if not isinstance(username, str) or not isinstance(password, str) or not username or not password:
             return False, None, '用户名和密码不能为空'
 
         user = User.find_by_username(username)
-        if not user or not user.verify_password(password):
-            logger.warning(f'登录失败: {username}')
+        # 用户不存在时同样计算一次哈希，耗时不暴露用户名是否存在
+        if not password_hasher.verify(password, user.password if user else None) or not user:
+            logger.warning('登录失败: %s', username)
             return False, None, '用户名或密码错误'
+        if password_hasher.needs_rehash(user.password):
+            self._rehash(user, password)
 
         token = self._generate_token(user.id, username)
-        logger.info(f'登录成功: {username}')
+        logger.info('登录成功: %s', username)
 
         return True, {
             'token': token,
@@ -56,6 +81,8 @@ class AuthService:
 
         Returns:
             Tuple[bool, Optional[dict], str]: (成功标志, 用户信息, 消息)
+
+        验证通过的结果按 token 摘要缓存到 token 过期，重复验证不再解码和校验签名
         """
         if not token:
             return False, None, '未提供token'
@@ -64,25 +91,130 @@ class AuthService:
         if token.startswith('Bearer '):
             token = token[7:]
 
+        if time.monotonic() >= self._next_reload:
+            self.reload_revocations()
+
+        digest = token_digest(token)
+        if digest in self.revocations:
+            return False, None, 'token已注销'
+
+        user = self.token_cache.get(digest)
+        if user is not None:
+            return True, user, 'token有效'
+
         try:
-            payload = jwt.decode(
-                token,
-                self.secret_key,
-                algorithms=['HS256']
-            )
-            return True, {
-                'user_id': payload.get('user_id'),
-                'username': payload.get('username')
-            }, 'token有效'
+            payload = self._decode(token)
         except jwt.ExpiredSignatureError:
             return False, None, 'token已过期'
         except jwt.InvalidTokenError:
             return False, None, '无效的token'
 
+        user = {
+            'user_id': payload.get('user_id'),
+            'username': payload.get('username')
+        }
+        self.token_cache.set(digest, user, payload['exp'])
+        return True, user, 'token有效'
+
+    def revoke(self, token: str) -> Tuple[bool, Optional[dict], str]:
+        """
+        注销 Token（登出）：写入注销表，本进程立即生效
+
+        Args:
+            token: JWT token (可包含 Bearer 前缀)
+
+        Returns:
+            Tuple[bool, Optional[dict], str]: (成功标志, None, 消息)
+        """
+        try:
+            record, payload = self._revocation_record(token)
+        except jwt.InvalidTokenError:
+            return False, None, '无效的token'
+
+        try:
+            RevokedToken.query.filter(RevokedToken.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+            if db.session.get(RevokedToken, record.digest) is None:
+                db.session.add(record)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error('注销token失败: %s', e)
+            return False, None, f'注销失败: {str(e)}'
+
+        self._revoked(record.digest, payload)
+        return True, None, '已退出登录'
+
+    def reload_revocations(self):
+        """从数据库加载未过期的注销记录；多个线程同时到期时只由一个线程加载"""
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._replace_revocations(db.session.execute(self._revocations_select()).all())
+        except Exception as e:
+            db.session.rollback()
+            logger.warning('加载token注销列表失败: %s', e)
+        finally:
+            self._next_reload = time.monotonic() + self.revocation_reload_seconds
+            self._reload_lock.release()
+
+    def _revocation_record(self, token: str) -> Tuple[RevokedToken, dict]:
+        """
+        校验 token 并生成注销记录（不写库）
+
+        Raises:
+            jwt.InvalidTokenError: token 无效或已过期
+        """
+        if token and token.startswith('Bearer '):
+            token = token[7:]
+        payload = self._decode(token or '')
+        return RevokedToken(
+            digest=token_digest(token),
+            user_id=payload.get('user_id'),
+            expires_at=datetime.fromtimestamp(payload['exp'], timezone.utc).replace(tzinfo=None)
+        ), payload
+
+    def _revoked(self, digest: str, payload: dict):
+        """注销记录写库后，本进程立即生效"""
+        self.revocations.add(digest, payload['exp'])
+        self.token_cache.discard(digest)
+        logger.info('已注销token: %s', payload.get('username'))
+
+    @staticmethod
+    def _revocations_select():
+        return db.select(RevokedToken.digest, RevokedToken.expires_at).where(
+            RevokedToken.expires_at > datetime.utcnow())
+
+    def _replace_revocations(self, rows):
+        self.revocations.replace({
+            r.digest: r.expires_at.replace(tzinfo=timezone.utc).timestamp() for r in rows
+        })
+
+    def _decode(self, token: str) -> dict:
+        return jwt.decode(
+            token,
+            self.secret_key,
+            algorithms=['HS256'],
+            options={'require': ['exp']}
+        )
+
+    @staticmethod
+    def _rehash(user: User, password: str):
+        """登录成功时把明文或低代价的哈希升级为当前参数；线程池繁忙或写库失败时留到下次登录"""
+        try:
+            user.password = password_hasher.submit(password_hasher.hash, password).result()
+            db.session.commit()
+            logger.info('已升级密码哈希: %s', user.username)
+        except PasswordHasherBusy:
+            return
+        except Exception as e:
+            db.session.rollback()
+            logger.error('升级密码哈希失败: %s', e)
+
     def _generate_token(self, user_id: int, username: str) -> str:
-        """生成 JWT Token"""
+        """生成 JWT Token（jti 保证同一秒内签发的 token 互不相同，注销时互不影响）"""
         return jwt.encode({
             'user_id': user_id,
             'username': username,
+            'jti': secrets.token_hex(8),
             'exp': datetime.utcnow() + timedelta(hours=self.token_expiry_hours)
         }, self.secret_key, algorithm='HS256')
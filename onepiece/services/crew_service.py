@@ -1,12 +1,23 @@
 """
 船员服务 - 处理船员管理相关业务逻辑
 """
-from typing import Optional, Tuple, List
+from types import SimpleNamespace
+from typing import Iterator, Optional, Tuple, List
 import logging
 
 from onepiece.models.database import db
 from onepiece.models.crew_member import CrewMember
 from onepiece.models.pirate_group import PirateGroup
+from onepiece.utils.bounty import parse_bounty
+from onepiece.utils.bulk import (
+    BULK_CHUNK_SIZE, BULK_MAX_ITEMS, bulk_message, bulk_summary, check_types, chunks, is_id
+)
+from onepiece.utils import data_version
+from onepiece.utils.cache import cache
+from onepiece.utils.pagination import (
+    CursorError, clamp_limit, cursor_offset, keyset_page, offset_cursor, parse_sort
+)
+from onepiece.utils.search_index import crew_index, ensure_search_indexes
 
 logger = logging.getLogger(__name__)
 
@@ -14,27 +25,93 @@ logger = logging.getLogger(__name__)
 class CrewService:
     """船员服务类"""
 
-    def get_all(self, pirate_group_id: Optional[int] = None) -> Tuple[bool, List[dict], str]:
+    # 列表接口允许的排序键
+    SORT_FIELDS = {
+        'id': CrewMember.id,
+        'name': CrewMember.name,
+        'bounty': CrewMember.bounty_value,
+        'created_at': CrewMember.created_at
+    }
+
+    # 允许更新的字段
+    UPDATABLE_FIELDS = [
+        'name', 'role', 'bounty', 'image_url', 'description',
+        'devil_fruit', 'haki_types', 'special_skills',
+        'signature_moves', 'pirate_group_id'
+    ]
+
+    # 除字符串外也接受数值（贝里数）的字段
+    NUMERIC_TEXT_FIELDS = ('bounty',)
+
+    @staticmethod
+    def build_fields(data: dict) -> Tuple[Optional[dict], str]:
         """
-        获取船员列表
+        校验创建数据并整理出模型字段（不含海贼团存在性校验）
+
+        Returns:
+            Tuple[Optional[dict], str]: (字段字典, 错误消息)
+        """
+        name = data.get('name')
+        role = data.get('role')
+        if not name or not role:
+            return None, '船员名称和职位不能为空'
+
+        return {
+            'name': name,
+            'role': role,
+            'bounty': data.get('bounty', '0'),
+            'image_url': data.get('image_url'),
+            'description': data.get('description'),
+            'devil_fruit': data.get('devil_fruit'),
+            'haki_types': data.get('haki_types'),
+            'special_skills': data.get('special_skills'),
+            'signature_moves': data.get('signature_moves'),
+            'pirate_group_id': data.get('pirate_group_id')
+        }, ''
+
+    @cache.cached('crew.get_all', tags=lambda page, *a, **kw: ['crew:list'])
+    def get_all(self, pirate_group_id: Optional[int] = None, limit: Optional[int] = None,
+                after: Optional[str] = None, sort: Optional[str] = None,
+                min_bounty: Optional[int] = None, max_bounty: Optional[int] = None) -> Tuple[bool, Optional[dict], str]:
+        """
+        分页获取船员列表（keyset 游标分页）
 
         Args:
             pirate_group_id: 可选，按海贼团筛选
+            limit: 每页条数，默认 DEFAULT_PAGE_SIZE
+            after: 上一页返回的 next_cursor
+            sort: 排序键，如 "id"、"-bounty"
+            min_bounty: 可选，悬赏金下限（贝里，含）
+            max_bounty: 可选，悬赏金上限（贝里，含）
 
         Returns:
-            Tuple[bool, List[dict], str]: (成功标志, 船员列表, 消息)
+            Tuple[bool, Optional[dict], str]: (成功标志, {'items': 船员列表, 'next_cursor': 游标}, 消息)
         """
         try:
-            query = CrewMember.query
+            sort_key, desc = parse_sort(sort, self.SORT_FIELDS)
+            query = CrewMember.list_query()
             if pirate_group_id:
-                query = query.filter_by(pirate_group_id=pirate_group_id)
-
-            members = query.order_by(CrewMember.id).all()
-            return True, [m.to_dict() for m in members], f'获取到 {len(members)} 名船员'
+                query = query.filter(CrewMember.pirate_group_id == pirate_group_id)
+            if min_bounty is not None:
+                query = query.filter(CrewMember.bounty_value >= min_bounty)
+            if max_bounty is not None:
+                query = query.filter(CrewMember.bounty_value <= max_bounty)
+
+            rows, next_cursor = keyset_page(
+                query, self.SORT_FIELDS[sort_key], CrewMember.id,
+                sort_key, desc, clamp_limit(limit), after
+            )
+            page = {'items': [CrewMember.row_to_dict(r) for r in rows], 'next_cursor': next_cursor}
+            return True, page, f'获取到 {len(rows)} 名船员'
+        except CursorError as e:
+            return False, None, str(e)
         except Exception as e:
-            logger.error(f'获取船员列表失败: {e}')
-            return False, [], '获取船员列表失败'
+            logger.error('获取船员列表失败: %s', e)
+            return False, None, '获取船员列表失败'
 
+    @cache.cached('crew.get_by_id', tags=lambda member, member_id: [
+        f'crew:{member_id}', f'group:{member["pirate_group_id"]}'
+    ])
     def get_by_id(self, member_id: int) -> Tuple[bool, Optional[dict], str]:
         """
         根据 ID 获取船员详情
@@ -61,41 +138,30 @@ class CrewService:
             Tuple[bool, Optional[dict], str]: (成功标志, 船员信息, 消息)
         """
         # 验证必填字段
-        name = data.get('name')
-        role = data.get('role')
-        bounty = data.get('bounty', '0')
-
-        if not name or not role:
-            return False, None, '船员名称和职位不能为空'
+        fields, message = self.build_fields(data)
+        if fields is None:
+            return False, None, message
 
         # 验证海贼团是否存在
-        pirate_group_id = data.get('pirate_group_id')
+        pirate_group_id = fields['pirate_group_id']
         if pirate_group_id:
             group = PirateGroup.query.get(pirate_group_id)
             if not group:
                 return False, None, '指定的海贼团不存在'
 
         try:
-            member = CrewMember(
-                name=name,
-                role=role,
-                bounty=bounty,
-                image_url=data.get('image_url'),
-                description=data.get('description'),
-                devil_fruit=data.get('devil_fruit'),
-                haki_types=data.get('haki_types'),
-                special_skills=data.get('special_skills'),
-                signature_moves=data.get('signature_moves'),
-                pirate_group_id=pirate_group_id
-            )
+            member = CrewMember(**fields)
             db.session.add(member)
+            versions = data_version.bump(data_version.CREW)
             db.session.commit()
+            crew_index.add(member.id, member, versions.get(data_version.CREW))
+            cache.invalidate('crew:list', f'group:{pirate_group_id}')
 
-            logger.info(f'创建船员成功: {name}')
+            logger.info('创建船员成功: %s', member.name)
             return True, member.to_dict(), '创建成功'
         except Exception as e:
             db.session.rollback()
-            logger.error(f'创建船员失败: {e}')
+            logger.error('创建船员失败: %s', e)
             return False, None, '创建船员失败'
 
     def update(self, member_id: int, data: dict) -> Tuple[bool, Optional[dict], str]:
@@ -121,23 +187,25 @@ class CrewService:
                 if not group:
                     return False, None, '指定的海贼团不存在'
 
+        old_group_id = member.pirate_group_id
         try:
             # 更新字段
-            updatable_fields = [
-                'name', 'role', 'bounty', 'image_url', 'description',
-                'devil_fruit', 'haki_types', 'special_skills',
-                'signature_moves', 'pirate_group_id'
-            ]
-            for field in updatable_fields:
+            for field in self.UPDATABLE_FIELDS:
                 if field in data:
                     setattr(member, field, data[field])
 
+            versions = data_version.bump(data_version.CREW)
             db.session.commit()
-            logger.info(f'更新船员成功: {member.name}')
+            crew_index.add(member.id, member, versions.get(data_version.CREW))
+            cache.invalidate(
+                'crew:list', f'crew:{member_id}',
+                f'group:{old_group_id}', f'group:{member.pirate_group_id}'
+            )
+            logger.info('更新船员成功: %s', member.name)
             return True, member.to_dict(), '更新成功'
         except Exception as e:
             db.session.rollback()
-            logger.error(f'更新船员失败: {e}')
+            logger.error('更新船员失败: %s', e)
             return False, None, '更新船员失败'
 
     def delete(self, member_id: int) -> Tuple[bool, None, str]:
@@ -155,38 +223,281 @@ class CrewService:
             return False, None, '船员不存在'
 
         try:
-            name = member.name
+            name, group_id = member.name, member.pirate_group_id
             db.session.delete(member)
+            versions = data_version.bump(data_version.CREW)
             db.session.commit()
-            logger.info(f'删除船员成功: {name}')
+            crew_index.remove(member_id, versions.get(data_version.CREW))
+            cache.invalidate('crew:list', f'crew:{member_id}', f'group:{group_id}')
+            logger.info('删除船员成功: %s', name)
             return True, None, f'船员 {name} 已删除'
         except Exception as e:
             db.session.rollback()
-            logger.error(f'删除船员失败: {e}')
+            logger.error('删除船员失败: %s', e)
             return False, None, '删除船员失败'
 
-    def search(self, keyword: str) -> Tuple[bool, List[dict], str]:
+    @cache.cached('crew.search', tags=lambda page, *a, **kw: ['crew:list'])
+    def search(self, keyword: str, limit: Optional[int] = None,
+               after: Optional[str] = None) -> Tuple[bool, Optional[dict], str]:
         """
-        搜索船员
+        搜索船员（进程内倒排索引，按相关度排序）
 
         Args:
-            keyword: 搜索关键词
+            keyword: 搜索关键词，匹配名称/职位/恶魔果实
+            limit: 每页条数
+            after: 上一页返回的 next_cursor
 
         Returns:
-            Tuple[bool, List[dict], str]: (成功标志, 船员列表, 消息)
+            Tuple[bool, Optional[dict], str]: (成功标志, {'items': 船员列表, 'next_cursor': 游标}, 消息)
         """
         if not keyword:
-            return False, [], '搜索关键词不能为空'
+            return False, None, '搜索关键词不能为空'
 
         try:
-            members = CrewMember.query.filter(
-                db.or_(
-                    CrewMember.name.ilike(f'%{keyword}%'),
-                    CrewMember.role.ilike(f'%{keyword}%'),
-                    CrewMember.devil_fruit.ilike(f'%{keyword}%')
-                )
-            ).all()
-            return True, [m.to_dict() for m in members], f'搜索到 {len(members)} 名船员'
+            scope = f'search:{keyword}'
+            limit, offset = clamp_limit(limit), cursor_offset(after, scope)
+
+            ensure_search_indexes()
+            ids, total = crew_index.search(keyword, offset, limit)
+
+            rows = CrewMember.list_query().filter(CrewMember.id.in_(ids)).all() if ids else []
+            rank = {member_id: i for i, member_id in enumerate(ids)}
+            rows.sort(key=lambda r: rank[r.id])
+
+            next_cursor = offset_cursor(scope, offset + limit) if offset + limit < total else None
+            page = {'items': [CrewMember.row_to_dict(r) for r in rows], 'next_cursor': next_cursor}
+            return True, page, f'搜索到 {total} 名船员'
+        except CursorError as e:
+            return False, None, str(e)
         except Exception as e:
-            logger.error(f'搜索船员失败: {e}')
-            return False, [], '搜索失败'
+            logger.error('搜索船员失败: %s', e)
+            return False, None, '搜索失败'
+
+    # 导出时每批从服务端游标拉取的行数
+    EXPORT_BATCH_SIZE = 1000
+
+    # CSV 导出列（嵌套字段以 . 展开）
+    EXPORT_COLUMNS = [
+        'id', 'name', 'role', 'bounty', 'image_url', 'description',
+        'abilities.devil_fruit', 'abilities.haki_types',
+        'abilities.special_skills', 'abilities.signature_moves',
+        'pirate_group_id', 'pirate_group_name', 'created_at'
+    ]
+
+    def iter_export(self, pirate_group_id: Optional[int] = None) -> Iterator[dict]:
+        """
+        按主键顺序逐行产出船员数据，用于流式导出
+
+        使用服务端游标（yield_per）分批拉取，内存占用与总行数无关
+
+        Args:
+            pirate_group_id: 可选，按海贼团筛选
+        """
+        query = CrewMember.list_query()
+        if pirate_group_id:
+            query = query.filter(CrewMember.pirate_group_id == pirate_group_id)
+
+        rows = query.order_by(CrewMember.id).execution_options(yield_per=self.EXPORT_BATCH_SIZE)
+        for row in rows:
+            yield CrewMember.row_to_dict(row)
+
+    def bulk_create(self, items: List[dict]) -> Tuple[bool, Optional[dict], str]:
+        """
+        批量创建船员
+
+        逐条校验必填项与字段类型，海贼团存在性用一次 IN 查询校验，合法数据按 BULK_CHUNK_SIZE
+        分批在各自事务中插入，某一批失败只影响该批。
+
+        Args:
+            items: 船员数据列表
+
+        Returns:
+            Tuple[bool, Optional[dict], str]: (成功标志, {'results': 逐条结果, 'succeeded', 'failed'}, 消息)
+        """
+        if len(items) > BULK_MAX_ITEMS:
+            return False, None, f'单次最多提交 {BULK_MAX_ITEMS} 条'
+
+        results = [None] * len(items)
+        valid = []
+        for i, data in enumerate(items):
+            fields, message = self.build_fields(data) if isinstance(data, dict) else (None, '数据格式错误')
+            if fields is not None:
+                message = check_types(fields, CrewMember.__table__, self.NUMERIC_TEXT_FIELDS)
+            if message:
+                results[i] = {'index': i, 'success': False, 'message': message}
+            else:
+                valid.append((i, fields))
+
+        existing_groups = _existing_group_ids(f['pirate_group_id'] for _, f in valid)
+        pending = []
+        for i, fields in valid:
+            group_id = fields['pirate_group_id']
+            if group_id and group_id not in existing_groups:
+                results[i] = {'index': i, 'success': False, 'message': '指定的海贼团不存在'}
+            else:
+                pending.append((i, fields))
+
+        group_tags = set()
+        for chunk in chunks(pending, BULK_CHUNK_SIZE):
+            members = [CrewMember(**fields) for _, fields in chunk]
+            try:
+                db.session.add_all(members)
+                db.session.flush()
+                # 提交前取出 id，提交后对象过期，再访问属性会逐条重新查询
+                ids = [member.id for member in members]
+                version = data_version.bump(data_version.CREW).get(data_version.CREW)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error('批量创建船员失败: %s', e)
+                for i, _ in chunk:
+                    results[i] = {'index': i, 'success': False, 'message': '创建船员失败'}
+                continue
+
+            for (i, fields), member_id in zip(chunk, ids):
+                crew_index.add(member_id, SimpleNamespace(**fields), version)
+                group_tags.add(f'group:{fields["pirate_group_id"]}')
+                results[i] = {'index': i, 'success': True, 'id': member_id}
+
+        cache.invalidate('crew:list', *group_tags)
+        return True, bulk_summary(results), bulk_message('创建', results)
+
+    def bulk_update(self, items: List[dict]) -> Tuple[bool, Optional[dict], str]:
+        """
+        批量更新船员，每条数据需包含 id
+
+        逐条校验 id 与字段类型，船员与海贼团的存在性各用一次 IN 查询校验，按主键分批执行 executemany UPDATE。
+
+        Args:
+            items: 船员更新数据列表
+
+        Returns:
+            Tuple[bool, Optional[dict], str]: (成功标志, {'results': 逐条结果, 'succeeded', 'failed'}, 消息)
+        """
+        if len(items) > BULK_MAX_ITEMS:
+            return False, None, f'单次最多提交 {BULK_MAX_ITEMS} 条'
+
+        results = [None] * len(items)
+        ids = [d.get('id') for d in items if isinstance(d, dict) and is_id(d.get('id'))]
+        old_groups = dict(
+            db.session.query(CrewMember.id, CrewMember.pirate_group_id).filter(CrewMember.id.in_(ids)).all()
+        ) if ids else {}
+        existing_groups = _existing_group_ids(
+            d.get('pirate_group_id') for d in items if isinstance(d, dict)
+        )
+
+        pending = []
+        for i, data in enumerate(items):
+            member_id = data.get('id') if isinstance(data, dict) else None
+            if not is_id(member_id):
+                results[i] = {'index': i, 'id': member_id, 'success': False, 'message': 'id 应为整数'}
+                continue
+            if member_id not in old_groups:
+                results[i] = {'index': i, 'id': member_id, 'success': False, 'message': '船员不存在'}
+                continue
+            row = {field: data[field] for field in self.UPDATABLE_FIELDS if field in data}
+            message = check_types(row, CrewMember.__table__, self.NUMERIC_TEXT_FIELDS)
+            if message:
+                results[i] = {'index': i, 'id': member_id, 'success': False, 'message': message}
+                continue
+            group_id = row.get('pirate_group_id')
+            if group_id and group_id not in existing_groups:
+                results[i] = {'index': i, 'id': member_id, 'success': False, 'message': '指定的海贼团不存在'}
+                continue
+            if any(field in row and not row[field] for field in ('name', 'role')):
+                results[i] = {'index': i, 'id': member_id, 'success': False, 'message': '船员名称和职位不能为空'}
+                continue
+
+            if 'bounty' in row:
+                row['bounty_value'] = parse_bounty(row['bounty'])
+            row['id'] = member_id
+            pending.append((i, row))
+
+        tags = set()
+        for chunk in chunks(pending, BULK_CHUNK_SIZE):
+            try:
+                db.session.execute(db.update(CrewMember), [row for _, row in chunk])
+                version = data_version.bump(data_version.CREW).get(data_version.CREW)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error('批量更新船员失败: %s', e)
+                for i, row in chunk:
+                    results[i] = {'index': i, 'id': row['id'], 'success': False, 'message': '更新船员失败'}
+                continue
+
+            for i, row in chunk:
+                tags.update({
+                    f'crew:{row["id"]}', f'group:{old_groups[row["id"]]}',
+                    f'group:{row.get("pirate_group_id", old_groups[row["id"]])}'
+                })
+                results[i] = {'index': i, 'id': row['id'], 'success': True}
+
+            # 按本批提交后的数据更新索引（搜索字段可能只更新了一部分）
+            rows = db.session.query(
+                CrewMember.id, CrewMember.name, CrewMember.role, CrewMember.devil_fruit
+            ).filter(CrewMember.id.in_([row['id'] for _, row in chunk]))
+            for row in rows:
+                crew_index.add(row.id, row, version)
+
+        cache.invalidate('crew:list', *tags)
+        return True, bulk_summary(results), bulk_message('更新', results)
+
+    def bulk_delete(self, ids: List[int]) -> Tuple[bool, Optional[dict], str]:
+        """
+        批量删除船员
+
+        Args:
+            ids: 船员 ID 列表
+
+        Returns:
+            Tuple[bool, Optional[dict], str]: (成功标志, {'results': 逐条结果, 'succeeded', 'failed'}, 消息)
+        """
+        if len(ids) > BULK_MAX_ITEMS:
+            return False, None, f'单次最多提交 {BULK_MAX_ITEMS} 条'
+
+        valid_ids = [member_id for member_id in ids if is_id(member_id)]
+        groups = dict(
+            db.session.query(CrewMember.id, CrewMember.pirate_group_id).filter(CrewMember.id.in_(valid_ids)).all()
+        ) if valid_ids else {}
+
+        deleted, tags = set(), set()
+        for chunk in chunks(list(groups), BULK_CHUNK_SIZE):
+            try:
+                db.session.execute(
+                    db.delete(CrewMember).where(CrewMember.id.in_(chunk)),
+                    execution_options={'synchronize_session': False}
+                )
+                version = data_version.bump(data_version.CREW).get(data_version.CREW)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error('批量删除船员失败: %s', e)
+                continue
+
+            for member_id in chunk:
+                crew_index.remove(member_id, version)
+                tags.update({f'crew:{member_id}', f'group:{groups[member_id]}'})
+            deleted.update(chunk)
+
+        results = []
+        for i, member_id in enumerate(ids):
+            if not is_id(member_id):
+                results.append({'index': i, 'id': member_id, 'success': False, 'message': 'id 应为整数'})
+            elif member_id in deleted:
+                results.append({'index': i, 'id': member_id, 'success': True})
+            else:
+                message = '删除船员失败' if member_id in groups else '船员不存在'
+                results.append({'index': i, 'id': member_id, 'success': False, 'message': message})
+
+        cache.invalidate('crew:list', *tags)
+        return True, bulk_summary(results), bulk_message('删除', results)
+
+
+def _existing_group_ids(group_ids) -> set:
+    """一次 IN 查询返回实际存在的海贼团 ID"""
+    group_ids = {g for g in group_ids if is_id(g) and g}
+    if not group_ids:
+        return set()
+    rows = db.session.query(PirateGroup.id).filter(PirateGroup.id.in_(group_ids)).all()
+    return {r.id for r in rows}
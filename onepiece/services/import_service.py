@@ -0,0 +1,204 @@
+"""
+数据导入 Service - 流式读取 CSV / NDJSON 文件并分批写入数据库
+"""
+import csv
+import json
+import logging
+import time
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from onepiece.models import db, CrewMember, PirateGroup
+from onepiece.services.crew_service import CrewService
+from onepiece.services.pirate_group_service import PirateGroupService, _existing_names
+from onepiece.utils.bounty import parse_bounty
+from onepiece.utils import data_version
+from onepiece.utils.bulk import check_types
+from onepiece.utils.cache import cache
+from onepiece.utils.export import flatten
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+DEFAULT_IMPORT_BATCH_SIZE = 5000
+# 错误明细最多保留的条数，避免坏文件把内存撑满
+MAX_ERROR_SAMPLES = 20
+
+
+def detect_format(path: str) -> Optional[str]:
+    """按扩展名推断文件格式"""
+    suffix = path.rsplit('.', 1)[-1].lower()
+    if suffix in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    return suffix if suffix in IMPORT_FORMATS else None
+
+
+def iter_records(stream, fmt: str) -> Iterator[dict]:
+    """
+    逐条读取记录，字段与导出格式一致（abilities.* 嵌套/展开均可）
+
+    CSV 的空单元格视为未提供该字段；无法解析的 NDJSON 行产出 None，由导入流程记为格式错误
+    """
+    if fmt == 'csv':
+        for row in csv.DictReader(stream):
+            yield {k: v for k, v in row.items() if k and v != ''}
+    else:
+        for line in stream:
+            line = line.strip()
+            if line:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                yield flatten(record) if isinstance(record, dict) else record
+
+
+def _int_or_none(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, (bool, float)):
+        raise ValueError(value)
+    return int(value)
+
+
+class ImportService:
+    """批量导入：每批一条多行 INSERT、一个事务，按批提交，可从偏移量续传"""
+
+    def __init__(self, batch_size: int = DEFAULT_IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+
+    def import_crew(self, records: Iterable[dict], offset: int = 0,
+                    on_batch: Callable[[dict], None] = None) -> Tuple[bool, dict, str]:
+        """
+        导入船员，pirate_group_id 依据一次性加载的海贼团 id 集合校验
+
+        Args:
+            records: 记录迭代器（见 iter_records）
+            offset: 跳过前 offset 条记录（续传）
+            on_batch: 每批提交后的回调，参数为当前统计
+
+        Returns:
+            Tuple[bool, dict, str]: (成功标志, 统计, 消息)；失败时统计中的 offset 即续传位置
+        """
+        group_ids = {r.id for r in db.session.query(PirateGroup.id)}
+
+        def prepare(record):
+            fields, message = CrewService.build_fields(_strip_abilities(record))
+            if fields is None:
+                return None, message
+            try:
+                fields['pirate_group_id'] = _int_or_none(fields['pirate_group_id'])
+            except (TypeError, ValueError):
+                return None, '海贼团 id 格式错误'
+            if fields['pirate_group_id'] is not None and fields['pirate_group_id'] not in group_ids:
+                return None, '指定的海贼团不存在'
+            # 逐条校验字段类型与长度，坏数据只跳过本条，不让整批 INSERT 失败
+            message = check_types(fields, CrewMember.__table__, CrewService.NUMERIC_TEXT_FIELDS)
+            if message:
+                return None, message
+            fields['bounty_value'] = parse_bounty(fields['bounty'])
+            return fields, ''
+
+        result = self._run(CrewMember.__table__, records, offset, prepare, None, on_batch)
+        # 命令行进程中只对共享后端（redis）有效，服务进程的 memory 缓存在 CACHE_TTL 内过期
+        cache.invalidate('crew:list', 'group:list')
+        return result
+
+    def import_groups(self, records: Iterable[dict], offset: int = 0,
+                      on_batch: Callable[[dict], None] = None) -> Tuple[bool, dict, str]:
+        """
+        导入海贼团，名称与库中已有或同批数据重复的记录被跳过
+
+        参数与返回值同 import_crew
+        """
+        def prepare(record):
+            fields, message = PirateGroupService.build_fields(record)
+            if fields is None:
+                return None, message
+            try:
+                fields['member_count'] = _int_or_none(fields['member_count']) or 0
+            except (TypeError, ValueError):
+                return None, '船员数量格式错误'
+            message = check_types(fields, PirateGroup.__table__, PirateGroupService.NUMERIC_TEXT_FIELDS)
+            if message:
+                return None, message
+            fields['total_bounty_value'] = parse_bounty(fields['total_bounty'])
+            return fields, ''
+
+        def dedupe(batch):
+            taken = _existing_names(f['name'] for _, f in batch)
+            kept, dropped = [], []
+            for position, fields in batch:
+                if fields['name'] in taken:
+                    dropped.append((position, f'海贼团 {fields["name"]} 已存在'))
+                else:
+                    taken.add(fields['name'])
+                    kept.append((position, fields))
+            return kept, dropped
+
+        result = self._run(PirateGroup.__table__, records, offset, prepare, dedupe, on_batch)
+        # 命令行进程中只对共享后端（redis）有效，服务进程的 memory 缓存在 CACHE_TTL 内过期
+        cache.invalidate('group:list', 'crew:list')
+        return result
+
+    def _run(self, table, records, offset, prepare, dedupe, on_batch) -> Tuple[bool, dict, str]:
+        """公共流程：跳过 offset → 分批校验 → executemany 插入 → 提交并回调进度"""
+        stats = {'offset': offset, 'inserted': 0, 'rejected': 0, 'errors': [], 'rows_per_sec': 0.0}
+        started = time.perf_counter()
+        stmt = db.insert(table)
+        records = islice(iter(records), offset, None)
+
+        def reject(position, message):
+            stats['rejected'] += 1
+            if len(stats['errors']) < MAX_ERROR_SAMPLES:
+                stats['errors'].append({'record': position, 'message': message})
+
+        while True:
+            batch_start = stats['offset']
+            # 写入失败时回退本批的跳过统计，续传时同一批会重新统计
+            rejected_before, errors_before = stats['rejected'], len(stats['errors'])
+            batch = []
+            for record in islice(records, self.batch_size):
+                stats['offset'] += 1
+                fields, message = prepare(record) if isinstance(record, dict) else (None, '数据格式错误')
+                if fields is None:
+                    reject(stats['offset'], message)
+                else:
+                    batch.append((stats['offset'], fields))
+            if stats['offset'] == batch_start:
+                break
+
+            if dedupe is not None and batch:
+                batch, dropped = dedupe(batch)
+                for position, message in dropped:
+                    reject(position, message)
+            if batch:
+                try:
+                    db.session.execute(stmt, [fields for _, fields in batch])
+                    # 服务进程据此发现导入的数据并重建搜索索引
+                    data_version.bump(data_version.TABLE_SCOPES[table.name])
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    stats['offset'] = batch_start
+                    stats['rejected'] = rejected_before
+                    del stats['errors'][errors_before:]
+                    logger.error('导入 %s 失败: %s', table.name, e)
+                    return False, self._finish(stats, started), f'写入失败，可从 offset={batch_start} 续传: {e}'
+                stats['inserted'] += len(batch)
+
+            if on_batch:
+                on_batch(self._finish(stats, started))
+
+        return True, self._finish(stats, started), f'导入完成: 成功 {stats["inserted"]} 条, 跳过 {stats["rejected"]} 条'
+
+    @staticmethod
+    def _finish(stats: dict, started: float) -> dict:
+        elapsed = time.perf_counter() - started
+        stats['rows_per_sec'] = round(stats['inserted'] / elapsed, 1) if elapsed else 0.0
+        return stats
+
+
+def _strip_abilities(record: dict) -> dict:
+    """导出文件中的 abilities.xxx 列还原为模型字段名"""
+    return {k.split('.', 1)[1] if k.startswith('abilities.') else k: v for k, v in record.items()}
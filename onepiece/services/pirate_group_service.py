@@ -1,11 +1,23 @@
 """
 海贼团服务 - 处理海贼团管理相关业务逻辑
 """
-from typing import Optional, Tuple, List
+from types import SimpleNamespace
+from typing import Iterator, Optional, Tuple, List
 import logging
 
 from onepiece.models.database import db
+from onepiece.models.crew_member import CrewMember
 from onepiece.models.pirate_group import PirateGroup
+from onepiece.utils.bounty import format_bounty, parse_bounty
+from onepiece.utils.bulk import (
+    BULK_CHUNK_SIZE, BULK_MAX_ITEMS, bulk_message, bulk_summary, check_types, chunks, is_id
+)
+from onepiece.utils import data_version
+from onepiece.utils.cache import cache
+from onepiece.utils.pagination import (
+    CursorError, clamp_limit, cursor_offset, keyset_page, offset_cursor, parse_sort
+)
+from onepiece.utils.search_index import ensure_search_indexes, pirate_group_index
 
 logger = logging.getLogger(__name__)
 
@@ -13,20 +25,75 @@ logger = logging.getLogger(__name__)
 class PirateGroupService:
     """海贼团服务类"""
 
-    def get_all(self) -> Tuple[bool, List[dict], str]:
+    # 列表接口允许的排序键
+    SORT_FIELDS = {
+        'id': PirateGroup.id,
+        'name': PirateGroup.name,
+        'created_at': PirateGroup.created_at
+    }
+
+    # 允许更新的字段
+    UPDATABLE_FIELDS = [
+        'name', 'captain', 'ship_name', 'total_bounty',
+        'flag_description', 'origin', 'member_count', 'description'
+    ]
+
+    # 除字符串外也接受数值（贝里数）的字段
+    NUMERIC_TEXT_FIELDS = ('total_bounty',)
+
+    @staticmethod
+    def build_fields(data: dict) -> Tuple[Optional[dict], str]:
         """
-        获取海贼团列表
+        校验创建数据并整理出模型字段（不含名称唯一性校验）
 
         Returns:
-            Tuple[bool, List[dict], str]: (成功标志, 海贼团列表, 消息)
+            Tuple[Optional[dict], str]: (字段字典, 错误消息)
+        """
+        name = data.get('name')
+        captain = data.get('captain')
+        if not name or not captain:
+            return None, '海贼团名称和船长不能为空'
+
+        return {
+            'name': name,
+            'captain': captain,
+            'ship_name': data.get('ship_name'),
+            'total_bounty': data.get('total_bounty', '0'),
+            'flag_description': data.get('flag_description'),
+            'origin': data.get('origin'),
+            'member_count': data.get('member_count', 0),
+            'description': data.get('description')
+        }, ''
+
+    @cache.cached('group.get_all', tags=lambda page, *a, **kw: ['group:list'])
+    def get_all(self, limit: Optional[int] = None, after: Optional[str] = None,
+                sort: Optional[str] = None) -> Tuple[bool, Optional[dict], str]:
+        """
+        分页获取海贼团列表（keyset 游标分页）
+
+        Args:
+            limit: 每页条数，默认 DEFAULT_PAGE_SIZE
+            after: 上一页返回的 next_cursor
+            sort: 排序键，如 "id"、"-name"
+
+        Returns:
+            Tuple[bool, Optional[dict], str]: (成功标志, {'items': 海贼团列表, 'next_cursor': 游标}, 消息)
         """
         try:
-            groups = PirateGroup.query.order_by(PirateGroup.id).all()
-            return True, [g.to_dict() for g in groups], f'获取到 {len(groups)} 个海贼团'
+            sort_key, desc = parse_sort(sort, self.SORT_FIELDS)
+            groups, next_cursor = keyset_page(
+                PirateGroup.query, self.SORT_FIELDS[sort_key], PirateGroup.id,
+                sort_key, desc, clamp_limit(limit), after
+            )
+            page = {'items': [g.to_dict() for g in groups], 'next_cursor': next_cursor}
+            return True, page, f'获取到 {len(groups)} 个海贼团'
+        except CursorError as e:
+            return False, None, str(e)
         except Exception as e:
-            logger.error(f'获取海贼团列表失败: {e}')
-            return False, [], '获取海贼团列表失败'
+            logger.error('获取海贼团列表失败: %s', e)
+            return False, None, '获取海贼团列表失败'
 
+    @cache.cached('group.get_by_id', tags=lambda group, group_id, *a, **kw: [f'group:{group_id}'])
     def get_by_id(self, group_id: int, include_members: bool = False) -> Tuple[bool, Optional[dict], str]:
         """
         根据 ID 获取海贼团详情
@@ -53,36 +120,29 @@ class PirateGroupService:
         Returns:
             Tuple[bool, Optional[dict], str]: (成功标志, 海贼团信息, 消息)
         """
-        name = data.get('name')
-        captain = data.get('captain')
-
-        if not name or not captain:
-            return False, None, '海贼团名称和船长不能为空'
+        fields, message = self.build_fields(data)
+        if fields is None:
+            return False, None, message
 
         # 检查名称是否已存在
+        name = fields['name']
         existing = PirateGroup.query.filter_by(name=name).first()
         if existing:
             return False, None, f'海贼团 {name} 已存在'
 
         try:
-            group = PirateGroup(
-                name=name,
-                captain=captain,
-                ship_name=data.get('ship_name'),
-                total_bounty=data.get('total_bounty', '0'),
-                flag_description=data.get('flag_description'),
-                origin=data.get('origin'),
-                member_count=data.get('member_count', 0),
-                description=data.get('description')
-            )
+            group = PirateGroup(**fields)
             db.session.add(group)
+            versions = data_version.bump(data_version.GROUP)
             db.session.commit()
+            pirate_group_index.add(group.id, group, versions.get(data_version.GROUP))
+            cache.invalidate('group:list')
 
-            logger.info(f'创建海贼团成功: {name}')
+            logger.info('创建海贼团成功: %s', name)
             return True, group.to_dict(), '创建成功'
         except Exception as e:
             db.session.rollback()
-            logger.error(f'创建海贼团失败: {e}')
+            logger.error('创建海贼团失败: %s', e)
             return False, None, '创建海贼团失败'
 
     def update(self, group_id: int, data: dict) -> Tuple[bool, Optional[dict], str]:
@@ -108,20 +168,20 @@ class PirateGroupService:
                 return False, None, f'海贼团名称 {new_name} 已被使用'
 
         try:
-            updatable_fields = [
-                'name', 'captain', 'ship_name', 'total_bounty',
-                'flag_description', 'origin', 'member_count', 'description'
-            ]
-            for field in updatable_fields:
+            for field in self.UPDATABLE_FIELDS:
                 if field in data:
                     setattr(group, field, data[field])
 
+            versions = data_version.bump(data_version.GROUP)
             db.session.commit()
-            logger.info(f'更新海贼团成功: {group.name}')
+            pirate_group_index.add(group.id, group, versions.get(data_version.GROUP))
+            # 船员数据中内嵌了海贼团名称，船员列表一并失效
+            cache.invalidate('group:list', f'group:{group_id}', 'crew:list')
+            logger.info('更新海贼团成功: %s', group.name)
             return True, group.to_dict(), '更新成功'
         except Exception as e:
             db.session.rollback()
-            logger.error(f'更新海贼团失败: {e}')
+            logger.error('更新海贼团失败: %s', e)
             return False, None, '更新海贼团失败'
 
     def delete(self, group_id: int) -> Tuple[bool, None, str]:
@@ -145,40 +205,55 @@ class PirateGroupService:
         try:
             name = group.name
             db.session.delete(group)
+            versions = data_version.bump(data_version.GROUP)
             db.session.commit()
-            logger.info(f'删除海贼团成功: {name}')
+            pirate_group_index.remove(group_id, versions.get(data_version.GROUP))
+            cache.invalidate('group:list', f'group:{group_id}')
+            logger.info('删除海贼团成功: %s', name)
             return True, None, f'海贼团 {name} 已删除'
         except Exception as e:
             db.session.rollback()
-            logger.error(f'删除海贼团失败: {e}')
+            logger.error('删除海贼团失败: %s', e)
             return False, None, '删除海贼团失败'
 
-    def search(self, keyword: str) -> Tuple[bool, List[dict], str]:
+    @cache.cached('group.search', tags=lambda page, *a, **kw: ['group:list'])
+    def search(self, keyword: str, limit: Optional[int] = None,
+               after: Optional[str] = None) -> Tuple[bool, Optional[dict], str]:
         """
-        搜索海贼团
+        搜索海贼团（进程内倒排索引，按相关度排序）
 
         Args:
-            keyword: 搜索关键词
+            keyword: 搜索关键词，匹配名称/船长/起源地
+            limit: 每页条数
+            after: 上一页返回的 next_cursor
 
         Returns:
-            Tuple[bool, List[dict], str]: (成功标志, 海贼团列表, 消息)
+            Tuple[bool, Optional[dict], str]: (成功标志, {'items': 海贼团列表, 'next_cursor': 游标}, 消息)
         """
         if not keyword:
-            return False, [], '搜索关键词不能为空'
+            return False, None, '搜索关键词不能为空'
 
         try:
-            groups = PirateGroup.query.filter(
-                db.or_(
-                    PirateGroup.name.ilike(f'%{keyword}%'),
-                    PirateGroup.captain.ilike(f'%{keyword}%'),
-                    PirateGroup.origin.ilike(f'%{keyword}%')
-                )
-            ).all()
-            return True, [g.to_dict() for g in groups], f'搜索到 {len(groups)} 个海贼团'
+            scope = f'search:{keyword}'
+            limit, offset = clamp_limit(limit), cursor_offset(after, scope)
+
+            ensure_search_indexes()
+            ids, total = pirate_group_index.search(keyword, offset, limit)
+
+            groups = PirateGroup.query.filter(PirateGroup.id.in_(ids)).all() if ids else []
+            rank = {group_id: i for i, group_id in enumerate(ids)}
+            groups.sort(key=lambda g: rank[g.id])
+
+            next_cursor = offset_cursor(scope, offset + limit) if offset + limit < total else None
+            page = {'items': [g.to_dict() for g in groups], 'next_cursor': next_cursor}
+            return True, page, f'搜索到 {total} 个海贼团'
+        except CursorError as e:
+            return False, None, str(e)
         except Exception as e:
-            logger.error(f'搜索海贼团失败: {e}')
-            return False, [], '搜索失败'
+            logger.error('搜索海贼团失败: %s', e)
+            return False, None, '搜索失败'
 
+    @cache.cached('group.get_members', tags=lambda members, group_id: [f'group:{group_id}'])
     def get_members(self, group_id: int) -> Tuple[bool, List[dict], str]:
         """
         获取海贼团的所有船员
@@ -193,5 +268,272 @@ class PirateGroupService:
         if not group:
             return False, [], '海贼团不存在'
 
-        members = [m.to_dict() for m in group.crew_members]
+        rows = CrewMember.list_query().filter(
+            CrewMember.pirate_group_id == group_id
+        ).order_by(CrewMember.id)
+        members = [CrewMember.row_to_dict(r) for r in rows]
         return True, members, f'{group.name} 共有 {len(members)} 名船员'
+
+    @cache.cached('group.get_bounty_totals', tags=lambda totals: ['group:list', 'crew:list'])
+    def get_bounty_totals(self) -> Tuple[bool, List[dict], str]:
+        """
+        按海贼团汇总船员悬赏金（数据库 SUM/COUNT 聚合）
+
+        Returns:
+            Tuple[bool, List[dict], str]: (成功标志, 汇总列表, 消息)
+        """
+        try:
+            crew_total = db.func.coalesce(db.func.sum(CrewMember.bounty_value), 0)
+            rows = db.session.query(
+                PirateGroup.id,
+                PirateGroup.name,
+                PirateGroup.total_bounty,
+                crew_total.label('crew_bounty_total'),
+                db.func.count(CrewMember.id).label('crew_count')
+            ).outerjoin(
+                CrewMember, CrewMember.pirate_group_id == PirateGroup.id
+            ).group_by(
+                PirateGroup.id, PirateGroup.name, PirateGroup.total_bounty
+            ).order_by(crew_total.desc(), PirateGroup.id).all()
+
+            totals = [{
+                'pirate_group_id': r.id,
+                'pirate_group_name': r.name,
+                'total_bounty': r.total_bounty,
+                'crew_bounty_total': int(r.crew_bounty_total),
+                'crew_bounty_total_text': format_bounty(int(r.crew_bounty_total)),
+                'crew_count': r.crew_count
+            } for r in rows]
+            return True, totals, f'共统计 {len(totals)} 个海贼团'
+        except Exception as e:
+            logger.error('统计海贼团悬赏金失败: %s', e)
+            return False, [], '统计悬赏金失败'
+
+    # 导出时每批从服务端游标拉取的行数
+    EXPORT_BATCH_SIZE = 1000
+
+    # CSV 导出列
+    EXPORT_COLUMNS = [
+        'id', 'name', 'captain', 'ship_name', 'total_bounty', 'flag_description',
+        'origin', 'member_count', 'description', 'created_at'
+    ]
+
+    def iter_export(self) -> Iterator[dict]:
+        """按主键顺序逐行产出海贼团数据，用于流式导出（服务端游标分批拉取）"""
+        columns = [PirateGroup.id] + [getattr(PirateGroup, c) for c in self.EXPORT_COLUMNS[1:]]
+        rows = db.session.query(*columns).order_by(PirateGroup.id).execution_options(
+            yield_per=self.EXPORT_BATCH_SIZE
+        )
+        for row in rows:
+            yield PirateGroup.serialize(row)
+
+    def bulk_create(self, items: List[dict]) -> Tuple[bool, Optional[dict], str]:
+        """
+        批量创建海贼团
+
+        名称唯一性用一次 IN 查询校验（同时拒绝本批内重名），合法数据分批在各自事务中插入。
+
+        Args:
+            items: 海贼团数据列表
+
+        Returns:
+            Tuple[bool, Optional[dict], str]: (成功标志, {'results': 逐条结果, 'succeeded', 'failed'}, 消息)
+        """
+        if len(items) > BULK_MAX_ITEMS:
+            return False, None, f'单次最多提交 {BULK_MAX_ITEMS} 条'
+
+        results = [None] * len(items)
+        valid = []
+        for i, data in enumerate(items):
+            fields, message = self.build_fields(data) if isinstance(data, dict) else (None, '数据格式错误')
+            if fields is not None:
+                message = check_types(fields, PirateGroup.__table__, self.NUMERIC_TEXT_FIELDS)
+            if message:
+                results[i] = {'index': i, 'success': False, 'message': message}
+            else:
+                valid.append((i, fields))
+
+        taken = _existing_names(f['name'] for _, f in valid)
+        pending = []
+        for i, fields in valid:
+            if fields['name'] in taken:
+                results[i] = {'index': i, 'success': False, 'message': f'海贼团 {fields["name"]} 已存在'}
+            else:
+                taken.add(fields['name'])
+                pending.append((i, fields))
+
+        for chunk in chunks(pending, BULK_CHUNK_SIZE):
+            groups = [PirateGroup(**fields) for _, fields in chunk]
+            try:
+                db.session.add_all(groups)
+                db.session.flush()
+                # 提交前取出 id，提交后对象过期，再访问属性会逐条重新查询
+                ids = [group.id for group in groups]
+                version = data_version.bump(data_version.GROUP).get(data_version.GROUP)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error('批量创建海贼团失败: %s', e)
+                for i, _ in chunk:
+                    results[i] = {'index': i, 'success': False, 'message': '创建海贼团失败'}
+                continue
+
+            for (i, fields), group_id in zip(chunk, ids):
+                pirate_group_index.add(group_id, SimpleNamespace(**fields), version)
+                results[i] = {'index': i, 'success': True, 'id': group_id}
+
+        cache.invalidate('group:list')
+        return True, bulk_summary(results), bulk_message('创建', results)
+
+    def bulk_update(self, items: List[dict]) -> Tuple[bool, Optional[dict], str]:
+        """
+        批量更新海贼团，每条数据需包含 id
+
+        Args:
+            items: 海贼团更新数据列表
+
+        Returns:
+            Tuple[bool, Optional[dict], str]: (成功标志, {'results': 逐条结果, 'succeeded', 'failed'}, 消息)
+        """
+        if len(items) > BULK_MAX_ITEMS:
+            return False, None, f'单次最多提交 {BULK_MAX_ITEMS} 条'
+
+        results = [None] * len(items)
+        ids = [d.get('id') for d in items if isinstance(d, dict) and is_id(d.get('id'))]
+        names = dict(
+            db.session.query(PirateGroup.id, PirateGroup.name).filter(PirateGroup.id.in_(ids)).all()
+        ) if ids else {}
+        new_names = {d.get('name') for d in items if isinstance(d, dict) and isinstance(d.get('name'), str)}
+        owners = dict(
+            (name, group_id) for group_id, name in db.session.query(PirateGroup.id, PirateGroup.name).filter(
+                PirateGroup.name.in_(new_names)
+            )
+        )
+
+        pending = []
+        for i, data in enumerate(items):
+            group_id = data.get('id') if isinstance(data, dict) else None
+            if not is_id(group_id):
+                results[i] = {'index': i, 'id': group_id, 'success': False, 'message': 'id 应为整数'}
+                continue
+            if group_id not in names:
+                results[i] = {'index': i, 'id': group_id, 'success': False, 'message': '海贼团不存在'}
+                continue
+            row = {field: data[field] for field in self.UPDATABLE_FIELDS if field in data}
+            message = check_types(row, PirateGroup.__table__, self.NUMERIC_TEXT_FIELDS)
+            if message:
+                results[i] = {'index': i, 'id': group_id, 'success': False, 'message': message}
+                continue
+            new_name = row.get('name')
+            if any(field in row and not row[field] for field in ('name', 'captain')):
+                results[i] = {'index': i, 'id': group_id, 'success': False, 'message': '海贼团名称和船长不能为空'}
+                continue
+            if new_name and owners.get(new_name, group_id) != group_id:
+                results[i] = {'index': i, 'id': group_id, 'success': False,
+                              'message': f'海贼团名称 {new_name} 已被使用'}
+                continue
+            if new_name:
+                owners.pop(names[group_id], None)
+                owners[new_name] = group_id
+
+            if 'total_bounty' in row:
+                row['total_bounty_value'] = parse_bounty(row['total_bounty'])
+            row['id'] = group_id
+            pending.append((i, row))
+
+        tags = set()
+        for chunk in chunks(pending, BULK_CHUNK_SIZE):
+            try:
+                db.session.execute(db.update(PirateGroup), [row for _, row in chunk])
+                version = data_version.bump(data_version.GROUP).get(data_version.GROUP)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error('批量更新海贼团失败: %s', e)
+                for i, row in chunk:
+                    results[i] = {'index': i, 'id': row['id'], 'success': False, 'message': '更新海贼团失败'}
+                continue
+
+            for i, row in chunk:
+                tags.add(f'group:{row["id"]}')
+                results[i] = {'index': i, 'id': row['id'], 'success': True}
+
+            # 按本批提交后的数据更新索引（搜索字段可能只更新了一部分）
+            rows = db.session.query(
+                PirateGroup.id, PirateGroup.name, PirateGroup.captain, PirateGroup.origin
+            ).filter(PirateGroup.id.in_([row['id'] for _, row in chunk]))
+            for row in rows:
+                pirate_group_index.add(row.id, row, version)
+
+        # 船员数据中内嵌了海贼团名称，船员列表一并失效
+        cache.invalidate('group:list', 'crew:list', *tags)
+        return True, bulk_summary(results), bulk_message('更新', results)
+
+    def bulk_delete(self, ids: List[int]) -> Tuple[bool, Optional[dict], str]:
+        """
+        批量删除海贼团，仍有船员的海贼团不会被删除
+
+        Args:
+            ids: 海贼团 ID 列表
+
+        Returns:
+            Tuple[bool, Optional[dict], str]: (成功标志, {'results': 逐条结果, 'succeeded', 'failed'}, 消息)
+        """
+        if len(ids) > BULK_MAX_ITEMS:
+            return False, None, f'单次最多提交 {BULK_MAX_ITEMS} 条'
+
+        valid_ids = [group_id for group_id in ids if is_id(group_id)]
+        existing = {
+            r.id for r in db.session.query(PirateGroup.id).filter(PirateGroup.id.in_(valid_ids))
+        } if valid_ids else set()
+        occupied = {
+            r.pirate_group_id for r in db.session.query(CrewMember.pirate_group_id).filter(
+                CrewMember.pirate_group_id.in_(existing)
+            ).distinct()
+        } if existing else set()
+
+        deletable = [group_id for group_id in existing if group_id not in occupied]
+        deleted = set()
+        for chunk in chunks(deletable, BULK_CHUNK_SIZE):
+            try:
+                db.session.execute(
+                    db.delete(PirateGroup).where(PirateGroup.id.in_(chunk)),
+                    execution_options={'synchronize_session': False}
+                )
+                version = data_version.bump(data_version.GROUP).get(data_version.GROUP)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error('批量删除海贼团失败: %s', e)
+                continue
+            for group_id in chunk:
+                pirate_group_index.remove(group_id, version)
+            deleted.update(chunk)
+
+        results = []
+        for i, group_id in enumerate(ids):
+            if not is_id(group_id):
+                results.append({'index': i, 'id': group_id, 'success': False, 'message': 'id 应为整数'})
+                continue
+            if group_id in deleted:
+                results.append({'index': i, 'id': group_id, 'success': True})
+                continue
+            if group_id not in existing:
+                message = '海贼团不存在'
+            elif group_id in occupied:
+                message = '海贼团下还有船员，无法删除'
+            else:
+                message = '删除海贼团失败'
+            results.append({'index': i, 'id': group_id, 'success': False, 'message': message})
+
+        cache.invalidate('group:list', *(f'group:{group_id}' for group_id in deleted))
+        return True, bulk_summary(results), bulk_message('删除', results)
+
+
+def _existing_names(names) -> set:
+    """一次 IN 查询返回已被占用的海贼团名称"""
+    names = {n for n in names if isinstance(n, str) and n}
+    if not names:
+        return set()
+    rows = db.session.query(PirateGroup.name).filter(PirateGroup.name.in_(names)).all()
+    return {r.name for r in rows}
@@ -1 +1 @@
-from onepiece.utils.response import success, error, not_found, unauthorized, handle_exceptions
+from onepiece.utils.response import success, error, not_found, unauthorized, handle_exceptions, conditional
@@ -0,0 +1,255 @@
+"""
+前端静态资源 - 构建时加指纹、预压缩，运行时按 Accept-Encoding 选择变体
+
+    flask --app onepiece.app build-assets     # 输出到 ASSETS_DIR（默认 instance/assets）
+
+构建：
+- frontend/ 下的文件（不含 node_modules、构建配置等）复制为 名称.<内容哈希>.扩展名
+- CSS / HTML 中引用其他资源的 src、href、url() 改写为 /frontend/<指纹路径>：被引用的文件先构建，
+  改写后再计算哈希，被引用资源变化时引用方的指纹也随之变化
+- 文本类文件额外生成 .gz（gzip -9）与 .br（brotli，需安装 Brotli 包），压缩后不小于原文件 90% 的不保留
+- manifest.json 记录 逻辑路径 -> 指纹路径与可用编码，最后原子写入；旧的指纹文件保留，滚动发布期间仍可访问
+
+运行：
+- /frontend/<指纹路径>：Cache-Control 一年 + immutable
+- /frontend/<逻辑路径>（如 index.html）：no-cache，依靠 ETag 协商
+- 未构建（没有 manifest）时回退为直接读取 frontend/ 目录，供本地开发使用
+
+ASSETS_OFFLOAD 让响应体不经过 Python：
+- x-accel-redirect：返回 X-Accel-Redirect: ASSETS_ACCEL_PREFIX + 指纹路径，由 nginx 的 internal location 发送文件，
+  压缩变体由该 location 的 gzip_static / brotli_static 按同名 .gz / .br 选择
+- x-sendfile：返回 X-Sendfile: 所选变体的绝对路径（Apache mod_xsendfile 等），编码相关响应头由本模块设置
+"""
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+import tempfile
+from typing import Dict, Optional
+
+from flask import Response, abort, request, send_file, send_from_directory
+
+from onepiece.utils.metrics import Registry, registry
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+# 不作为静态资源发布的文件与目录
+EXCLUDED = {'node_modules', 'dist', 'package.json', 'package-lock.json', 'vite.config.js'}
+# 值得压缩的类型（图片等已压缩格式除外）
+COMPRESSIBLE = ('text/', 'application/javascript', 'application/json', 'image/svg+xml', 'application/xml')
+MIN_COMPRESS_BYTES = 256
+# 编码 -> 文件后缀，按优先级排列（同等 q 值时优先 br）
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+IMMUTABLE = 'public, max-age=31536000, immutable'
+URL_PREFIX = '/frontend/'
+# 需要改写资源地址的文件，在其他文件之后按此顺序构建（CSS 先于引用它的 HTML）
+REWRITTEN = ('.css', '.html')
+# src="..." / href='...' / url(...) 中的地址
+REFERENCE = re.compile(r"""(?P<prefix>\b(?:src|href)\s*=\s*["']|url\(\s*["']?)(?P<url>[^"'()\s?#]+)""")
+
+
+def fingerprint(path: str, digest: str) -> str:
+    """a/b/app.js -> a/b/app.<digest 前 10 位>.js"""
+    stem, ext = os.path.splitext(path)
+    return f'{stem}.{digest[:10]}{ext}'
+
+
+def _compress(encoding: str, data: bytes) -> Optional[bytes]:
+    if encoding == 'gzip':
+        # mtime 固定，相同内容每次构建得到相同字节
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(data, quality=11)
+
+
+def _iter_sources(source_dir: str):
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if d not in EXCLUDED and not d.startswith('.'))
+        for name in sorted(files):
+            if name in EXCLUDED or name.startswith('.'):
+                continue
+            path = os.path.join(root, name)
+            yield os.path.relpath(path, source_dir).replace(os.sep, '/'), path
+
+
+def _build_order(logical: str) -> int:
+    ext = os.path.splitext(logical)[1].lower()
+    return REWRITTEN.index(ext) + 1 if ext in REWRITTEN else 0
+
+
+def rewrite_references(logical: str, text: str, files: dict) -> str:
+    """把指向已构建资源的地址（相对路径、/ 或 /frontend/ 开头）改写为指纹地址，其他地址原样保留"""
+    base = posixpath.dirname(logical)
+
+    def replace(match):
+        url = match.group('url')
+        if '://' in url or url.startswith(('//', 'data:')):
+            return match.group(0)
+        if url.startswith(URL_PREFIX):
+            target = url[len(URL_PREFIX):]
+        elif url.startswith('/'):
+            target = url[1:]
+        else:
+            target = posixpath.normpath(posixpath.join(base, url))
+        entry = files.get(target)
+        if entry is None:
+            return match.group(0)
+        return match.group('prefix') + URL_PREFIX + entry['path']
+
+    return REFERENCE.sub(replace, text)
+
+
+def build_assets(source_dir: str, output_dir: str) -> dict:
+    """
+    构建静态资源
+
+    Returns:
+        dict: {'files': 文件数, 'bytes': 原始字节数, 'compressed': {编码: 压缩后字节数}}
+    """
+    files, stats = {}, {'files': 0, 'bytes': 0, 'compressed': {encoding: 0 for encoding in ENCODINGS}}
+    for logical, path in sorted(_iter_sources(source_dir), key=lambda source: _build_order(source[0])):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if _build_order(logical):
+            data = rewrite_references(logical, data.decode('utf-8'), files).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        target = fingerprint(logical, digest)
+        _write(output_dir, target, data)
+
+        encodings = []
+        mimetype = mimetypes.guess_type(logical)[0] or ''
+        if len(data) >= MIN_COMPRESS_BYTES and mimetype.startswith(COMPRESSIBLE):
+            for encoding, suffix in ENCODINGS.items():
+                compressed = _compress(encoding, data)
+                if compressed is None or len(compressed) > len(data) * 0.9:
+                    continue
+                _write(output_dir, target + suffix, compressed)
+                encodings.append(encoding)
+                stats['compressed'][encoding] += len(compressed)
+
+        files[logical] = {'path': target, 'etag': digest[:16], 'size': len(data), 'encodings': encodings}
+        stats['files'] += 1
+        stats['bytes'] += len(data)
+
+    _write(output_dir, MANIFEST, json.dumps({'files': files}, ensure_ascii=False, indent=2).encode('utf-8'))
+    return stats
+
+
+def _write(output_dir: str, relative: str, data: bytes):
+    """先写临时文件再原子替换，服务中的 worker 不会读到半个文件"""
+    path = os.path.join(output_dir, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class StaticAssets:
+    """用法与 db 一致：模块级实例 + init_app"""
+
+    def __init__(self, registry: Registry):
+        self.source_dir = None
+        self.output_dir = None
+        self.offload = ''
+        self.accel_prefix = '/_assets/'
+        self.files: Dict[str, dict] = {}
+        self._by_path: Dict[str, dict] = {}
+        self.requests = registry.counter(
+            'onepiece_static_requests_total', '前端静态资源请求数', ('encoding',))
+
+    def init_app(self, app):
+        self.source_dir = os.path.abspath(os.path.join(app.root_path, '..', 'frontend'))
+        self.output_dir = os.path.abspath(app.config.get('ASSETS_DIR') or os.path.join(app.instance_path, 'assets'))
+        self.offload = app.config.get('ASSETS_OFFLOAD', '')
+        self.accel_prefix = app.config.get('ASSETS_ACCEL_PREFIX', self.accel_prefix)
+        self.load()
+        app.extensions['assets'] = self
+
+    def load(self):
+        """读取 manifest（不存在时回退为直接读取 frontend/）"""
+        try:
+            with open(os.path.join(self.output_dir, MANIFEST), encoding='utf-8') as f:
+                self.files = json.load(f)['files']
+        except FileNotFoundError:
+            self.files = {}
+        self._by_path = {entry['path']: entry for entry in self.files.values()}
+        if self.files:
+            logger.info('已加载静态资源清单: %s 个文件', len(self.files))
+
+    def build(self) -> dict:
+        stats = build_assets(self.source_dir, self.output_dir)
+        self.load()
+        return stats
+
+    def url(self, path: str) -> str:
+        """逻辑路径 -> 带指纹的 URL（未构建时返回原路径）"""
+        entry = self.files.get(path)
+        return URL_PREFIX + (entry['path'] if entry else path)
+
+    def serve(self, filename: str):
+        if not self.files:
+            return send_from_directory(self.source_dir, filename)
+
+        entry = self._by_path.get(filename)
+        cache_control = IMMUTABLE
+        if entry is None:
+            entry = self.files.get(filename)
+            cache_control = 'no-cache'
+        if entry is None:
+            abort(404)
+
+        headers = {'Cache-Control': cache_control}
+        if entry['encodings']:
+            headers['Vary'] = 'Accept-Encoding'
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+        if self.offload == 'x-accel-redirect':
+            # 编码选择、ETag 与条件请求均由 nginx 处理
+            self.requests.inc(labels=('offload',))
+            headers['X-Accel-Redirect'] = self.accel_prefix + entry['path']
+            return Response(headers=headers, mimetype=mimetype)
+
+        encoding = self._negotiate(entry['encodings'])
+        self.requests.inc(labels=(encoding or 'identity',))
+        etag = f'{entry["etag"]}-{encoding or "identity"}'
+        headers['ETag'] = f'"{etag}"'
+        if etag in request.if_none_match:
+            return Response(status=304, headers=headers)
+
+        path = os.path.join(self.output_dir, entry['path'] + (ENCODINGS[encoding] if encoding else ''))
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        if self.offload == 'x-sendfile':
+            headers['X-Sendfile'] = path
+            return Response(headers=headers, mimetype=mimetype)
+
+        response = send_file(path, mimetype=mimetype, etag=False, conditional=False, max_age=None)
+        response.headers.update(headers)
+        return response
+
+    @staticmethod
+    def _negotiate(available) -> Optional[str]:
+        best, best_q = None, 0
+        for encoding in ENCODINGS:
+            if encoding not in available:
+                continue
+            q = request.accept_encodings.quality(encoding)
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+
+assets = StaticAssets(registry)
@@ -0,0 +1,68 @@
+"""
+认证 - 每个应用一个 AuthService 实例与 login_required 装饰器
+
+    @crew_bp.route('', methods=['POST'])
+    @login_required
+    def create():
+        g.current_user  # {'user_id': ..., 'username': ...}
+
+token 从 Authorization 头读取（可带 Bearer 前缀）；校验结果缓存在 AuthService 中，
+重复请求只需一次 sha256 和字典查找
+"""
+import weakref
+from functools import wraps
+
+from flask import current_app, g, request
+
+from onepiece.services.auth_service import AuthService
+from onepiece.utils.metrics import Registry, registry
+from onepiece.utils.response import unauthorized
+
+
+class TokenAuth:
+    """用法与 db 一致：模块级实例 + init_app"""
+
+    def __init__(self, registry: Registry):
+        self._services = weakref.WeakSet()
+        registry.gauge('onepiece_auth_token_cache_entries', '已缓存的验证通过的 token 数',
+                       function=lambda: [((), sum(len(s.token_cache) for s in self._services))])
+        registry.gauge('onepiece_auth_token_cache_lookups', 'token 缓存查询次数（累计）', ('result',),
+                       function=lambda: [(('hit',), sum(s.token_cache.hits for s in self._services)),
+                                         (('miss',), sum(s.token_cache.misses for s in self._services))])
+        registry.gauge('onepiece_auth_revoked_tokens', '内存中未过期的已注销 token 数',
+                       function=lambda: [((), sum(len(s.revocations) for s in self._services))])
+
+    def init_app(self, app):
+        service = AuthService(
+            app.config['SECRET_KEY'],
+            token_cache_size=app.config.get('AUTH_TOKEN_CACHE_SIZE', 10000),
+            revocation_reload_seconds=app.config.get('AUTH_REVOCATION_RELOAD_SECONDS', 30)
+        )
+        self.track(service)
+        app.extensions['auth_service'] = service
+
+    def track(self, service: AuthService):
+        """把 service 的 token 缓存与注销列表计入指标（ASGI 应用自行创建的实例也经此登记）"""
+        self._services.add(service)
+
+    @property
+    def service(self) -> AuthService:
+        """当前应用的 AuthService"""
+        return current_app.extensions['auth_service']
+
+    def login_required(self, view):
+        """校验 Authorization 头中的 token，通过后用户信息放在 g.current_user"""
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            ok, user, message = self.service.verify_token(request.headers.get('Authorization', ''))
+            if not ok:
+                return unauthorized(message)
+            g.current_user = user
+            return view(*args, **kwargs)
+
+        return wrapper
+
+
+token_auth = TokenAuth(registry)
+login_required = token_auth.login_required
@@ -0,0 +1,50 @@
+"""
+悬赏金解析 - 把 '30亿贝里'、'40.48亿贝里以上' 这类展示文本转换为整数贝里
+"""
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Optional
+
+_UNITS = {'十': 10, '百': 100, '千': 1000, '万': 10 ** 4, '亿': 10 ** 8}
+_BOUNTY_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([十百千万亿]*)')
+
+
+def parse_bounty(text) -> Optional[int]:
+    """
+    解析悬赏金文本
+
+    Args:
+        text: 展示用悬赏金，如 '3.66亿贝里'、'1000贝里'、'未知'
+
+    Returns:
+        Optional[int]: 贝里数；无法识别时返回 None
+    """
+    if text is None:
+        return None
+    if isinstance(text, int):
+        return text
+
+    match = _BOUNTY_RE.search(str(text))
+    if not match:
+        return None
+
+    try:
+        value = Decimal(match.group(1).replace(',', ''))
+    except InvalidOperation:
+        return None
+    for unit in match.group(2):
+        value *= _UNITS[unit]
+    return int(value)
+
+
+def format_bounty(value: Optional[int]) -> Optional[str]:
+    """把贝里数格式化为展示文本，如 8816000000 -> '88.16亿贝里'"""
+    if value is None:
+        return None
+    if value >= 10 ** 8:
+        number = Decimal(value) / 10 ** 8
+        return f'{number.quantize(Decimal("0.01")).normalize():f}亿贝里'
+    if value >= 10 ** 4:
+        number = Decimal(value) / 10 ** 4
+        return f'{number.quantize(Decimal("0.01")).normalize():f}万贝里'
+    return f'{value}贝里'
@@ -0,0 +1,64 @@
+"""
+批量接口公共工具 - 分批、逐条校验与结果汇总
+"""
+from typing import Iterable, List, Optional
+
+from sqlalchemy import Integer, String
+
+# 批量接口单次请求的最大条数与每个事务的条数
+BULK_MAX_ITEMS = 5000
+BULK_CHUNK_SIZE = 500
+
+
+def chunks(items: list, size: int = BULK_CHUNK_SIZE):
+    """按固定大小切分列表"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def is_id(value) -> bool:
+    """整数主键（JSON 中的 true/false 在 Python 里是 int 的子类，不算）"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def check_types(data: dict, table, numeric_text: Iterable[str] = ()) -> Optional[str]:
+    """
+    按表的列类型逐字段校验一条数据，写入前发现格式错误，避免一条坏数据使整批事务失败
+
+    字符串列只接受 str 且不超过列长度，整数列只接受整数（不含 bool），None 表示置空；
+    numeric_text 中的字符串列还接受数值（如悬赏金可以直接给贝里数）
+
+    Returns:
+        Optional[str]: 错误消息，校验通过时为 None
+    """
+    for name, value in data.items():
+        if value is None or name not in table.c:
+            continue
+        column_type = table.c[name].type
+        if isinstance(column_type, String):
+            if isinstance(value, str):
+                if column_type.length and len(value) > column_type.length:
+                    return f'{name} 不能超过 {column_type.length} 个字符'
+            elif not (name in numeric_text and isinstance(value, (int, float)) and not isinstance(value, bool)):
+                return f'{name} 应为字符串'
+        elif isinstance(column_type, Integer) and not is_id(value):
+            return f'{name} 应为整数'
+    return None
+
+
+def bulk_summary(results: List[dict]) -> dict:
+    """逐条结果 + 成功/失败计数"""
+    succeeded = sum(1 for r in results if r['success'])
+    return {'results': results, 'succeeded': succeeded, 'failed': len(results) - succeeded}
+
+
+def bulk_message(action: str, results: List[dict]) -> str:
+    succeeded = sum(1 for r in results if r['success'])
+    return f'批量{action}完成: 成功 {succeeded} 条, 失败 {len(results) - succeeded} 条'
+
+
+def read_bulk_items(payload, key: str = 'items'):
+    """请求体既可以是数组，也可以是 {key: 数组}；格式不对时返回 None"""
+    if isinstance(payload, dict):
+        payload = payload.get(key)
+    return payload if isinstance(payload, list) else None
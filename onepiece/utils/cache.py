@@ -0,0 +1,332 @@
+"""
+Service 读缓存 - 进程内 LRU+TTL / 可插拔共享后端，写操作按标签精确失效
+
+每个缓存条目记录生成时所依赖标签（如 'crew:list'、'crew:3'、'group:1'）的版本号，
+读取时与当前版本比对，任一标签被 invalidate 过即视为未命中。
+失效只需给标签版本号加一，无需枚举或删除具体的缓存 key。
+"""
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+# 任何失效都会递增的全局标签，用于丢弃查询期间发生过写入的结果
+_GENERATION_TAG = '*'
+# 共享数据版本号（onepiece.utils.data_version）的缓存 key
+_DATA_VERSIONS_KEY = 'data_versions'
+
+
+class MemoryBackend:
+    """进程内 LRU + TTL 后端"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+        # 标签版本号单独存放，不参与 LRU 淘汰，保证版本单调递增
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_versions(self, tags: List[str]) -> List[int]:
+        with self._lock:
+            return [self._versions.setdefault(tag, time.time_ns()) for tag in tags]
+
+    def bump(self, tags: Iterable[str]):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, time.time_ns()) + 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    """
+    共享后端，多进程/多实例共用同一份缓存与标签版本
+
+    client 只需提供 redis-py 的 get/set/delete/mget/incr 接口，测试时可用本地替身代替
+    """
+
+    name = 'redis'
+
+    def __init__(self, client, prefix: str = 'onepiece:cache:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str):
+        raw = self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value, ttl: float):
+        self.client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), px=max(1, int(ttl * 1000)))
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def get_versions(self, tags: List[str]) -> List[int]:
+        keys = [f'{self.prefix}tag:{tag}' for tag in tags]
+        versions = self.client.mget(keys)
+        for i, version in enumerate(versions):
+            if version is None:
+                # 版本号丢失（首次使用或被淘汰）时用时间戳初始化，避免与旧条目记录的版本碰撞
+                self.client.set(keys[i], time.time_ns(), nx=True)
+                version = self.client.get(keys[i])
+            versions[i] = int(version)
+        return versions
+
+    def bump(self, tags: Iterable[str]):
+        for tag in tags:
+            self.client.incr(f'{self.prefix}tag:{tag}')
+
+
+def resolve_backend(backend: str, processes: int, redis_url: str) -> str:
+    """
+    实际使用的缓存后端
+
+    memory 的失效只作用于本进程，多进程时其他进程会在 TTL 内返回旧数据：
+    auto 在多进程下改用 redis（需设置 CACHE_REDIS_URL）或不缓存，显式配置 memory 时给出警告
+    """
+    if backend == 'auto':
+        if processes <= 1:
+            return 'memory'
+        if redis_url:
+            return 'redis'
+        logger.info('多进程运行且未设置 CACHE_REDIS_URL，Service 读缓存已关闭')
+        return 'none'
+    if backend == 'memory' and processes > 1:
+        logger.warning('CACHE_BACKEND=memory 与 %s 个进程同时使用：写入只使本进程的缓存失效，'
+                       '其他进程最长在 CACHE_TTL 内返回旧数据，建议改用 redis', processes)
+    return backend
+
+
+class ServiceCache:
+    """Service 读方法缓存，用法与 db 一致：模块级实例 + init_app"""
+
+    def __init__(self):
+        self.backend = None
+        self.ttl = 60
+        self.version_ttl = 1
+        self.hits = 0
+        self.misses = 0
+        # 最近一次看到的共享数据版本号（见 observe）
+        self._observed = {}
+
+    def init_app(self, app):
+        """根据配置选择后端：CACHE_BACKEND = auto | memory | redis | none"""
+        backend = resolve_backend(
+            app.config.get('CACHE_BACKEND', 'auto'),
+            app.config.get('SERVER_PROCESSES', 1),
+            app.config.get('CACHE_REDIS_URL', '')
+        )
+        self.ttl = app.config.get('CACHE_TTL', 60)
+        self.version_ttl = app.config.get('CACHE_VERSION_TTL', 1)
+
+        if backend == 'memory':
+            self.backend = MemoryBackend(app.config.get('CACHE_MAX_ENTRIES', 10000))
+        elif backend == 'redis':
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError('CACHE_BACKEND=redis 需要安装 redis 包')
+            url = app.config.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0'
+            self.backend = RedisBackend(redis.Redis.from_url(url))
+        else:
+            self.backend = None
+        self.hits = self.misses = 0
+        self._observed = {}
+        app.extensions['service_cache'] = self
+
+    def cached(self, name: str, tags):
+        """
+        缓存 Service 读方法的 (成功标志, 数据, 消息) 结果，只缓存成功结果
+
+        Args:
+            name: 缓存 key 前缀
+            tags: tags(result, *args, **kwargs) -> 依赖的标签列表，可依据结果数据决定
+
+        也可用于 async 方法（onepiece.asgi 的异步 Service），同名的同步/异步方法共用缓存条目
+        """
+        def decorator(f):
+            if inspect.iscoroutinefunction(f):
+                @wraps(f)
+                async def async_wrapper(service, *args, **kwargs):
+                    if self.backend is None:
+                        return await f(service, *args, **kwargs)
+
+                    key = f'{name}:{args!r}:{sorted(kwargs.items())!r}'
+                    value = self._get(key)
+                    if value is not _MISSING:
+                        self.hits += 1
+                        return value
+
+                    self.misses += 1
+                    generation = self.generation()
+                    result = await f(service, *args, **kwargs)
+                    if result[0]:
+                        self._set(key, result, tags(result[1], *args, **kwargs), generation)
+                    return result
+                return async_wrapper
+
+            @wraps(f)
+            def wrapper(service, *args, **kwargs):
+                if self.backend is None:
+                    return f(service, *args, **kwargs)
+
+                key = f'{name}:{args!r}:{sorted(kwargs.items())!r}'
+                value = self._get(key)
+                if value is not _MISSING:
+                    self.hits += 1
+                    return value
+
+                self.misses += 1
+                generation = self.generation()
+                result = f(service, *args, **kwargs)
+                if result[0]:
+                    self._set(key, result, tags(result[1], *args, **kwargs), generation)
+                return result
+            return wrapper
+        return decorator
+
+    def invalidate(self, *tags):
+        """写操作提交后调用：使依赖这些标签的缓存全部失效"""
+        if self.backend is None:
+            return
+        tags = [t for t in tags if t] + [_GENERATION_TAG]
+        try:
+            self.backend.bump(tags)
+            self.backend.delete(_DATA_VERSIONS_KEY)
+        except Exception as e:
+            logger.error('缓存失效失败: %s %s', tags, e)
+
+    def data_versions(self) -> Optional[dict]:
+        """
+        缓存中的共享数据版本号（条件 GET 用），未缓存、已过期或缓存未启用时返回 None
+
+        未命中时调用方先取 generation()，再查询数据库并 store_data_versions。
+        写入提交后的 invalidate 会删除该条目，期间发生过失效的查询结果不会写入
+        """
+        if self.backend is None or self.version_ttl <= 0:
+            return None
+        try:
+            return self.backend.get(_DATA_VERSIONS_KEY)
+        except Exception as e:
+            logger.error('读取数据版本号缓存失败: %s', e)
+            return None
+
+    def generation(self) -> Optional[List[int]]:
+        """全局标签版本号，查询前读取，传给 store_data_versions 以丢弃查询期间被失效的结果"""
+        return self.tag_versions([_GENERATION_TAG])
+
+    def store_data_versions(self, versions: dict, generation: Optional[List[int]]):
+        if self.backend is None or self.version_ttl <= 0 or not versions:
+            return
+        try:
+            if generation is None or self.generation() != generation:
+                return
+            self.backend.set(_DATA_VERSIONS_KEY, versions, self.version_ttl)
+        except Exception as e:
+            logger.error('写入数据版本号缓存失败: %s', e)
+
+    def observe(self, versions: dict):
+        """
+        条件 GET 读到的共享数据版本号（onepiece.utils.data_version）
+
+        与上次看到的不同说明有进程写入过（可能是其他 worker 或命令行进程，本进程的失效没有覆盖到）：
+        清空进程内缓存并递增全局标签，丢弃查询中的结果，避免用旧条目生成带新 ETag 的响应。
+        共享后端由写入方直接失效，无需处理
+        """
+        if not isinstance(self.backend, MemoryBackend):
+            return
+        changed = any(self._observed.get(scope, version) != version for scope, version in versions.items())
+        self._observed.update(versions)
+        if changed:
+            self.backend.clear()
+            self.invalidate()
+
+    def tag_versions(self, tags: List[str]) -> Optional[List[int]]:
+        """标签当前版本号，缓存未启用时返回 None"""
+        if self.backend is None:
+            return None
+        try:
+            return self.backend.get_versions(tags)
+        except Exception as e:
+            logger.error('读取缓存版本失败: %s', e)
+            return None
+
+    def stats(self) -> dict:
+        """命中率统计（当前进程）"""
+        total = self.hits + self.misses
+        data = {
+            'backend': self.backend.name if self.backend else None,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
+        if isinstance(self.backend, MemoryBackend):
+            data['entries'] = len(self.backend)
+            data['max_entries'] = self.backend.max_entries
+            data['evictions'] = self.backend.evictions
+        return data
+
+    def _get(self, key: str) -> Any:
+        try:
+            entry = self.backend.get(key)
+            if entry is None:
+                return _MISSING
+            tags, versions, value = entry
+            if self.backend.get_versions(tags) != versions:
+                return _MISSING
+            return tuple(value)
+        except Exception as e:
+            logger.error('读取缓存失败: %s %s', key, e)
+            return _MISSING
+
+    def _set(self, key: str, value, tags: List[str], generation: Optional[List[int]]):
+        try:
+            if generation is None or self.generation() != generation:
+                return
+            versions = self.backend.get_versions(tags)
+            self.backend.set(key, [tags, versions, list(value)], self.ttl)
+        except Exception as e:
+            logger.error('写入缓存失败: %s %s', key, e)
+
+
+cache = ServiceCache()
@@ -0,0 +1,57 @@
+"""
+共享数据版本号 - 让进程内的派生数据感知其他进程的写入
+
+data_versions 表中每张业务表一行（crew / group）。写操作在提交前于同一事务内递增对应版本号，
+进程内的搜索索引等通过比对版本号发现其他 worker、flask import-data / seed 等进程的写入。
+
+- 版本行由迁移 m0005（flask migrate / init-db）创建；缺少版本行时视为版本未知，使用方不做比对
+- 同一事务内递增后读回的版本号恰好比本进程记录的大 1，说明期间没有其他进程写入
+- UPDATE 按主键顺序加行锁直到提交，并发写同一张表的事务在此排队，写事务应尽快提交
+"""
+from typing import Dict, Iterable
+
+from sqlalchemy import insert, select, update
+
+from onepiece.models.data_version import DataVersion
+from onepiece.models.database import db
+
+CREW = 'crew'
+GROUP = 'group'
+SCOPES = (CREW, GROUP)
+# 表名 -> 版本号名称
+TABLE_SCOPES = {'crew_members': CREW, 'pirate_groups': GROUP}
+
+_table = DataVersion.__table__
+
+
+def bump_statement(scopes: Iterable[str]):
+    return update(_table).where(_table.c.name.in_(sorted(set(scopes)))).values(version=_table.c.version + 1)
+
+
+def select_statement(scopes: Iterable[str] = SCOPES):
+    return select(_table.c.name, _table.c.version).where(_table.c.name.in_(list(scopes)))
+
+
+def bump(*scopes: str) -> Dict[str, int]:
+    """
+    在当前事务中递增版本号（commit 之前调用）
+
+    Returns:
+        Dict[str, int]: 递增后的版本号，缺少版本行的名称不在其中
+    """
+    db.session.execute(bump_statement(scopes))
+    return current(scopes)
+
+
+def current(scopes: Iterable[str] = SCOPES) -> Dict[str, int]:
+    """当前版本号 {名称: 版本}"""
+    return dict(db.session.execute(select_statement(scopes)).all())
+
+
+def ensure_rows():
+    """补齐缺少的版本行（需在应用上下文中调用）"""
+    with db.engine.begin() as conn:
+        existing = set(conn.execute(select(_table.c.name)).scalars())
+        missing = [{'name': scope, 'version': 0} for scope in SCOPES if scope not in existing]
+        if missing:
+            conn.execute(insert(_table), missing)
@@ -0,0 +1,129 @@
+"""
+数据库连接池配置与监控
+
+- 由 DB_POOL_* 配置生成 SQLALCHEMY_ENGINE_OPTIONS（内存 SQLite 不使用连接池参数）
+- InstrumentedQueuePool 统计获取连接的等待时间、溢出连接、超时次数（同时输出到 /api/common/metrics）
+- 监听 invalidate 事件，统计因 pre-ping 失败或 MySQL wait_timeout 断开而被丢弃的连接
+
+统计为当前进程（单个 worker）内的数据
+"""
+import time
+import weakref
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+from onepiece.utils.metrics import registry
+
+# 获取连接等待时间的分桶上界（秒）
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMonitor:
+    """连接池统计，用法与 db 一致：模块级实例 + init_app（需在 db.init_app 之前调用）"""
+
+    def __init__(self):
+        self.pools = weakref.WeakSet()
+        self.wait = registry.histogram(
+            'onepiece_db_pool_wait_seconds', '从连接池获取连接的等待时间（秒）', buckets=WAIT_BUCKETS)
+        self.checkouts = registry.counter('onepiece_db_pool_checkouts_total', '获取连接次数')
+        self.overflow_checkouts = registry.counter(
+            'onepiece_db_pool_overflow_checkouts_total', '超出 pool_size 新建溢出连接的次数')
+        self.timeouts = registry.counter('onepiece_db_pool_timeouts_total', '获取连接超时次数')
+        self.invalidated = registry.counter(
+            'onepiece_db_pool_invalidated_total', '被丢弃的失效连接数（pre-ping 失败、连接断开等）')
+        registry.gauge('onepiece_db_pool_checked_out', '当前借出的连接数',
+                       function=lambda: [((), sum(p.checkedout() for p in self.pools))])
+        registry.gauge('onepiece_db_pool_overflow', '当前溢出连接数',
+                       function=lambda: [((), sum(max(p.overflow(), 0) for p in self.pools))])
+
+    def init_app(self, app):
+        """根据 DB_POOL_* 配置补全引擎参数，已显式配置的项不覆盖"""
+        options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+        for key, value in engine_options(app.config).items():
+            options.setdefault(key, value)
+        app.extensions['pool_monitor'] = self
+
+    def record_checkout(self, waited: float, overflowed: bool):
+        self.wait.observe(waited)
+        self.checkouts.inc()
+        if overflowed:
+            self.overflow_checkouts.inc()
+
+    def record_timeout(self, waited: float):
+        self.wait.observe(waited)
+        self.timeouts.inc()
+
+    def record_invalidate(self, *args):
+        self.invalidated.inc()
+
+    def stats(self, engine) -> dict:
+        """
+        连接池实时状态 + 累计统计
+
+        checked_out 接近 size + max_overflow 且等待时间上升说明连接池/数据库饱和，
+        等待时间低而延迟高则瓶颈在 CPU
+        """
+        pool = engine.pool
+        data = {'pool': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            data.update({
+                'size': pool.size(),
+                'max_overflow': pool._max_overflow,
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+                'timeout': pool.timeout()
+            })
+        data.update({
+            'checkouts': self.checkouts.value(),
+            'overflow_checkouts': self.overflow_checkouts.value(),
+            'timeouts': self.timeouts.value(),
+            'invalidated': self.invalidated.value(),
+            'wait_seconds': self.wait.snapshot()
+        })
+        return data
+
+
+pool_monitor = PoolMonitor()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """记录每次获取连接耗时的 QueuePool"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        pool_monitor.pools.add(self)
+
+    def _do_get(self):
+        overflow_before = self._overflow
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_monitor.record_timeout(time.perf_counter() - start)
+            raise
+        overflowed = self._overflow > overflow_before and self._overflow > 0
+        pool_monitor.record_checkout(time.perf_counter() - start, overflowed)
+        return conn
+
+
+event.listen(InstrumentedQueuePool, 'invalidate', pool_monitor.record_invalidate)
+event.listen(InstrumentedQueuePool, 'soft_invalidate', pool_monitor.record_invalidate)
+
+
+def engine_options(config) -> dict:
+    """由 DB_POOL_* 配置生成连接池参数"""
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        # 内存库由 Flask-SQLAlchemy 使用 StaticPool，不适用连接池参数
+        return {}
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config.get('DB_POOL_SIZE', 5),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 10),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', True)
+    }
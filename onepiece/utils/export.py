@@ -0,0 +1,100 @@
+"""
+流式导出工具 - 把逐行产生的字典编码成 NDJSON / CSV 文本块
+"""
+import csv
+import io
+import json
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List
+
+# 输出缓冲达到该大小时产出一个文本块，兼顾吞吐与内存
+FLUSH_SIZE = 64 * 1024
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8'
+}
+
+
+def flatten(record: dict, prefix: str = '') -> dict:
+    """嵌套字典展开为单层，如 abilities.devil_fruit"""
+    flat = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f'{prefix}{key}.'))
+        else:
+            flat[f'{prefix}{key}'] = value
+    return flat
+
+
+def ndjson_stream(records: Iterable[dict]) -> Iterator[str]:
+    """每行一个 JSON 对象；首行立即产出，之后按 FLUSH_SIZE 聚合"""
+    buffer, size, first = [], 0, True
+    for record in records:
+        line = _ndjson_line(record)
+        buffer.append(line)
+        size += len(line)
+        if first or size >= FLUSH_SIZE:
+            yield ''.join(buffer)
+            buffer, size, first = [], 0, False
+    if buffer:
+        yield ''.join(buffer)
+
+
+def csv_stream(records: Iterable[dict], columns: List[str]) -> Iterator[str]:
+    """CSV 输出，表头立即产出；嵌套字段按 flatten 后的列名取值"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    yield _drain(out)
+
+    for record in records:
+        writer.writerow(_csv_row(record, columns))
+        if out.tell() >= FLUSH_SIZE:
+            yield _drain(out)
+    if out.tell():
+        yield _drain(out)
+
+
+async def ndjson_stream_async(records: AsyncIterable[dict]) -> AsyncIterator[str]:
+    """ndjson_stream 的异步版本（ASGI 模式，数据来自异步游标）"""
+    buffer, size, first = [], 0, True
+    async for record in records:
+        line = _ndjson_line(record)
+        buffer.append(line)
+        size += len(line)
+        if first or size >= FLUSH_SIZE:
+            yield ''.join(buffer)
+            buffer, size, first = [], 0, False
+    if buffer:
+        yield ''.join(buffer)
+
+
+async def csv_stream_async(records: AsyncIterable[dict], columns: List[str]) -> AsyncIterator[str]:
+    """csv_stream 的异步版本"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    yield _drain(out)
+
+    async for record in records:
+        writer.writerow(_csv_row(record, columns))
+        if out.tell() >= FLUSH_SIZE:
+            yield _drain(out)
+    if out.tell():
+        yield _drain(out)
+
+
+def _ndjson_line(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def _csv_row(record: dict, columns: List[str]) -> list:
+    flat = flatten(record)
+    return ['' if flat.get(c) is None else flat.get(c) for c in columns]
+
+
+def _drain(out: io.StringIO) -> str:
+    text = out.getvalue()
+    out.seek(0)
+    out.truncate()
+    return text
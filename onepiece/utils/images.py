@@ -0,0 +1,291 @@
+"""
+图片变体 - 按宽度/格式即时生成缩略图，结果按内容寻址缓存在磁盘
+
+    GET /images/luffy.jpg?w=240&fmt=webp            -> 302 到带 v 的地址
+    GET /images/luffy.jpg?w=240&fmt=webp&v=<哈希>   -> 变体内容，Cache-Control: immutable
+
+- v 为源文件内容哈希的前 16 位：源图替换后地址随之变化，浏览器与 CDN 可以永久缓存
+- 生成地址时源文件哈希在 IMAGE_DIGEST_TTL 秒内直接复用，序列化列表不必逐行 stat；处理图片请求时总是重新检查
+- 宽度只取 IMAGE_WIDTHS 中的档位（不小于请求宽度的最小档位），不放大，避免任意参数生成无限多的变体
+- 缓存文件名为 sha256(源文件哈希 + 宽度 + 格式 + 质量)，先写临时文件再原子替换，多个 worker 共用同一目录
+- 缓存总大小超过 IMAGE_CACHE_MAX_BYTES 时按最近访问时间淘汰到 90%
+- 依赖 Pillow（pip install -e .[images]）；未安装时变体地址退化为原图地址
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Optional, Tuple
+
+from flask import abort, redirect, request, send_file, send_from_directory
+from werkzeug.security import safe_join
+
+from onepiece.utils.metrics import Registry, registry
+from onepiece.utils.response import error
+
+logger = logging.getLogger(__name__)
+
+# 输出格式 -> (Pillow 格式名, MIME 类型, 扩展名)
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', '.webp'),
+    'jpeg': ('JPEG', 'image/jpeg', '.jpg'),
+    'png': ('PNG', 'image/png', '.png')
+}
+# 未指定 fmt 时沿用源文件格式
+EXTENSION_FORMATS = {'.jpg': 'jpeg', '.jpeg': 'jpeg', '.png': 'png', '.webp': 'webp'}
+
+URL_PREFIX = '/images/'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# 访问时间超过该间隔才刷新缓存文件的 mtime（淘汰依据），避免每次命中都写元数据
+TOUCH_INTERVAL = 3600
+
+
+class ImageVariants:
+    """用法与 db 一致：模块级实例 + init_app"""
+
+    def __init__(self, registry: Registry):
+        self.enabled = False
+        self.source_dir = None
+        self.cache_dir = None
+        self.widths = (120, 240, 480, 960)
+        self.quality = 80
+        self.max_bytes = 256 * 1024 * 1024
+        self.thumbnail_width = 240
+        self.thumbnail_format = 'webp'
+        self.digest_ttl = 5
+        self._digests = {}
+        self._bytes = None
+        self._locks = [threading.Lock() for _ in range(16)]
+        self._evict_lock = threading.Lock()
+        self.lookups = registry.counter(
+            'onepiece_image_variant_requests_total', '图片变体请求数', ('result',))
+        self.duration = registry.histogram(
+            'onepiece_image_variant_generate_seconds', '生成一个图片变体的耗时（秒）')
+        self.evicted = registry.counter(
+            'onepiece_image_variant_evicted_total', '因缓存超过上限被淘汰的变体文件数')
+        registry.gauge('onepiece_image_variant_cache_bytes', '图片变体磁盘缓存大小（字节，本进程估计值）',
+                       function=lambda: [((), self._bytes or 0)])
+
+    def init_app(self, app):
+        self.source_dir = os.path.abspath(
+            app.config.get('IMAGE_SOURCE_DIR') or os.path.join(app.root_path, '..', 'frontend', 'public', 'images'))
+        self.cache_dir = os.path.abspath(
+            app.config.get('IMAGE_CACHE_DIR') or os.path.join(app.instance_path, 'image-cache'))
+        self.widths = tuple(sorted(app.config.get('IMAGE_WIDTHS', self.widths)))
+        self.quality = app.config.get('IMAGE_QUALITY', self.quality)
+        self.max_bytes = app.config.get('IMAGE_CACHE_MAX_BYTES', self.max_bytes)
+        self.thumbnail_width = app.config.get('IMAGE_THUMBNAIL_WIDTH', self.thumbnail_width)
+        self.thumbnail_format = app.config.get('IMAGE_THUMBNAIL_FORMAT', self.thumbnail_format)
+        self.digest_ttl = app.config.get('IMAGE_DIGEST_TTL', self.digest_ttl)
+        self._digests = {}
+        self._bytes = None
+        try:
+            import PIL  # noqa: F401
+            self.enabled = True
+        except ImportError:
+            self.enabled = False
+            logger.info('未安装 Pillow，图片变体不可用，/images 只提供原图')
+        app.extensions['image_variants'] = self
+
+    def url(self, image_url: Optional[str], width: Optional[int] = None, fmt: Optional[str] = None) -> Optional[str]:
+        """
+        本地图片的变体地址（带内容哈希）
+
+        外部地址、源文件不存在或未安装 Pillow 时原样返回 image_url
+        """
+        if not self.enabled or not image_url or not image_url.startswith(URL_PREFIX):
+            return image_url
+        filename = image_url[len(URL_PREFIX):]
+        try:
+            width, fmt = self.normalize(filename, width, fmt)
+        except ValueError:
+            return image_url
+        digest = self.source_digest(filename)
+        if digest is None:
+            return image_url
+        return self._variant_url(filename, width, fmt, digest)
+
+    def thumbnail_url(self, image_url: Optional[str]) -> Optional[str]:
+        """列表页头像使用的缩略图地址"""
+        return self.url(image_url, self.thumbnail_width, self.thumbnail_format)
+
+    def normalize(self, filename: str, width: Optional[int], fmt: Optional[str]) -> Tuple[Optional[int], str]:
+        """
+        宽度取整到档位、补全格式
+
+        Raises:
+            ValueError: 格式不支持
+        """
+        fmt = fmt or EXTENSION_FORMATS.get(os.path.splitext(filename)[1].lower())
+        if fmt not in FORMATS:
+            raise ValueError(f'不支持的图片格式: {fmt}')
+        if width is not None:
+            width = next((w for w in self.widths if w >= width), self.widths[-1])
+        return width, fmt
+
+    def source_digest(self, filename: str, fresh: bool = False) -> Optional[str]:
+        """
+        源文件内容的 sha256，源文件不存在时返回 None
+
+        按 (mtime, size) 缓存，源图替换后重新计算；距上次 stat 不足 digest_ttl 秒时连 stat 也省去
+        （包括不存在的结果）。fresh=True 时总是 stat，生成变体前使用，避免把新内容存到旧哈希名下
+        """
+        path = safe_join(self.source_dir, filename)
+        if path is None:
+            return None
+        now = time.monotonic()
+        cached = self._digests.get(path)
+        if not fresh and cached is not None and now - cached[0] < self.digest_ttl:
+            return cached[2]
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._digests[path] = (now, None, None)
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if cached is not None and cached[1] == stamp:
+            self._digests[path] = (now, stamp, cached[2])
+            return cached[2]
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        self._digests[path] = (now, stamp, digest)
+        return digest
+
+    def variant(self, filename: str, width: Optional[int], fmt: str, digest: str) -> str:
+        """返回变体的缓存文件路径，不存在时生成"""
+        key = hashlib.sha256(f'{digest}|{width}|{fmt}|{self.quality}'.encode('utf-8')).hexdigest()
+        path = os.path.join(self.cache_dir, key[:2], key + FORMATS[fmt][2])
+        if self._touch(path):
+            self.lookups.inc(labels=('hit',))
+            return path
+
+        # 同一变体并发请求时只生成一次
+        with self._locks[int(key[:2], 16) % len(self._locks)]:
+            if self._touch(path):
+                self.lookups.inc(labels=('hit',))
+                return path
+            started = time.perf_counter()
+            size = self._generate(safe_join(self.source_dir, filename), path, width, fmt)
+            self.duration.observe(time.perf_counter() - started)
+            self.lookups.inc(labels=('generated',))
+
+        self._account(size, keep=path)
+        return path
+
+    def serve(self, filename: str):
+        """处理带 w / fmt 参数的 /images 请求"""
+        if not self.enabled:
+            return send_from_directory(self.source_dir, filename)
+
+        width = request.args.get('w', type=int)
+        if 'w' in request.args and (width is None or width <= 0):
+            return error('w 应为正整数')
+        try:
+            width, fmt = self.normalize(filename, width, request.args.get('fmt'))
+        except ValueError as e:
+            return error(str(e))
+
+        digest = self.source_digest(filename, fresh=True)
+        if digest is None:
+            abort(404)
+
+        args = request.args
+        if args.get('v') != digest[:16] or args.get('w', type=int) != width or args.get('fmt') != fmt:
+            # 未带版本、版本过期或宽度未取整：跳转到规范地址，跳转本身只短暂缓存
+            response = redirect(self._variant_url(filename, width, fmt, digest))
+            response.headers['Cache-Control'] = 'public, max-age=60'
+            return response
+
+        response = send_file(self.variant(filename, width, fmt, digest), mimetype=FORMATS[fmt][1])
+        response.headers['Cache-Control'] = IMMUTABLE
+        return response
+
+    def _variant_url(self, filename: str, width: Optional[int], fmt: str, digest: str) -> str:
+        query = f'w={width}&fmt={fmt}' if width else f'fmt={fmt}'
+        return f'{URL_PREFIX}{filename}?{query}&v={digest[:16]}'
+
+    def _generate(self, source: str, path: str, width: Optional[int], fmt: str) -> int:
+        from PIL import Image, ImageOps
+
+        pil_format = FORMATS[fmt][0]
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+            if width and image.width > width:
+                image.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+            if pil_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    image.save(f, pil_format, quality=self.quality, optimize=True)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        return os.path.getsize(path)
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return False
+        now = time.time()
+        if now - mtime > TOUCH_INTERVAL:
+            os.utime(path, (now, now))
+        return True
+
+    def _account(self, size: int, keep: str):
+        """累计缓存大小，超过上限时扫描目录淘汰最久未访问的文件（不淘汰刚生成、即将返回的 keep）"""
+        with self._evict_lock:
+            if self._bytes is None:
+                self._bytes = sum(entry[2] for entry in self._scan())
+            else:
+                self._bytes += size
+            if self._bytes <= self.max_bytes:
+                return
+
+            # 其他 worker 也在写同一目录，以实际扫描结果为准
+            entries = sorted(self._scan())
+            total = sum(entry[2] for entry in entries)
+            target = self.max_bytes * 0.9
+            for _, path, size in entries:
+                if total <= target:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total -= size
+                self.evicted.inc()
+            self._bytes = total
+
+    def _scan(self):
+        """(mtime, 路径, 大小) 序列"""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+
+image_variants = ImageVariants(registry)
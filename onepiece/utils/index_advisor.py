@@ -0,0 +1,222 @@
+"""
+索引顾问 - 记录服务执行的查询形态，在当前数据库上检查执行计划，给出缺失的（覆盖）索引建议
+
+    flask --app onepiece.app advise-indexes
+
+1. QueryRecorder 在执行代表性负载期间按指纹记录 SELECT 语句（每种形态保留一条样本及参数）
+2. 用 EXPLAIN（MySQL）/ EXPLAIN QUERY PLAN（SQLite）检查样本的执行计划，找出全表扫描与额外排序
+3. 对有问题的表按 等值列 → GROUP BY / ORDER BY / 范围列 的顺序拼出索引列，
+   查询只用到少量列时补齐成覆盖索引；已有索引前缀能满足的不重复建议
+
+建议只是起点：确认后写成 onepiece/migrations 下的迁移
+"""
+import re
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, inspect
+
+from onepiece.utils.query_monitor import fingerprint
+
+# 覆盖索引最多补齐的额外列数，再多就不如回表
+MAX_COVERING_EXTRA = 3
+# 行数少于该值的表全表扫描不算问题
+DEFAULT_MIN_ROWS = 1000
+
+_PARAM = r'(?:\?|%\(\w+\)s|%s|:\w+)'
+_EQ = re.compile(rf'(\w+)\.(\w+)\s*(?:=\s*{_PARAM}|IN\s*\(|IS NULL)', re.IGNORECASE)
+_RANGE = re.compile(rf'(\w+)\.(\w+)\s*(?:>=|<=|>|<)\s*{_PARAM}')
+_COLUMN = re.compile(r'(\w+)\.(\w+)')
+_CLAUSE_END = r'(?=\s+(?:GROUP BY|ORDER BY|LIMIT|OFFSET|HAVING)\b|$)'
+
+
+class QueryShape:
+    """一种查询形态：指纹 + 一条样本语句及参数"""
+
+    def __init__(self, statement: str, parameters):
+        self.statement = statement
+        self.parameters = parameters
+        self.count = 0
+        self.total_seconds = 0.0
+
+
+class QueryRecorder:
+    """上下文管理器：期间在 engine 上执行的 SELECT 按指纹归类记录"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.shapes: Dict[str, QueryShape] = {}
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._before)
+        event.listen(self.engine, 'after_cursor_execute', self._after)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._before)
+        event.remove(self.engine, 'after_cursor_execute', self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info['_index_advisor_start'] = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith('SELECT'):
+            return
+        fp = fingerprint(statement)
+        shape = self.shapes.get(fp)
+        if shape is None:
+            shape = self.shapes[fp] = QueryShape(statement, parameters)
+        shape.count += 1
+        shape.total_seconds += time.perf_counter() - conn.info.pop('_index_advisor_start', time.perf_counter())
+
+
+def explain(conn, statement: str, parameters) -> List[tuple]:
+    """
+    执行计划中的问题
+
+    Returns:
+        List[tuple]: [(表名或 None, 'full_scan' | 'filesort' | 'temporary')]
+    """
+    if conn.dialect.name == 'sqlite':
+        problems = []
+        for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters):
+            detail = row[-1]
+            match = re.match(r'SCAN (?:TABLE )?(\w+)$', detail)
+            if match:
+                problems.append((match.group(1), 'full_scan'))
+            elif detail.startswith('USE TEMP B-TREE'):
+                problems.append((None, 'filesort'))
+        return problems
+
+    problems = []
+    for row in conn.exec_driver_sql(f'EXPLAIN {statement}', parameters).mappings():
+        extra = row.get('Extra') or ''
+        if row.get('type') == 'ALL':
+            problems.append((row['table'], 'full_scan'))
+        if 'Using filesort' in extra:
+            problems.append((row['table'], 'filesort'))
+        if 'Using temporary' in extra:
+            problems.append((row['table'], 'temporary'))
+    return problems
+
+
+def _clause(statement: str, keyword: str) -> str:
+    match = re.search(rf'\b{keyword}\s+(.*?){_CLAUSE_END}', statement, re.IGNORECASE | re.DOTALL)
+    return match.group(1) if match else ''
+
+
+def propose_index(statement: str, table: str, existing: List[List[str]],
+                  primary_key: List[str]) -> Optional[List[str]]:
+    """
+    为语句在 table 上拼出索引列；没有可用列或已有索引可满足时返回 None
+
+    Args:
+        existing: 表上已有索引的列（按顺序）
+        primary_key: 主键列
+    """
+    where = _clause(statement, 'WHERE')
+    ordered = _clause(statement, 'GROUP BY') or _clause(statement, 'ORDER BY')
+    selected = _clause(statement, 'SELECT').split(' FROM ')[0]
+
+    columns = []
+
+    def add(found):
+        for tbl, col in found:
+            if tbl == table and col not in columns:
+                columns.append(col)
+
+    add(_EQ.findall(where))
+    add(_COLUMN.findall(ordered) or _RANGE.findall(where))
+    if not columns or columns == primary_key:
+        return None
+
+    extra = [c for t, c in _COLUMN.findall(selected) if t == table and c not in columns and c not in primary_key]
+    if 0 < len(set(extra)) <= MAX_COVERING_EXTRA:
+        columns.extend(dict.fromkeys(extra))
+
+    for index_columns in existing:
+        if index_columns[:len(columns)] == columns:
+            return None
+    return columns
+
+
+def index_name(table: str, columns: List[str]) -> str:
+    return f'ix_{table}_{"_".join(columns)}'[:64]
+
+
+def advise(engine, shapes: Dict[str, QueryShape], min_rows: int = DEFAULT_MIN_ROWS) -> List[dict]:
+    """
+    逐个形态检查执行计划并给出建议
+
+    Returns:
+        List[dict]: 按累计耗时降序，每项含 fingerprint、count、total_ms、problems、suggestions
+    """
+    inspector = inspect(engine)
+    indexes, primary_keys, row_counts = {}, {}, {}
+
+    def table_info(table):
+        if table not in indexes:
+            indexes[table] = [i['column_names'] for i in inspector.get_indexes(table)]
+            indexes[table] += [u['column_names'] for u in inspector.get_unique_constraints(table)]
+            primary_keys[table] = inspector.get_pk_constraint(table)['constrained_columns']
+            with engine.connect() as conn:
+                row_counts[table] = conn.exec_driver_sql(f'SELECT COUNT(*) FROM {table}').scalar()
+        return indexes[table], primary_keys[table], row_counts[table]
+
+    report = []
+    with engine.connect() as conn:
+        for fp, shape in shapes.items():
+            problems = explain(conn, shape.statement, shape.parameters)
+            from_table = re.search(r'\bFROM\s+(\w+)', shape.statement, re.IGNORECASE)
+            suggestions, seen = [], set()
+            for table, kind in problems:
+                table = table or (from_table.group(1) if from_table else None)
+                if table is None or table in seen or not inspector.has_table(table):
+                    continue
+                seen.add(table)
+                existing, primary_key, rows = table_info(table)
+                if rows < min_rows:
+                    continue
+                columns = propose_index(shape.statement, table, existing, primary_key)
+                if columns:
+                    suggestions.append({
+                        'table': table,
+                        'columns': columns,
+                        'ddl': f'CREATE INDEX {index_name(table, columns)} ON {table} ({", ".join(columns)})'
+                    })
+            report.append({
+                'fingerprint': fp,
+                'count': shape.count,
+                'total_ms': round(shape.total_seconds * 1000, 1),
+                'problems': problems,
+                'suggestions': suggestions
+            })
+    report.sort(key=lambda r: r['total_ms'], reverse=True)
+    return report
+
+
+def run_service_workload(repeat: int = 3):
+    """
+    以常用参数调用各 Service 的读接口（需在应用上下文中），覆盖线上的主要查询形态
+    """
+    from onepiece.models import db, CrewMember, PirateGroup
+    from onepiece.services import CrewService, PirateGroupService
+
+    crew_service, group_service = CrewService(), PirateGroupService()
+    group_ids = [r.id for r in db.session.query(PirateGroup.id).order_by(PirateGroup.id).limit(repeat)]
+    member_ids = [r.id for r in db.session.query(CrewMember.id).order_by(CrewMember.id).limit(repeat)]
+
+    for group_id, member_id in zip(group_ids, member_ids):
+        for sort in CrewService.SORT_FIELDS:
+            for order in (sort, f'-{sort}'):
+                ok, page, _ = crew_service.get_all(sort=order)
+                if ok and page['next_cursor']:
+                    crew_service.get_all(sort=order, after=page['next_cursor'])
+                crew_service.get_all(pirate_group_id=group_id, sort=order)
+        crew_service.get_all(min_bounty=10 ** 8, sort='-bounty')
+        crew_service.get_by_id(member_id)
+        group_service.get_all()
+        group_service.get_by_id(group_id, include_members=True)
+        group_service.get_members(group_id)
+    group_service.get_bounty_totals()
+    db.session.remove()
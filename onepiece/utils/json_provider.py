@@ -0,0 +1,112 @@
+"""
+JSON 序列化 - orjson 优先、未安装时使用标准库，两者输出相同的字节
+
+    JSON_PROVIDER = auto | orjson | stdlib
+
+输出格式：UTF-8（中文不转义为 \\uXXXX）、键排序、紧凑分隔符，响应体末尾带换行。
+orjson 不支持的值（超过 64 位的整数等）自动改用标准库编码；日期时间与标准库一样按
+Flask 的规则转为 HTTP 日期，避免切换实现导致输出变化。
+orjson 对绝对值不小于 1e16 或小于 1e-4 的浮点数写法不同（1e16 / 1e+16、0.000015 / 1.5e-05），
+输出中出现这类数字时整体改用标准库编码；其余浮点数两者都是最短往返表示，字节相同。
+NaN / Infinity 不是合法 JSON（标准库输出 NaN，orjson 输出 null），接口不返回这类值。
+"""
+import json
+import logging
+import re
+
+from flask.json.provider import DefaultJSONProvider, _default
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ('auto', 'orjson', 'stdlib')
+# orjson 输出中与标准库写法不同的浮点数：带指数，或 0.0000 开头（标准库写成 e-05 等）。
+# 只匹配位于开头或 : , [ 之后的数字；字符串中恰好出现这类片段时只是多走一次标准库，结果仍然正确
+_DIFFERENT_FLOAT = re.compile(rb'(?:^|[:,\[])-?(?:\d+(?:\.\d+)?e|0\.0000)')
+
+if orjson is not None:
+    # datetime 交给 _default 处理，与标准库输出一致
+    ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def stdlib_dumps(obj) -> bytes:
+    return json.dumps(obj, default=_default, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def orjson_dumps(obj) -> bytes:
+    try:
+        data = orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+    except orjson.JSONEncodeError:
+        return stdlib_dumps(obj)
+    if _DIFFERENT_FLOAT.search(data):
+        return stdlib_dumps(obj)
+    return data
+
+
+def select_dumps(name: str = 'auto'):
+    """按名称选择编码函数；要求 orjson 但未安装时抛出 RuntimeError"""
+    if name not in PROVIDERS:
+        raise RuntimeError(f'不支持的 JSON_PROVIDER: {name}')
+    if name == 'stdlib' or (name == 'auto' and orjson is None):
+        return stdlib_dumps
+    if orjson is None:
+        raise RuntimeError('JSON_PROVIDER=orjson 需要安装 orjson 包')
+    return orjson_dumps
+
+
+class JSONCodec:
+    """用法与 db 一致：模块级实例 + init_app；应用初始化前（ASGI 响应、脚本）按 auto 选择实现"""
+
+    def __init__(self):
+        self.dumps = select_dumps()
+
+    def init_app(self, app):
+        self.dumps = select_dumps(app.config.get('JSON_PROVIDER', 'auto'))
+        app.json = FastJSONProvider(app, self)
+        logger.debug('JSON 编码: %s', self.dumps.__name__)
+
+    def envelope(self, fields: dict) -> bytes:
+        """
+        响应体字节：顶层字段按键排序逐个编码后一次拼接（b''.join 预先算好总长度），
+        与 dumps(fields) + b'\\n' 的输出相同，省去中间字符串与再次编码
+        """
+        dumps = self.dumps
+        parts = [b'{']
+        for key in sorted(fields):
+            parts += (dumps(key), b':', dumps(fields[key]), b',')
+        # 替换最后一个逗号；空字典时没有逗号，补上右括号
+        if fields:
+            parts[-1] = b'}\n'
+        else:
+            parts.append(b'}\n')
+        return b''.join(parts)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider：jsonify / app.json.dumps 使用 codec 的实现，直接以字节构造响应"""
+
+    ensure_ascii = False
+    sort_keys = True
+
+    def __init__(self, app, codec: JSONCodec):
+        super().__init__(app)
+        self.codec = codec
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.codec.dumps(obj).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        if self.compact is False or (self.compact is None and self._app.debug):
+            # 调试模式下的缩进输出保持 Flask 默认行为
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.codec.dumps(obj) + b'\n', mimetype=self.mimetype)
+
+
+json_codec = JSONCodec()
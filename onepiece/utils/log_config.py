@@ -0,0 +1,116 @@
+"""
+日志配置 - 队列化的非阻塞日志管道
+
+请求线程里的 logger 调用只把 LogRecord 放入内存队列，格式化与写 stdout 由后台
+QueueListener 线程完成；日志参数使用 %s 惰性求值，级别未开启时不做任何格式化。
+
+- LOG_LEVEL：根日志级别，默认 INFO
+- LOG_FORMAT：json（每行一个 JSON 对象，默认）| text
+- LOG_REQUEST_SAMPLE_RATE：请求头/请求体 DEBUG 转储的抽样比例
+"""
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+TEXT_FORMAT = '%(asctime)s [%(levelname)s] %(filename)s:%(lineno)d - %(message)s'
+
+# LogRecord 自带的属性，其余属性视为通过 extra 传入的结构化字段
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志输出一行 JSON，extra 字段原样并入"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'location': f'{record.filename}:{record.lineno}'
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    入队时只做 % 插值，不执行 Formatter
+
+    标准 QueueHandler.prepare 会在调用线程里执行完整的 format()（时间、JSON 序列化）。
+    这里与标准实现一样在入队前用 getMessage() 固定消息并清空 args（参数可能是之后会被
+    修改的可变对象，也可能无法在线程间安全使用），异常栈转成文本（traceback 对象会引用
+    整个调用栈），其余格式化交给监听线程
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = record.getMessage()
+        # 复制一份，不影响同一条记录的其他 handler
+        record = copy.copy(record)
+        record.msg = message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class LogPipeline:
+    """用法与 db 一致：模块级实例 + init_app"""
+
+    def __init__(self):
+        self.handler = None
+        self.listener = None
+        self.output = None
+
+    def init_app(self, app):
+        level = app.config.get('LOG_LEVEL', 'INFO')
+        if app.config.get('LOG_FORMAT', 'json') == 'json':
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(TEXT_FORMAT)
+
+        self.stop()
+        self.output = logging.StreamHandler(sys.stdout)
+        self.output.setFormatter(formatter)
+        self.handler = _DeferredQueueHandler(queue.SimpleQueue())
+
+        root = logging.getLogger()
+        for handler in [h for h in root.handlers if isinstance(h, _DeferredQueueHandler)]:
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(level)
+
+        self._start()
+        app.extensions['log_pipeline'] = self
+
+    def restart(self):
+        """fork 之后调用：子进程没有监听线程，换一个新队列并重新启动监听"""
+        if self.handler is None:
+            return
+        self.handler.queue = queue.SimpleQueue()
+        self._start()
+
+    def stop(self):
+        """停止监听线程并写出队列中剩余的日志"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def _start(self):
+        self.listener = QueueListener(self.handler.queue, self.output, respect_handler_level=True)
+        self.listener.start()
+
+
+log_pipeline = LogPipeline()
+atexit.register(log_pipeline.stop)
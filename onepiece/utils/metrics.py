@@ -0,0 +1,271 @@
+"""
+运行指标 - Counter / Gauge / Histogram 与 Prometheus 文本格式输出
+
+    GET /api/common/metrics
+
+- 请求：按蓝图/端点统计延迟直方图、按状态码计数、进行中请求数
+- 数据库：通过 SQLAlchemy 游标事件统计每个请求的 SQL 条数与耗时
+- 所有指标为当前进程（单个 worker）内的数据，多进程部署时由采集端按实例汇总
+
+记录一次指标只是一次加锁的字典更新，开销在微秒级，可在生产环境常开
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 请求延迟分桶上界（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 每个请求的 SQL 条数分桶
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# 当前请求的 [SQL 条数, SQL 耗时]，请求之外为 None
+_request_db = ContextVar('request_db', default=None)
+
+
+class _Metric:
+    type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def samples(self):
+        """(指标名, 标签元组, 值, 附加标签) 序列"""
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield self.name, labels, value, ()
+
+
+class Counter(_Metric):
+    """只增不减的计数"""
+
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        if not self.labelnames:
+            self._values[()] = 0
+
+    def inc(self, amount=1, labels=()):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels=()):
+        return self._values.get(labels, 0)
+
+
+class Gauge(_Metric):
+    """可增可减的当前值；传入 function 时在输出时回调取值，返回 [(标签元组, 值)]"""
+
+    type = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+        if not self.labelnames:
+            self._values[()] = 0
+
+    def inc(self, amount=1, labels=()):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, amount=1, labels=()):
+        self.inc(-amount, labels)
+
+    def set(self, value, labels=()):
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        if self.function is None:
+            yield from super().samples()
+            return
+        for labels, value in self.function():
+            yield self.name, labels, value, ()
+
+
+class Histogram(_Metric):
+    """固定分桶直方图，输出累计计数"""
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, labels=()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def snapshot(self, labels=()) -> dict:
+        """累计分桶计数，按上界升序：{'buckets': [[0.005, n], ..., ['+Inf', total]], 'count', 'sum'}"""
+        with self._lock:
+            counts, total = self._values.get(labels, [[0] * (len(self.buckets) + 1), 0.0])
+            counts = list(counts)
+        cumulative, buckets = 0, []
+        for bound, count in zip(self.buckets + ('+Inf',), counts):
+            cumulative += count
+            buckets.append([bound, cumulative])
+        return {'buckets': buckets, 'count': cumulative, 'sum': round(total, 6)}
+
+    def samples(self):
+        with self._lock:
+            labelsets = list(self._values)
+        for labels in labelsets:
+            snapshot = self.snapshot(labels)
+            for bound, count in snapshot['buckets']:
+                yield f'{self.name}_bucket', labels, count, (('le', bound),)
+            yield f'{self.name}_sum', labels, snapshot['sum'], ()
+            yield f'{self.name}_count', labels, snapshot['count'], ()
+
+
+class Registry:
+    """指标注册表，负责生成文本格式输出"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'指标 {metric.name} 已注册')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), function=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for name, labels, value, extra in metric.samples():
+                pairs = list(zip(metric.labelnames, labels)) + list(extra)
+                label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in pairs)
+                lines.append(f'{name}{{{label_text}}} {_format(value)}' if label_text else f'{name} {_format(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format(value) -> str:
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+registry = Registry()
+
+
+class Metrics:
+    """HTTP 请求与 SQL 指标采集，用法与 db 一致：模块级实例 + init_app"""
+
+    def __init__(self, registry: Registry):
+        self.registry = registry
+        self.requests = registry.counter(
+            'onepiece_http_requests_total', 'HTTP 请求数', ('blueprint', 'endpoint', 'method', 'status'))
+        self.latency = registry.histogram(
+            'onepiece_http_request_duration_seconds', 'HTTP 请求处理耗时（秒）', ('blueprint', 'endpoint'))
+        self.in_flight = registry.gauge(
+            'onepiece_http_requests_in_flight', '正在处理的 HTTP 请求数')
+        self.request_queries = registry.histogram(
+            'onepiece_db_queries_per_request', '每个请求执行的 SQL 条数', ('endpoint',), QUERY_COUNT_BUCKETS)
+        self.request_db_time = registry.histogram(
+            'onepiece_db_time_per_request_seconds', '每个请求的 SQL 总耗时（秒）', ('endpoint',))
+        self.queries = registry.counter(
+            'onepiece_db_queries_total', '执行的 SQL 条数（含请求之外）')
+        self.query_time = registry.histogram(
+            'onepiece_db_query_duration_seconds', '单条 SQL 耗时（秒）')
+        self.startup = registry.gauge(
+            'onepiece_app_startup_seconds', 'create_app 耗时（秒）')
+
+    def init_app(self, app):
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        app.extensions['metrics'] = self
+
+    def render(self) -> str:
+        return self.registry.render()
+
+    def _before_request(self):
+        g._metrics_start = time.perf_counter()
+        g._metrics_db = [0, 0.0]
+        g._metrics_token = _request_db.set(g._metrics_db)
+        self.in_flight.inc()
+
+    def _after_request(self, response):
+        start = g.get('_metrics_start')
+        if start is None:
+            return response
+        # 未匹配路由的请求统一归入 unmatched，避免任意 URL 造成标签爆炸
+        endpoint = request.endpoint or 'unmatched'
+        blueprint = request.blueprint or ''
+        self.latency.observe(time.perf_counter() - start, (blueprint, endpoint))
+        self.requests.inc(labels=(blueprint, endpoint, request.method, str(response.status_code)))
+        count, seconds = g._metrics_db
+        self.request_queries.observe(count, (endpoint,))
+        self.request_db_time.observe(seconds, (endpoint,))
+        return response
+
+    def _teardown_request(self, exc):
+        token = g.pop('_metrics_token', None)
+        if token is not None:
+            _request_db.reset(token)
+            self.in_flight.dec()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, '_metrics_query_start', None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        self.queries.inc()
+        self.query_time.observe(elapsed)
+        current = _request_db.get()
+        if current is not None:
+            current[0] += 1
+            current[1] += elapsed
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # 开始时间记在本条语句的执行上下文上：语句出错时不会触发 after 事件，
+    # 若放在 conn.info 里会残留在连接上，错配到之后的语句
+    if context is not None:
+        context._metrics_query_start = time.perf_counter()
+
+
+metrics = Metrics(registry)
@@ -0,0 +1,173 @@
+"""
+游标分页工具 - 基于排序键 + 主键的 keyset 分页
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from onepiece.models.database import db
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class CursorError(ValueError):
+    """游标非法或与当前排序不匹配"""
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    """将请求的分页大小限制在 [1, MAX_PAGE_SIZE] 之间"""
+    if not limit or limit < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_sort(sort: Optional[str], allowed: dict, default: str = 'id') -> Tuple[str, bool]:
+    """
+    解析排序参数，如 "name"、"-created_at"
+
+    Args:
+        sort: 排序参数，前缀 "-" 表示降序
+        allowed: 允许的排序键 -> 模型列
+        default: 默认排序键
+
+    Returns:
+        Tuple[str, bool]: (排序键, 是否降序)
+    """
+    sort = (sort or default).strip()
+    desc = sort.startswith('-')
+    key = sort.lstrip('-+')
+    if key not in allowed:
+        raise CursorError(f'不支持的排序字段: {key}')
+    return key, desc
+
+
+def encode_cursor(payload: dict) -> str:
+    """将游标内容编码为不透明字符串"""
+    raw = json.dumps(payload, separators=(',', ':'), default=_json_default).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> dict:
+    """解码不透明游标，失败时抛出 CursorError"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise CursorError('无效的分页游标')
+    if not isinstance(payload, dict):
+        raise CursorError('无效的分页游标')
+    return payload
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'无法序列化游标值: {value!r}')
+
+
+def _coerce(column, value):
+    """把游标中的值还原为列对应的 Python 类型，类型不符（游标被篡改）时抛出 CursorError"""
+    if value is None:
+        return None
+    try:
+        if isinstance(column.type, db.DateTime):
+            return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise CursorError('无效的分页游标')
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise CursorError('无效的分页游标')
+    return value
+
+
+def keyset_page(query, column, id_column, sort_key: str, desc: bool,
+                limit: int, after: Optional[str] = None):
+    """
+    按 (排序列, 主键) 做 keyset 分页
+
+    排序列允许为 NULL：NULL 在升序时排最前、降序时排最后（与 MySQL/SQLite 一致），
+    翻页条件据此展开成可走索引的 OR 条件，页深不影响查询代价。
+
+    Args:
+        query: 已应用过滤条件的查询
+        column: 排序列
+        id_column: 主键列（平局时的次排序键）
+        sort_key: 排序键名称（写入游标用于校验）
+        desc: 是否降序
+        limit: 每页条数
+        after: 上一页返回的 next_cursor
+
+    Returns:
+        Tuple[list, Optional[str]]: (当前页行, 下一页游标)
+    """
+    rows = keyset_query(query, column, id_column, sort_key, desc, limit, after).all()
+    return keyset_result(rows, column, id_column, sort_key, desc, limit)
+
+
+def keyset_query(query, column, id_column, sort_key: str, desc: bool,
+                 limit: int, after: Optional[str] = None):
+    """
+    加上翻页条件、排序和 limit + 1（多取一行判断是否还有下一页）
+
+    query 可以是 Query 也可以是 select()，异步版本（onepiece.asgi）执行 select() 后交给 keyset_result
+    """
+    if after:
+        payload = decode_cursor(after)
+        if payload.get('k') != sort_key or payload.get('d') != desc or 'id' not in payload:
+            raise CursorError('分页游标与排序方式不匹配')
+        value, last_id = _coerce(column, payload.get('v')), payload['id']
+        if isinstance(last_id, bool) or not isinstance(last_id, int):
+            raise CursorError('无效的分页游标')
+        query = query.filter(_after_clause(column, id_column, desc, value, last_id))
+
+    if desc:
+        query = query.order_by(column.desc(), id_column.desc())
+    else:
+        query = query.order_by(column.asc(), id_column.asc())
+    return query.limit(limit + 1)
+
+
+def keyset_result(rows: list, column, id_column, sort_key: str, desc: bool, limit: int):
+    """由 keyset_query 的结果截出当前页并生成下一页游标"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor({
+            'k': sort_key,
+            'd': desc,
+            'v': getattr(last, column.key),
+            'id': getattr(last, id_column.key)
+        })
+    return rows, next_cursor
+
+
+def _after_clause(column, id_column, desc, value, last_id):
+    if column is id_column:
+        return id_column < last_id if desc else id_column > last_id
+
+    if not desc:
+        if value is None:
+            return db.or_(db.and_(column.is_(None), id_column > last_id), column.isnot(None))
+        return db.or_(column > value, db.and_(column == value, id_column > last_id))
+
+    if value is None:
+        return db.and_(column.is_(None), id_column < last_id)
+    return db.or_(column < value, db.and_(column == value, id_column < last_id), column.is_(None))
+
+
+def offset_cursor(scope: str, offset: int) -> str:
+    """基于偏移量的游标，用于相关度排序等无法 keyset 的结果集（scope 绑定查询条件）"""
+    return encode_cursor({'k': scope, 'o': offset})
+
+
+def cursor_offset(after: Optional[str], scope: str) -> int:
+    """解析 offset_cursor 生成的游标，返回偏移量"""
+    if not after:
+        return 0
+    payload = decode_cursor(after)
+    offset = payload.get('o')
+    if payload.get('k') != scope or not isinstance(offset, int) or offset < 0:
+        raise CursorError('分页游标与查询条件不匹配')
+    return offset
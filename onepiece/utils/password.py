@@ -0,0 +1,249 @@
+"""
+密码哈希 - 按延迟预算自动调参的 scrypt，校验放在有界线程池中执行
+
+存储格式：
+- scrypt$<n>$<r>$<p>$<salt>$<hash>
+- pbkdf2_sha256$<iterations>$<salt>$<hash>（hashlib 不支持 scrypt 时使用）
+- 其他值视为历史明文，仍可校验，登录成功后重新哈希
+
+- PASSWORD_HASH_PARAMS：固定参数，如 scrypt:16384:8:1；为空时按 PASSWORD_HASH_TARGET_MS
+  在本机测量后选择（多台机器部署时建议固定，避免各自调出的参数不同）
+- PASSWORD_HASH_WORKERS：每个进程同时计算哈希的线程数
+- PASSWORD_HASH_MAX_PENDING：每个进程排队 + 计算中的请求上限，超出时直接拒绝，
+  登录高峰不会占满请求线程、拖慢其他接口（应小于 WEB_THREADS）
+
+有界线程池只在一个进程同时处理多个请求时有意义：gthread worker（WEB_THREADS > 1）
+与 ASGI 模式（verify_async）。同步 worker（WEB_THREADS = 1）一次只处理一个请求，
+verify 直接在请求线程中计算，不经过线程池
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from onepiece.utils.metrics import Registry, registry
+
+SCRYPT = 'scrypt'
+PBKDF2 = 'pbkdf2_sha256'
+
+# scrypt 固定 r=8, p=1，只调 n；内存占用为 128 * n * r 字节
+SCRYPT_MIN_N = 2 ** 14
+SCRYPT_MAX_N = 2 ** 16
+PBKDF2_MIN_ITERATIONS = 100000
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+
+class PasswordHasherBusy(RuntimeError):
+    """待处理的哈希请求已满"""
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+def parse_params(spec: str) -> Tuple:
+    """'scrypt:16384:8:1' -> ('scrypt', 16384, 8, 1)"""
+    algorithm, *costs = spec.split(':')
+    if algorithm not in (SCRYPT, PBKDF2) or len(costs) != (3 if algorithm == SCRYPT else 1):
+        raise ValueError(f'无效的密码哈希参数: {spec}')
+    return (algorithm, *map(int, costs))
+
+
+def format_params(params: Tuple) -> str:
+    return ':'.join(map(str, params))
+
+
+def _derive(params: Tuple, password: str, salt: bytes) -> bytes:
+    data = password.encode('utf-8')
+    if params[0] == SCRYPT:
+        _, n, r, p = params
+        return hashlib.scrypt(data, salt=salt, n=n, r=r, p=p, maxmem=256 * n * r, dklen=HASH_BYTES)
+    return hashlib.pbkdf2_hmac('sha256', data, salt, params[1], dklen=HASH_BYTES)
+
+
+def hash_password(password: str, params: Tuple) -> str:
+    salt = secrets.token_bytes(SALT_BYTES)
+    return '$'.join(map(str, params)) + f'${_b64encode(salt)}${_b64encode(_derive(params, password, salt))}'
+
+
+def _decode(encoded: str) -> Optional[Tuple[Tuple, bytes, bytes]]:
+    """解析存储值，返回 (参数, 盐, 哈希)；不是哈希格式（历史明文）时返回 None"""
+    parts = encoded.split('$')
+    try:
+        if parts[0] == SCRYPT and len(parts) == 6:
+            params = (SCRYPT, int(parts[1]), int(parts[2]), int(parts[3]))
+        elif parts[0] == PBKDF2 and len(parts) == 4:
+            params = (PBKDF2, int(parts[1]))
+        else:
+            return None
+        return params, _b64decode(parts[-2]), _b64decode(parts[-1])
+    except ValueError:
+        return None
+
+
+def is_hashed(encoded: str) -> bool:
+    return _decode(encoded) is not None
+
+
+def check_password(password: str, encoded: str) -> bool:
+    """按存储值自带的参数校验（常量时间比较）"""
+    decoded = _decode(encoded)
+    if decoded is None:
+        return hmac.compare_digest(password.encode('utf-8'), encoded.encode('utf-8'))
+    params, salt, expected = decoded
+    return hmac.compare_digest(_derive(params, password, salt), expected)
+
+
+def calibrate(target_ms: float) -> Tuple:
+    """在本机测量，选出单次哈希耗时不超过 target_ms 的最大代价（不低于安全下限）"""
+    if not hasattr(hashlib, 'scrypt'):
+        started = time.perf_counter()
+        _derive((PBKDF2, PBKDF2_MIN_ITERATIONS), 'calibrate', b'0' * SALT_BYTES)
+        elapsed = time.perf_counter() - started
+        return PBKDF2, max(int(PBKDF2_MIN_ITERATIONS * target_ms / 1000 / elapsed), PBKDF2_MIN_ITERATIONS)
+
+    n = SCRYPT_MIN_N
+    while n < SCRYPT_MAX_N:
+        started = time.perf_counter()
+        _derive((SCRYPT, n * 2, 8, 1), 'calibrate', b'0' * SALT_BYTES)
+        if (time.perf_counter() - started) * 1000 > target_ms:
+            break
+        n *= 2
+    return SCRYPT, n, 8, 1
+
+
+class PasswordHasher:
+    """用法与 db 一致：模块级实例 + init_app"""
+
+    def __init__(self, registry: Registry):
+        self.target_ms = 50
+        self.fixed_params = None
+        self.workers = 2
+        self.max_pending = 4
+        # True 时 verify 在调用线程中直接计算（同步 worker）
+        self.inline = False
+        self._params = None
+        self._dummy = None
+        self._executor = None
+        self._pending = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.duration = registry.histogram(
+            'onepiece_password_hash_seconds', '密码哈希计算耗时（秒）', ('operation',))
+        self.rejected = registry.counter(
+            'onepiece_password_hash_rejected_total', '因待处理请求已满被拒绝的密码校验次数')
+
+    def init_app(self, app):
+        self.target_ms = app.config.get('PASSWORD_HASH_TARGET_MS', 50)
+        spec = app.config.get('PASSWORD_HASH_PARAMS')
+        self.fixed_params = parse_params(spec) if spec else None
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING', 4)
+        self.inline = app.config.get('WEB_THREADS', 1) <= 1
+        self._params = self.fixed_params
+        self._dummy = None
+        app.extensions['password_hasher'] = self
+
+    @property
+    def params(self) -> Tuple:
+        """当前参数；未固定时首次使用时测量"""
+        if self._params is None:
+            with self._lock:
+                if self._params is None:
+                    self._params = calibrate(self.target_ms)
+        return self._params
+
+    def warm_up(self) -> Tuple:
+        """
+        启动时预先测量参数并生成占位哈希，避免首个登录请求承担测量耗时
+
+        gunicorn master 在 fork 前调用，各 worker 继承结果，不必各自测量
+        """
+        self._dummy_hash()
+        return self.params
+
+    def hash(self, password: str) -> str:
+        started = time.perf_counter()
+        encoded = hash_password(password, self.params)
+        self.duration.observe(time.perf_counter() - started, ('hash',))
+        return encoded
+
+    def needs_rehash(self, encoded: str) -> bool:
+        """明文、算法不同或代价低于当前参数时需要重新哈希（只升级，不因调参差异来回重算）"""
+        decoded = _decode(encoded)
+        if decoded is None:
+            return True
+        stored, current = decoded[0], self.params
+        return stored[0] != current[0] or any(s < c for s, c in zip(stored[1:], current[1:]))
+
+    def verify(self, password: str, encoded: Optional[str]) -> bool:
+        """
+        在线程池中校验，调用线程阻塞等待结果
+
+        线程池只限制同时计算的数量，调用线程照样被占用：多线程 worker 中用它让超出上限的登录
+        立即失败，而不是占满请求线程；inline 时（同步 worker）直接在调用线程中计算
+
+        encoded 为 None（用户不存在）时对一个固定哈希做同样的计算，避免通过耗时判断用户名是否存在
+
+        Raises:
+            PasswordHasherBusy: 待处理的校验请求已达上限
+        """
+        if self.inline:
+            return self._timed_check(password, encoded)
+        return self.submit(self._timed_check, password, encoded).result()
+
+    async def verify_async(self, password: str, encoded: Optional[str]) -> bool:
+        """verify 的协程版本（ASGI 模式）：同样在线程池中计算，不阻塞事件循环"""
+        return await asyncio.wrap_future(self.submit(self._timed_check, password, encoded))
+
+    def submit(self, fn, *args):
+        """提交到有界线程池，超过 max_pending 时立即拒绝"""
+        executor, pending = self._ensure_executor()
+        if not pending.acquire(blocking=False):
+            self.rejected.inc()
+            raise PasswordHasherBusy('登录请求过多，请稍后重试')
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            pending.release()
+            raise
+        future.add_done_callback(lambda _: pending.release())
+        return future
+
+    def _timed_check(self, password: str, encoded: Optional[str]) -> bool:
+        if encoded is None:
+            encoded = self._dummy_hash()
+        started = time.perf_counter()
+        try:
+            return check_password(password, encoded)
+        finally:
+            self.duration.observe(time.perf_counter() - started, ('verify',))
+
+    def _dummy_hash(self) -> str:
+        if self._dummy is None:
+            self._dummy = hash_password(secrets.token_hex(8), self.params)
+        return self._dummy
+
+    def _ensure_executor(self):
+        # 线程池不会随 fork 复制，进程号变化时（gunicorn worker）重新创建
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='password-hash')
+                    self._pending = threading.BoundedSemaphore(self.max_pending)
+                    self._pid = os.getpid()
+        return self._executor, self._pending
+
+
+password_hasher = PasswordHasher(registry)
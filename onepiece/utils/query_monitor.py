@@ -0,0 +1,145 @@
+"""
+SQL 监控 - 慢查询日志与 N+1 检测（取代 SQLALCHEMY_ECHO 逐条打印）
+
+- 慢查询：耗时超过 SLOW_QUERY_MS 的语句按指纹记录日志（附带端点），
+  同一指纹每 SLOW_QUERY_LOG_INTERVAL 秒最多输出一条，其余只计数
+- N+1：按 QUERY_SAMPLE_RATE 抽样请求，统计请求内各指纹的执行次数，
+  超过 N_PLUS_ONE_THRESHOLD 时告警
+
+指纹把字面量、绑定参数、IN 列表归一化，同一类语句得到同一个指纹
+"""
+import logging
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from onepiece.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# 抽样请求内 {指纹: 执行次数}，未抽中或请求之外为 None
+_request_queries = ContextVar('request_queries', default=None)
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_PARAM = re.compile(r'%\(\w+\)s|%s|:\w+|\?')
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """归一化 SQL：字面量与参数替换为 ?，IN (?, ?, ...) 合并为 (?+)"""
+    text = _STRING.sub('?', statement)
+    text = _PARAM.sub('?', text)
+    text = _NUMBER.sub('?', text)
+    text = _IN_LIST.sub('(?+)', text)
+    return _SPACE.sub(' ', text).strip()
+
+
+def _endpoint() -> str:
+    if has_request_context():
+        return request.endpoint or 'unmatched'
+    return '-'
+
+
+class QueryMonitor:
+    """用法与 db 一致：模块级实例 + init_app"""
+
+    def __init__(self):
+        self.slow_threshold = 0.2
+        self.log_interval = 10.0
+        self.sample_rate = 1.0
+        self.n_plus_one_threshold = 10
+        self.slow_queries = registry.counter(
+            'onepiece_db_slow_queries_total', '慢查询次数', ('endpoint',))
+        self.n_plus_one = registry.counter(
+            'onepiece_db_n_plus_one_total', '检测到 N+1 查询的请求数', ('endpoint',))
+        self._last_logged = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.slow_threshold = app.config.get('SLOW_QUERY_MS', 200) / 1000
+        self.log_interval = app.config.get('SLOW_QUERY_LOG_INTERVAL', 10)
+        self.sample_rate = app.config.get('QUERY_SAMPLE_RATE', 1.0)
+        self.n_plus_one_threshold = app.config.get('N_PLUS_ONE_THRESHOLD', 10)
+
+        if self.sample_rate > 0:
+            app.before_request(self._before_request)
+            app.teardown_request(self._teardown_request)
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        app.extensions['query_monitor'] = self
+
+    def _before_request(self):
+        if random.random() < self.sample_rate:
+            g._query_monitor_token = _request_queries.set({})
+
+    def _teardown_request(self, exc):
+        token = g.pop('_query_monitor_token', None)
+        if token is None:
+            return
+        counts = _request_queries.get()
+        _request_queries.reset(token)
+
+        repeated = {fp: n for fp, n in counts.items() if n > self.n_plus_one_threshold}
+        if not repeated:
+            return
+        endpoint = _endpoint()
+        self.n_plus_one.inc(labels=(endpoint,))
+        for fp, n in repeated.items():
+            logger.warning('N+1 查询: %s %s（%s）同一语句执行 %d 次: %s',
+                           request.method, request.path, endpoint, n, fp,
+                           extra={'event': 'n_plus_one', 'endpoint': endpoint, 'count': n, 'fingerprint': fp})
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, '_query_monitor_start', None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+
+        counts = _request_queries.get()
+        if counts is not None:
+            fp = fingerprint(statement)
+            counts[fp] = counts.get(fp, 0) + 1
+
+        if elapsed >= self.slow_threshold:
+            self._record_slow(statement, elapsed, executemany, cursor.rowcount)
+
+    def _record_slow(self, statement, elapsed, executemany, rowcount):
+        endpoint = _endpoint()
+        self.slow_queries.inc(labels=(endpoint,))
+        fp = fingerprint(statement)
+
+        now = time.monotonic()
+        with self._lock:
+            last, suppressed = self._last_logged.get(fp, (0.0, 0))
+            if now - last < self.log_interval:
+                self._last_logged[fp] = (last, suppressed + 1)
+                return
+            self._last_logged[fp] = (now, 0)
+            if len(self._last_logged) > 4096:
+                self._last_logged.clear()
+
+        logger.warning('慢查询 %.1fms 端点 %s（此前合并 %d 条）: %s',
+                       elapsed * 1000, endpoint, suppressed, fp,
+                       extra={'event': 'slow_query', 'endpoint': endpoint, 'duration_ms': round(elapsed * 1000, 1),
+                              'fingerprint': fp, 'executemany': executemany, 'rowcount': rowcount,
+                              'suppressed': suppressed})
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # 与 metrics 相同，开始时间随执行上下文释放，出错的语句不会残留
+    if context is not None:
+        context._query_monitor_start = time.perf_counter()
+
+
+query_monitor = QueryMonitor()
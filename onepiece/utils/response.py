@@ -1,18 +1,32 @@
 """
 统一响应格式工具 - 最短反馈路径
 """
-from flask import jsonify
+from flask import jsonify, request, g, current_app
 from functools import wraps
+import hashlib
 
+from onepiece.utils.cache import cache
+from onepiece.utils.json_provider import json_codec
 
-def success(data=None, message=None):
-    """成功响应"""
+
+def success(data=None, message=None, **extra):
+    """成功响应，extra 中的字段（如 next_cursor）直接并入响应体"""
     resp = {'success': True}
     if data is not None:
         resp['data'] = data
     if message:
         resp['message'] = message
-    return jsonify(resp)
+    resp.update(extra)
+    if current_app.debug:
+        # 调试模式沿用 jsonify 的缩进输出
+        response = jsonify(resp)
+    else:
+        response = current_app.response_class(json_codec.envelope(resp), mimetype=current_app.json.mimetype)
+    etag = g.get('etag')
+    if etag:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 
 def error(message, code=400):
@@ -39,3 +53,54 @@ def handle_exceptions(f):
         except Exception as e:
             return error(f'服务器错误: {str(e)}', 500)
     return wrapper
+
+
+def etag_for(full_path: str, versions: dict) -> str:
+    """请求路径 + 数据版本号 -> ETag，与 ASGI 应用共用"""
+    raw = f'{full_path}|{sorted(versions.items())}'.encode('utf-8')
+    return hashlib.sha1(raw).hexdigest()
+
+
+def conditional(*scopes):
+    """
+    条件 GET 装饰器 - 基于共享数据版本号的强 ETag
+
+    ETag 由请求路径（含查询参数）和所依赖数据的版本号（data_versions 表）计算。版本号在写事务中递增，
+    所有进程看到同一个值，任一 worker 或命令行进程写入后 ETag 都随之变化。
+    版本号按表而不是按行：列表、搜索和统计依赖整张表，详情也内嵌关联数据（船员的海贼团名、海贼团的成员），
+    删除也无法用行版本表达，表内任一写入使该表全部 ETag 失效，以写入较少为前提。
+    版本号经 Service 读缓存保留 CACHE_VERSION_TTL 秒，本进程（共享后端时为所有进程）的写入立即失效，
+    If-None-Match 命中缓存时不访问数据库就返回 304；未命中时由 success() 带上 ETag。
+    缺少版本行（未执行迁移）时不生成 ETag。
+
+    Args:
+        scopes: 响应所依赖的数据，data_version.CREW / GROUP
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            versions = _data_versions(scopes)
+            cache.observe(versions)
+            if len(versions) == len(scopes):
+                etag = etag_for(request.full_path, versions)
+                if request.if_none_match.contains(etag):
+                    response = current_app.response_class(status=304)
+                    response.set_etag(etag)
+                    response.headers['Cache-Control'] = 'no-cache'
+                    return response
+                g.etag = etag
+            return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _data_versions(scopes) -> dict:
+    """所需的数据版本号，优先读缓存；未命中时一次查出全部版本号写入缓存"""
+    from onepiece.utils.data_version import current
+
+    versions = cache.data_versions()
+    if versions is None:
+        generation = cache.generation()
+        versions = current()
+        cache.store_data_versions(versions, generation)
+    return {scope: versions[scope] for scope in scopes if scope in versions}
@@ -0,0 +1,267 @@
+"""
+进程内倒排索引 - 船员/海贼团搜索
+
+中日韩文字按单字 + 二元组（bigram）切分；拉丁字母/数字单词按前 1、2 个字符 + 三元组（trigram）切分，
+与原来的 ILIKE 一样能按单词中的片段查到（如 luf 查到 Luffy）。
+查询时多字 CJK 片段只用 bigram，3 个字符以上的单词只用 trigram（1、2 个字符按单词前缀匹配），
+各词项取交集（AND），按 字段权重 × 词频 × IDF 排序。
+
+索引记录构建时的数据版本号（见 onepiece.utils.data_version）：本进程的写入增量更新索引，
+搜索前与数据库中的版本号比对，其他进程写入过（版本号不一致）时在后台线程全量重建，
+新索引在锁外构建完成后整体替换，期间搜索继续使用旧索引；首次构建仍在请求中同步完成。
+"""
+import heapq
+import logging
+import math
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# CJK 统一表意文字（含扩展 A）、日文假名、韩文音节
+_TOKEN_RE = re.compile(r'([㐀-䶿一-鿿぀-ヿ가-힯]+)|([0-9a-z]+)')
+
+
+def tokenize(text: str, for_query: bool = False) -> List[str]:
+    """
+    文本切词
+
+    Args:
+        text: 待切分文本
+        for_query: 查询模式下多字 CJK 片段只产出 bigram，避免单字放大结果集
+
+    Returns:
+        List[str]: 词项列表（可重复，用于统计词频）
+    """
+    if not text:
+        return []
+    tokens = []
+    for cjk, word in _TOKEN_RE.findall(text.lower()):
+        if word:
+            if len(word) < 3:
+                tokens.extend([word] if for_query else [word[:n] for n in range(1, len(word) + 1)])
+                continue
+            if not for_query:
+                tokens.extend((word[0], word[:2]))
+            tokens.extend(word[i:i + 3] for i in range(len(word) - 2))
+            continue
+        if len(cjk) == 1 or not for_query:
+            tokens.extend(cjk)
+        tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return tokens
+
+
+class InvertedIndex:
+    """线程安全的倒排索引，文档以整数主键标识"""
+
+    def __init__(self, fields: Dict[str, float]):
+        """
+        Args:
+            fields: 参与索引的字段 -> 权重
+        """
+        self.fields = fields
+        self.built = False
+        # 构建时的数据版本号，None 表示未知（不做比对）
+        self.version = None
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._lock = threading.RLock()
+        self._rebuilding = threading.Lock()
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def build(self, docs: Iterable, version: Optional[int] = None):
+        """
+        用 (doc_id, 文档) 序列全量重建索引，文档为带字段属性的对象
+
+        新索引在锁外构建，完成后整体替换，构建期间搜索与增量更新照常使用旧索引
+        （期间的增量更新不会进入新索引，但版本号不连续，之后会再次重建）
+        """
+        postings, doc_terms = {}, {}
+        for doc_id, doc in docs:
+            self._add(doc_id, doc, postings, doc_terms)
+        with self._lock:
+            self._postings = postings
+            self._doc_terms = doc_terms
+            self.built = True
+            self.version = version
+
+    def claim_rebuild(self) -> bool:
+        """后台重建占位：已有重建在进行时返回 False"""
+        return self._rebuilding.acquire(blocking=False)
+
+    def release_rebuild(self):
+        self._rebuilding.release()
+
+    def add(self, doc_id: int, doc, version: Optional[int] = None):
+        """新增或替换一篇文档，version 为本次写入递增后的数据版本号"""
+        with self._lock:
+            self._remove(doc_id)
+            self._add(doc_id, doc)
+            self._advance(version)
+
+    def remove(self, doc_id: int, version: Optional[int] = None):
+        """删除一篇文档"""
+        with self._lock:
+            self._remove(doc_id)
+            self._advance(version)
+
+    def is_current(self, version: Optional[int]) -> bool:
+        """索引是否与该数据版本一致（版本未知时只要求已构建）"""
+        return self.built and (version is None or version == self.version)
+
+    def search(self, query: str, offset: int = 0, limit: int = 20) -> Tuple[List[int], int]:
+        """
+        检索并按相关度排序分页
+
+        Args:
+            query: 查询文本
+            offset: 跳过的命中数
+            limit: 返回的命中数
+
+        Returns:
+            Tuple[List[int], int]: (当前页文档 ID, 命中总数)
+        """
+        terms = set(tokenize(query, for_query=True))
+        if not terms:
+            return [], 0
+
+        with self._lock:
+            postings = []
+            for term in terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    return [], 0
+                postings.append(posting)
+            postings.sort(key=len)
+
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    return [], 0
+
+            total_docs = len(self._doc_terms)
+            idfs = [math.log(1.0 + total_docs / len(p)) for p in postings]
+            scored = [
+                (-sum(p[doc_id] * idf for p, idf in zip(postings, idfs)), doc_id)
+                for doc_id in candidates
+            ]
+
+        top = heapq.nsmallest(offset + limit, scored)[offset:]
+        return [doc_id for _, doc_id in top], len(scored)
+
+    def _advance(self, version):
+        # 恰好比索引的版本大 1：期间没有其他进程写入，增量更新后索引仍与数据库一致；
+        # 否则保留原版本号，下次搜索时重建（同一批写入的后续文档版本号相同，无需处理）
+        if version is not None and self.version is not None and version == self.version + 1:
+            self.version = version
+
+    def _add(self, doc_id, doc, postings=None, doc_terms=None):
+        postings = self._postings if postings is None else postings
+        doc_terms = self._doc_terms if doc_terms is None else doc_terms
+        weights: Dict[str, float] = {}
+        for field, weight in self.fields.items():
+            for term in tokenize(getattr(doc, field, None)):
+                weights[term] = weights.get(term, 0.0) + weight
+        for term, weight in weights.items():
+            postings.setdefault(term, {})[doc_id] = weight
+        doc_terms[doc_id] = tuple(weights)
+
+    def _remove(self, doc_id):
+        for term in self._doc_terms.pop(doc_id, ()):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[term]
+
+
+crew_index = InvertedIndex({'name': 3.0, 'role': 2.0, 'devil_fruit': 1.0})
+pirate_group_index = InvertedIndex({'name': 3.0, 'captain': 2.0, 'origin': 1.0})
+
+
+def index_queries() -> list:
+    """构建索引所需的查询 [(索引, 版本号名称, select)]，同步与异步（onepiece.asgi）版本共用"""
+    from onepiece.models.database import db
+    from onepiece.models.crew_member import CrewMember
+    from onepiece.models.pirate_group import PirateGroup
+    from onepiece.utils.data_version import CREW, GROUP
+
+    return [
+        (crew_index, CREW, db.select(CrewMember.id, CrewMember.name, CrewMember.role, CrewMember.devil_fruit)),
+        (pirate_group_index, GROUP,
+         db.select(PirateGroup.id, PirateGroup.name, PirateGroup.captain, PirateGroup.origin))
+    ]
+
+
+def stale_indexes(versions: dict, rebuild_all: bool = False) -> list:
+    """需要重建的索引 [(索引, select, 数据版本号)]"""
+    return [
+        (index, stmt, versions.get(scope)) for index, scope, stmt in index_queries()
+        if rebuild_all or not index.is_current(versions.get(scope))
+    ]
+
+
+def build_search_indexes(rebuild_all: bool = True):
+    """从数据库构建搜索索引（需在应用上下文中调用），默认全部重建"""
+    from onepiece.utils.data_version import current
+
+    # 先读版本号再读数据：构建期间的写入只会让索引被认为过期，不会漏掉
+    stale = stale_indexes(current(), rebuild_all)
+    for index, stmt, version in stale:
+        _build(index, stmt, version)
+
+    if stale:
+        logger.info('搜索索引构建完成: 船员 %s 条, 海贼团 %s 条', len(crew_index), len(pirate_group_index))
+
+
+def ensure_search_indexes():
+    """
+    搜索前调用：索引尚未构建时同步构建；其他进程写入过（数据版本号与索引不一致）时
+    在后台线程重建，本次搜索使用旧索引
+    """
+    from onepiece.utils.data_version import current
+
+    for index, stmt, version in stale_indexes(current()):
+        if not index.built:
+            _build(index, stmt, version)
+        elif index.claim_rebuild():
+            _rebuild_in_background(index, stmt, version)
+
+
+def _build(index: InvertedIndex, stmt, version):
+    from onepiece.models.database import db
+
+    rows = db.session.execute(stmt.execution_options(yield_per=5000))
+    index.build(((row.id, row) for row in rows), version)
+
+
+def _rebuild_in_background(index: InvertedIndex, stmt, version):
+    app = current_app._get_current_object()
+
+    def run():
+        from onepiece.models.database import db
+
+        try:
+            with app.app_context():
+                try:
+                    _build(index, stmt, version)
+                finally:
+                    db.session.remove()
+            logger.info('搜索索引后台重建完成: %s 条（版本 %s）', len(index), version)
+        except Exception:
+            logger.exception('搜索索引后台重建失败')
+        finally:
+            index.release_rebuild()
+
+    try:
+        threading.Thread(target=run, name='search-index-rebuild', daemon=True).start()
+    except BaseException:
+        index.release_rebuild()
+        raise
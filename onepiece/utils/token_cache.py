@@ -0,0 +1,97 @@
+"""
+Token 校验缓存 - 已验证 token 的进程内 LRU 与注销列表
+
+- 以 token 的 sha256 摘要为 key，不在内存中保存 token 原文
+- 条目在 token 自身的 exp 到期，缓存命中时只需一次哈希和字典查找
+- 注销列表同样按摘要保存，记录 token 的过期时间，过期后自动清理
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class TokenCache:
+    """已验证 token 的 LRU，条目在 token 的 exp 时失效"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, digest: str) -> Optional[dict]:
+        with self._lock:
+            item = self._entries.get(digest)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, claims = item
+            if expires_at <= time.time():
+                del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return claims
+
+    def set(self, digest: str, claims: dict, expires_at: float):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[digest] = (expires_at, claims)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, digest: str):
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RevocationList:
+    """已注销 token 的摘要 -> 过期时间（时间戳）"""
+
+    def __init__(self):
+        self._entries: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, digest: str) -> bool:
+        # 读操作不加锁：dict 单次查找是原子的，过期的条目留给 add/replace 清理
+        expires_at = self._entries.get(digest)
+        return expires_at is not None and expires_at > time.time()
+
+    def add(self, digest: str, expires_at: float):
+        with self._lock:
+            self._entries[digest] = expires_at
+            self._prune()
+
+    def replace(self, entries: Dict[str, float]):
+        """用数据库中的完整列表替换（保留替换期间本进程新增的条目）"""
+        with self._lock:
+            merged = dict(entries)
+            merged.update(self._entries)
+            self._entries = merged
+            self._prune()
+
+    def _prune(self):
+        now = time.time()
+        expired = [d for d, exp in self._entries.items() if exp <= now]
+        for digest in expired:
+            del self._entries[digest]
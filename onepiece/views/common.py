@@ -1,8 +1,12 @@
 """
 公共视图 - 通用接口
 """
-from flask import Blueprint
+from flask import Blueprint, Response
+from onepiece.models import db
 from onepiece.utils import success
+from onepiece.utils.cache import cache
+from onepiece.utils.db_pool import pool_monitor
+from onepiece.utils.metrics import CONTENT_TYPE, metrics
 
 logger = None
 
@@ -22,3 +26,18 @@ def ping():
 def version():
     """获取版本信息"""
     return success(data={'version': '1.0.0'})
+
+@common_bp.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Service 缓存命中统计"""
+    return success(data=cache.stats())
+
+@common_bp.route('/pool-stats', methods=['GET'])
+def pool_stats():
+    """数据库连接池状态与获取连接等待时间分布（当前 worker 进程）"""
+    return success(data=pool_monitor.stats(db.engine))
+
+@common_bp.route('/metrics', methods=['GET'])
+def metrics_text():
+    """运行指标（Prometheus 文本格式，当前 worker 进程）"""
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
@@ -1,11 +1,14 @@
 """
 船员视图 - 船员管理 API
 """
-from flask import Blueprint, request
+from flask import Blueprint, Response, request, stream_with_context
 import logging
 
 from onepiece.services import CrewService
-from onepiece.utils import success, error, not_found
+from onepiece.utils import success, error, not_found, conditional
+from onepiece.utils.bulk import read_bulk_items
+from onepiece.utils.data_version import CREW, GROUP
+from onepiece.utils.export import EXPORT_FORMATS, csv_stream, ndjson_stream
 
 logger = logging.getLogger(__name__)
 
@@ -23,19 +26,28 @@ def get_crew_service() -> CrewService:
 
 
 @crew_bp.route('', methods=['GET'])
+@conditional(CREW, GROUP)
 def get_all():
-    """获取船员列表 GET /api/crew"""
+    """获取船员列表 GET /api/crew?pirate_group_id=&min_bounty=&max_bounty=&limit=&after=&sort="""
     pirate_group_id = request.args.get('pirate_group_id', type=int)
 
     service = get_crew_service()
-    ok, result, message = service.get_all(pirate_group_id)
+    ok, result, message = service.get_all(
+        pirate_group_id,
+        limit=request.args.get('limit', type=int),
+        after=request.args.get('after'),
+        sort=request.args.get('sort'),
+        min_bounty=request.args.get('min_bounty', type=int),
+        max_bounty=request.args.get('max_bounty', type=int)
+    )
 
     if ok:
-        return success(data=result, message=message)
+        return success(data=result['items'], message=message, next_cursor=result['next_cursor'])
     return error(message)
 
 
 @crew_bp.route('/<int:member_id>', methods=['GET'])
+@conditional(CREW, GROUP)
 def get_one(member_id: int):
     """获取船员详情 GET /api/crew/<id>"""
     service = get_crew_service()
@@ -83,14 +95,85 @@ def delete(member_id: int):
     return not_found(message)
 
 
+@crew_bp.route('/export', methods=['GET'])
+def export():
+    """流式导出船员 GET /api/crew/export?format=ndjson|csv&pirate_group_id="""
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return error(f'不支持的导出格式: {fmt}')
+
+    service = get_crew_service()
+    records = service.iter_export(request.args.get('pirate_group_id', type=int))
+    if fmt == 'csv':
+        body = csv_stream(records, service.EXPORT_COLUMNS)
+    else:
+        body = ndjson_stream(records)
+
+    return Response(
+        stream_with_context(body),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename=crew.{fmt}'}
+    )
+
+
+@crew_bp.route('/bulk', methods=['POST'])
+def bulk_create():
+    """批量创建船员 POST /api/crew/bulk  body: [{...}] 或 {"items": [...]}"""
+    items = read_bulk_items(request.get_json(silent=True))
+    if items is None:
+        return error('请求体应为数组或 {"items": [...]}')
+
+    service = get_crew_service()
+    ok, result, message = service.bulk_create(items)
+
+    if ok:
+        return success(data=result, message=message)
+    return error(message)
+
+
+@crew_bp.route('/bulk', methods=['PUT'])
+def bulk_update():
+    """批量更新船员 PUT /api/crew/bulk  body: [{"id": 1, ...}] 或 {"items": [...]}"""
+    items = read_bulk_items(request.get_json(silent=True))
+    if items is None:
+        return error('请求体应为数组或 {"items": [...]}')
+
+    service = get_crew_service()
+    ok, result, message = service.bulk_update(items)
+
+    if ok:
+        return success(data=result, message=message)
+    return error(message)
+
+
+@crew_bp.route('/bulk', methods=['DELETE'])
+def bulk_delete():
+    """批量删除船员 DELETE /api/crew/bulk  body: [1, 2] 或 {"ids": [...]}"""
+    ids = read_bulk_items(request.get_json(silent=True), key='ids')
+    if ids is None:
+        return error('请求体应为数组或 {"ids": [...]}')
+
+    service = get_crew_service()
+    ok, result, message = service.bulk_delete(ids)
+
+    if ok:
+        return success(data=result, message=message)
+    return error(message)
+
+
 @crew_bp.route('/search', methods=['GET'])
+@conditional(CREW, GROUP)
 def search():
-    """搜索船员 GET /api/crew/search?q=keyword"""
+    """搜索船员 GET /api/crew/search?q=keyword&limit=&after="""
     keyword = request.args.get('q', '')
 
     service = get_crew_service()
-    ok, result, message = service.search(keyword)
+    ok, result, message = service.search(
+        keyword,
+        limit=request.args.get('limit', type=int),
+        after=request.args.get('after')
+    )
 
     if ok:
-        return success(data=result, message=message)
+        return success(data=result['items'], message=message, next_cursor=result['next_cursor'])
     return error(message)
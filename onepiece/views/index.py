@@ -1,11 +1,13 @@
 """
 首页与认证视图 - 管理登录与核心业务
 """
-from flask import Blueprint, request, current_app
+from flask import Blueprint, g, request
 import logging
 
 from onepiece.services import AuthService
-from onepiece.utils import success, unauthorized
+from onepiece.utils import error, success, unauthorized
+from onepiece.utils.auth import login_required, token_auth
+from onepiece.utils.password import PasswordHasherBusy
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +22,8 @@ BLUEPRINT_CONFIG = {
 
 
 def get_auth_service() -> AuthService:
-    """获取认证服务实例"""
-    return AuthService(current_app.config['SECRET_KEY'])
+    """获取认证服务实例（每个应用一个，token 校验缓存随实例保留）"""
+    return token_auth.service
 
 
 @index_bp.route('/login', methods=['POST'])
@@ -29,13 +31,19 @@ def login():
     """用户登录 POST /api/auth/login"""
     logger.info('=== login 函数被调用 ===')
     data = request.get_json() or {}
-    logger.debug(f'    请求数据: {data}')
+    # 请求体含明文密码，只记录用户名
+    logger.debug('    登录用户: %s', data.get('username'))
 
     auth_service = get_auth_service()
-    ok, result, message = auth_service.login(
-        username=data.get('username'),
-        password=data.get('password')
-    )
+    try:
+        ok, result, message = auth_service.login(
+            username=data.get('username'),
+            password=data.get('password')
+        )
+    except PasswordHasherBusy as e:
+        response, status = error(str(e), 503)
+        response.headers['Retry-After'] = '1'
+        return response, status
 
     if ok:
         return success(data=result, message=message)
@@ -43,13 +51,19 @@ def login():
 
 
 @index_bp.route('/verify', methods=['GET'])
+@login_required
 def verify():
     """验证token GET /api/auth/verify"""
-    token = request.headers.get('Authorization', '')
+    return success(data=g.current_user)
 
+
+@index_bp.route('/logout', methods=['POST'])
+@login_required
+def logout():
+    """退出登录（注销当前 token） POST /api/auth/logout"""
     auth_service = get_auth_service()
-    ok, result, message = auth_service.verify_token(token)
+    ok, _, message = auth_service.revoke(request.headers.get('Authorization', ''))
 
     if ok:
-        return success(data=result)
-    return unauthorized(message)
+        return success(message=message)
+    return error(message, 500)
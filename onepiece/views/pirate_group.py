@@ -1,11 +1,14 @@
 """
 海贼团视图 - 海贼团管理 API
 """
-from flask import Blueprint, request
+from flask import Blueprint, Response, request, stream_with_context
 import logging
 
 from onepiece.services import PirateGroupService
-from onepiece.utils import success, error, not_found
+from onepiece.utils import success, error, not_found, conditional
+from onepiece.utils.bulk import read_bulk_items
+from onepiece.utils.data_version import CREW, GROUP
+from onepiece.utils.export import EXPORT_FORMATS, csv_stream, ndjson_stream
 
 logger = logging.getLogger(__name__)
 
@@ -23,10 +26,27 @@ def get_pirate_group_service() -> PirateGroupService:
 
 
 @pirate_group_bp.route('', methods=['GET'])
+@conditional(GROUP)
 def get_all():
-    """获取海贼团列表 GET /api/pirate-groups"""
+    """获取海贼团列表 GET /api/pirate-groups?limit=&after=&sort="""
     service = get_pirate_group_service()
-    ok, result, message = service.get_all()
+    ok, result, message = service.get_all(
+        limit=request.args.get('limit', type=int),
+        after=request.args.get('after'),
+        sort=request.args.get('sort')
+    )
+
+    if ok:
+        return success(data=result['items'], message=message, next_cursor=result['next_cursor'])
+    return error(message)
+
+
+@pirate_group_bp.route('/bounty-totals', methods=['GET'])
+@conditional(GROUP, CREW)
+def bounty_totals():
+    """海贼团悬赏金汇总 GET /api/pirate-groups/bounty-totals"""
+    service = get_pirate_group_service()
+    ok, result, message = service.get_bounty_totals()
 
     if ok:
         return success(data=result, message=message)
@@ -34,6 +54,7 @@ def get_all():
 
 
 @pirate_group_bp.route('/<int:group_id>', methods=['GET'])
+@conditional(GROUP, CREW)
 def get_one(group_id: int):
     """获取海贼团详情 GET /api/pirate-groups/<id>"""
     include_members = request.args.get('include_members', 'false').lower() == 'true'
@@ -85,20 +106,92 @@ def delete(group_id: int):
     return error(message)
 
 
+@pirate_group_bp.route('/export', methods=['GET'])
+def export():
+    """流式导出海贼团 GET /api/pirate-groups/export?format=ndjson|csv"""
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return error(f'不支持的导出格式: {fmt}')
+
+    service = get_pirate_group_service()
+    records = service.iter_export()
+    if fmt == 'csv':
+        body = csv_stream(records, service.EXPORT_COLUMNS)
+    else:
+        body = ndjson_stream(records)
+
+    return Response(
+        stream_with_context(body),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename=pirate_groups.{fmt}'}
+    )
+
+
+@pirate_group_bp.route('/bulk', methods=['POST'])
+def bulk_create():
+    """批量创建海贼团 POST /api/pirate-groups/bulk  body: [{...}] 或 {"items": [...]}"""
+    items = read_bulk_items(request.get_json(silent=True))
+    if items is None:
+        return error('请求体应为数组或 {"items": [...]}')
+
+    service = get_pirate_group_service()
+    ok, result, message = service.bulk_create(items)
+
+    if ok:
+        return success(data=result, message=message)
+    return error(message)
+
+
+@pirate_group_bp.route('/bulk', methods=['PUT'])
+def bulk_update():
+    """批量更新海贼团 PUT /api/pirate-groups/bulk  body: [{"id": 1, ...}] 或 {"items": [...]}"""
+    items = read_bulk_items(request.get_json(silent=True))
+    if items is None:
+        return error('请求体应为数组或 {"items": [...]}')
+
+    service = get_pirate_group_service()
+    ok, result, message = service.bulk_update(items)
+
+    if ok:
+        return success(data=result, message=message)
+    return error(message)
+
+
+@pirate_group_bp.route('/bulk', methods=['DELETE'])
+def bulk_delete():
+    """批量删除海贼团 DELETE /api/pirate-groups/bulk  body: [1, 2] 或 {"ids": [...]}"""
+    ids = read_bulk_items(request.get_json(silent=True), key='ids')
+    if ids is None:
+        return error('请求体应为数组或 {"ids": [...]}')
+
+    service = get_pirate_group_service()
+    ok, result, message = service.bulk_delete(ids)
+
+    if ok:
+        return success(data=result, message=message)
+    return error(message)
+
+
 @pirate_group_bp.route('/search', methods=['GET'])
+@conditional(GROUP)
 def search():
-    """搜索海贼团 GET /api/pirate-groups/search?q=keyword"""
+    """搜索海贼团 GET /api/pirate-groups/search?q=keyword&limit=&after="""
     keyword = request.args.get('q', '')
 
     service = get_pirate_group_service()
-    ok, result, message = service.search(keyword)
+    ok, result, message = service.search(
+        keyword,
+        limit=request.args.get('limit', type=int),
+        after=request.args.get('after')
+    )
 
     if ok:
-        return success(data=result, message=message)
+        return success(data=result['items'], message=message, next_cursor=result['next_cursor'])
     return error(message)
 
 
 @pirate_group_bp.route('/<int:group_id>/members', methods=['GET'])
+@conditional(GROUP, CREW)
 def get_members(group_id: int):
     """获取海贼团船员 GET /api/pirate-groups/<id>/members"""
     service = get_pirate_group_service()
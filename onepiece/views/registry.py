@@ -1,60 +1,38 @@
 """
-蓝图自动发现与注册器
+蓝图注册器 - 静态注册表
+
+启动时不再扫描 views 目录：BLUEPRINT_MODULES 列出全部视图模块，
+register_blueprints 时才导入。新增视图模块后需在此登记（tests/test_startup.py 会检查遗漏）
 """
-import os
 import importlib
 import logging
-from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# 视图模块名，模块内需定义 BLUEPRINT_CONFIG = {'blueprint': ..., 'prefix': ...}
+BLUEPRINT_MODULES = ('common', 'crew', 'index', 'pirate_group')
+
 
-def discover_blueprints():
+def load_blueprints():
     """
-    自动发现 views 目录下所有蓝图
+    按注册表导入视图模块
     返回: [(blueprint, prefix), ...]
     """
     blueprints = []
-    # 获取 views 目录路径
-    views_dir = Path(__file__).parent
-    
-    # 扫描所有 .py 文件 (排除 __init__.py 和 registry.py)
-    for file in views_dir.glob('*.py'):
-        if file.name in ['__init__.py', 'registry.py']:
-            continue
-            
-        module_name = file.stem  # 如 index, common
-
-        try:
-            # 动态导入模块: onepiece.views.xxx
-            module = importlib.import_module(f'onepiece.views.{module_name}')
-
-            # 检查是否有 BLUEPRINT_CONFIG
-            if hasattr(module, 'BLUEPRINT_CONFIG'):
-                config = module.BLUEPRINT_CONFIG
-                blueprint = config.get('blueprint')
-                prefix = config.get('prefix', '')
-
-                if blueprint:
-                    blueprints.append((blueprint, prefix))
-                    logger.debug(f'发现蓝图: {module_name} -> {prefix}')
-            else:
-                logger.warning(f'{module_name} 缺少 BLUEPRINT_CONFIG，已跳过')
-
-        except Exception as e:
-            logger.error(f'加载 {module_name} 失败: {e}')
-
+    for module_name in BLUEPRINT_MODULES:
+        config = importlib.import_module(f'onepiece.views.{module_name}').BLUEPRINT_CONFIG
+        blueprints.append((config['blueprint'], config.get('prefix', '')))
     return blueprints
 
 
 def register_blueprints(app):
     """
-    自动注册所有发现的蓝图到 Flask 应用
+    注册注册表中的所有蓝图到 Flask 应用
     """
-    blueprints = discover_blueprints()
+    blueprints = load_blueprints()
 
     for blueprint, prefix in blueprints:
         app.register_blueprint(blueprint, url_prefix=prefix)
-        logger.info(f'已注册蓝图: {blueprint.name} -> {prefix}')
+        logger.debug('已注册蓝图: %s -> %s', blueprint.name, prefix)
 
-    logger.info(f'共注册 {len(blueprints)} 个蓝图')
+    logger.debug('共注册 %s 个蓝图', len(blueprints))
@@ -11,7 +11,8 @@ def client():
 
 def test_home_page(client):
     """测试首页是否正常访问"""
-    rv = client.get('/')
+    # 根路径重定向到 /frontend/，跟随重定向检查最终页面
+    rv = client.get('/', follow_redirects=True)
     assert rv.status_code == 200
 
 def test_static_files(client):
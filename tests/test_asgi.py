@@ -0,0 +1,132 @@
+import pytest
+
+pytest.importorskip('starlette')
+pytest.importorskip('aiosqlite')
+
+from starlette.testclient import TestClient
+
+from onepiece.app import create_app
+from onepiece.asgi import create_asgi_app
+from onepiece.asgi.database import async_database_url
+from onepiece.models import CrewMember, PirateGroup, User, db
+from onepiece.utils.data_version import ensure_rows
+from onepiece.utils.search_index import crew_index, pirate_group_index
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "asgi.db"}', 'LOG_LEVEL': 'WARNING',
+              'PASSWORD_HASH_PARAMS': 'scrypt:1024:8:1'}
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        ensure_rows()
+        group = PirateGroup(name='草帽海贼团', captain='路飞')
+        db.session.add(group)
+        db.session.flush()
+        for i, name in enumerate(['路飞', '索隆', '娜美']):
+            db.session.add(CrewMember(name=name, role='船员', bounty=(i + 1) * 1000, pirate_group_id=group.id))
+        user = User(username='admin')
+        user.set_password('admin123')
+        db.session.add(user)
+        db.session.commit()
+        db.session.remove()
+        db.engine.dispose()
+    # 索引为进程级单例，按本测试的数据库重新构建
+    crew_index.built = pirate_group_index.built = False
+    return config
+
+
+@pytest.fixture
+def clients(config):
+    with TestClient(create_asgi_app(config)) as asgi:
+        yield asgi, create_app(config).test_client()
+
+
+def test_async_database_url():
+    assert async_database_url('mysql+pymysql://u:p@h:3306/d?charset=utf8mb4') == \
+        'mysql+aiomysql://u:p@h:3306/d?charset=utf8mb4'
+    assert async_database_url('sqlite:///a.db') == 'sqlite+aiosqlite:///a.db'
+
+
+@pytest.mark.parametrize('path', [
+    '/api/crew', '/api/crew?sort=-bounty&limit=2', '/api/crew/1', '/api/crew/999', '/api/crew/search?q=路飞',
+    '/api/pirate-groups', '/api/pirate-groups/1?include_members=true', '/api/pirate-groups/1/members',
+    '/api/pirate-groups/bounty-totals', '/api/pirate-groups/search?q=草帽', '/api/common/ping', '/api/nope',
+    '/api/crew/export?format=csv'
+])
+def test_reads_match_flask(clients, path):
+    asgi, flask = clients
+    expected, actual = flask.get(path), asgi.get(path)
+    assert actual.status_code == expected.status_code
+    assert actual.content == expected.get_data()
+
+
+@pytest.mark.parametrize('path', [
+    '/api/pirate-groups/999', '/api/pirate-groups/999/members', '/api/crew?after=broken', '/api/crew?sort=password'
+])
+def test_errors_match_flask(clients, path):
+    asgi, flask = clients
+    expected, actual = flask.get(path), asgi.get(path)
+    assert actual.status_code == expected.status_code
+    assert actual.json() == expected.get_json()
+
+
+def test_bounty_totals_failure_matches_flask(config):
+    """服务失败时两种模式返回相同的状态码（400）与消息"""
+    app = create_app(config)
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(db.text('DROP TABLE crew_members'))
+        db.engine.dispose()
+    with TestClient(create_asgi_app(config)) as asgi:
+        expected = create_app(config).test_client().get('/api/pirate-groups/bounty-totals')
+        actual = asgi.get('/api/pirate-groups/bounty-totals')
+    assert expected.status_code == actual.status_code == 400
+    assert actual.json() == expected.get_json() == {'success': False, 'message': '统计悬赏金失败'}
+
+
+def test_writes_and_conditional_get(clients):
+    asgi, flask = clients
+    rv = asgi.get('/api/crew/1')
+    etag = rv.headers['ETag']
+    assert asgi.get('/api/crew/1', headers={'If-None-Match': etag}).status_code == 304
+
+    rv = asgi.put('/api/crew/1', json={'bounty': 3000000000})
+    assert rv.status_code == 200 and rv.json()['data']['bounty'] == 3000000000
+    assert asgi.get('/api/crew/1', headers={'If-None-Match': etag}).status_code == 200
+
+    rv = asgi.post('/api/crew', json={'name': '乌索普', 'role': '狙击手', 'pirate_group_id': 1})
+    assert rv.status_code == 201
+    member_id = rv.json()['data']['id']
+    assert flask.get(f'/api/crew/{member_id}').get_json()['data']['name'] == '乌索普'
+    assert asgi.get('/api/crew/search?q=乌索普').json()['data'][0]['id'] == member_id
+
+    rv = asgi.post('/api/crew/bulk', json=[{'name': '山治', 'role': '厨师'}, {'name': ''}])
+    assert rv.json()['data']['succeeded'] == 1
+
+    assert asgi.delete('/api/pirate-groups/1').status_code == 400
+    assert asgi.delete(f'/api/crew/{member_id}').status_code == 200
+    assert asgi.delete(f'/api/crew/{member_id}').status_code == 404
+
+
+def test_login_verify_logout(clients):
+    asgi, _ = clients
+    assert asgi.post('/api/auth/login', json={'username': 'admin', 'password': 'wrong'}).status_code == 401
+    for body in ({'username': 'admin', 'password': 123}, {'username': ['admin'], 'password': 'admin123'}):
+        rv = asgi.post('/api/auth/login', json=body)
+        assert rv.status_code == 401 and rv.json()['message'] == '用户名和密码不能为空'
+    token = asgi.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'}).json()['data']['token']
+
+    headers = {'Authorization': f'Bearer {token}'}
+    assert asgi.get('/api/auth/verify', headers=headers).json()['data']['username'] == 'admin'
+    assert asgi.post('/api/auth/logout', headers=headers).status_code == 200
+    rv = asgi.get('/api/auth/verify', headers=headers)
+    assert rv.status_code == 401 and rv.json()['message'] == 'token已注销'
+
+
+def test_metrics_labelled_by_route(clients):
+    asgi, _ = clients
+    asgi.get('/api/crew/1')
+    text = asgi.get('/api/common/metrics').text
+    assert 'endpoint="crew.get_one"' in text
@@ -0,0 +1,79 @@
+import gzip
+
+import pytest
+
+from onepiece.app import create_app
+from onepiece.utils.assets import assets, rewrite_references
+
+
+@pytest.fixture
+def app(tmp_path):
+    return create_app({'LOG_LEVEL': 'WARNING', 'ASSETS_DIR': str(tmp_path / 'assets')})
+
+
+def test_unbuilt_falls_back_to_source(app):
+    assert app.test_client().get('/frontend/').status_code == 200
+    assert assets.url('index.html') == '/frontend/index.html'
+
+
+def test_serves_precompressed_variant(app):
+    pytest.importorskip('brotli')
+    stats = assets.build()
+    assert stats['files'] >= 1 and 'node_modules' not in str(assets.files)
+    client = app.test_client()
+    url = assets.url('index.html')
+    assert url != '/frontend/index.html'
+
+    rv = client.get(url, headers={'Accept-Encoding': 'gzip, br'})
+    assert rv.headers['Content-Encoding'] == 'br'
+    assert rv.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+    assert rv.headers['Vary'] == 'Accept-Encoding' and rv.mimetype == 'text/html'
+
+    rv = client.get('/frontend/', headers={'Accept-Encoding': 'gzip;q=1.0, br;q=0.5'})
+    assert rv.headers['Content-Encoding'] == 'gzip' and rv.headers['Cache-Control'] == 'no-cache'
+    assert b'<html' in gzip.decompress(rv.data)
+
+    rv = client.get('/frontend/')
+    assert 'Content-Encoding' not in rv.headers and b'<html' in rv.data
+    assert client.get('/frontend/', headers={'If-None-Match': rv.headers['ETag']}).status_code == 304
+    assert client.get('/frontend/package.json').status_code == 404
+
+
+@pytest.mark.parametrize('offload, header', [('x-accel-redirect', 'X-Accel-Redirect'), ('x-sendfile', 'X-Sendfile')])
+def test_offload_sends_no_body(tmp_path, offload, header):
+    app = create_app({'LOG_LEVEL': 'WARNING', 'ASSETS_DIR': str(tmp_path / 'assets'), 'ASSETS_OFFLOAD': offload})
+    assets.build()
+    rv = app.test_client().get('/frontend/', headers={'Accept-Encoding': 'gzip'})
+    assert rv.data == b'' and rv.mimetype == 'text/html'
+    target = rv.headers[header]
+    if offload == 'x-accel-redirect':
+        assert target == '/_assets/' + assets.files['index.html']['path']
+    else:
+        assert target.endswith('.gz') and rv.headers['Content-Encoding'] == 'gzip'
+
+
+def test_built_page_references_fingerprinted_assets(app):
+    assets.build()
+    css = assets.url('styles.css')
+    assert css != '/frontend/styles.css'
+
+    client = app.test_client()
+    page = client.get('/frontend/').get_data(as_text=True)
+    assert f'href="{css}"' in page and 'href="styles.css"' not in page
+    # 外部地址与模板中的地址不改写
+    assert 'https://via.placeholder.com/120?text=?' in page and 'src="${thumbnailUrl}"' in page
+
+    rv = client.get(css)
+    assert rv.status_code == 200 and rv.mimetype == 'text/css'
+    assert rv.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+
+
+def test_rewrite_references():
+    files = {'app.js': {'path': 'app.1234567890.js'}, 'img/a.png': {'path': 'img/a.abcdef0123.png'}}
+    html = '<script src="./app.js"></script><img src="/frontend/img/a.png"><a href="b.html">'
+    assert rewrite_references('index.html', html, files) == (
+        '<script src="/frontend/app.1234567890.js"></script>'
+        '<img src="/frontend/img/a.abcdef0123.png"><a href="b.html">')
+    css = ".x { background: url('../img/a.png') } .y { background: url(data:image/png;base64,AA==) }"
+    assert rewrite_references('css/site.css', css, files) == (
+        ".x { background: url('/frontend/img/a.abcdef0123.png') } .y { background: url(data:image/png;base64,AA==) }")
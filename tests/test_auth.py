@@ -0,0 +1,104 @@
+import time
+
+import jwt
+import pytest
+
+from onepiece.app import create_app
+from onepiece.models import RevokedToken, User, db
+from onepiece.utils.token_cache import RevocationList, TokenCache, token_digest
+
+
+@pytest.fixture
+def app():
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'LOG_LEVEL': 'WARNING',
+                      'PASSWORD_HASH_PARAMS': 'scrypt:1024:8:1'})
+    with app.app_context():
+        db.create_all()
+        user = User(username='admin')
+        user.set_password('admin123')
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+def _login(client) -> str:
+    rv = client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    return rv.get_json()['data']['token']
+
+
+@pytest.mark.parametrize('body', [
+    {'username': 'admin', 'password': 123},
+    {'username': 'admin', 'password': ['admin123']},
+    {'username': 1, 'password': 'admin123'},
+])
+def test_login_rejects_non_string_credentials(app, body):
+    rv = app.test_client().post('/api/auth/login', json=body)
+    assert rv.status_code == 401 and rv.get_json()['message'] == '用户名和密码不能为空'
+
+
+def test_token_cache_expires_and_evicts():
+    cache = TokenCache(max_entries=2)
+    cache.set('a', {'user_id': 1}, time.time() + 60)
+    cache.set('b', {'user_id': 2}, time.time() - 1)
+    assert cache.get('a') == {'user_id': 1}
+    assert cache.get('b') is None
+    cache.set('c', {'user_id': 3}, time.time() + 60)
+    cache.set('d', {'user_id': 4}, time.time() + 60)
+    assert cache.get('a') is None and len(cache) == 2
+
+
+def test_revocation_list_replace_keeps_local_entries():
+    revocations = RevocationList()
+    revocations.add('local', time.time() + 60)
+    revocations.replace({'db': time.time() + 60, 'old': time.time() - 1})
+    assert 'local' in revocations and 'db' in revocations
+    assert 'old' not in revocations and len(revocations) == 2
+
+
+def test_verify_is_cached_per_app(app):
+    client = app.test_client()
+    token = _login(client)
+    service = app.extensions['auth_service']
+
+    for _ in range(3):
+        rv = client.get('/api/auth/verify', headers={'Authorization': f'Bearer {token}'})
+        assert rv.status_code == 200
+        assert rv.get_json()['data']['username'] == 'admin'
+    assert service.token_cache.misses == 1 and service.token_cache.hits == 2
+
+    forged = jwt.encode({'user_id': 1, 'username': 'admin', 'exp': time.time() + 60}, 'wrong', algorithm='HS256')
+    assert client.get('/api/auth/verify', headers={'Authorization': forged}).status_code == 401
+    assert client.get('/api/auth/verify').status_code == 401
+
+
+def test_logout_revokes_token(app):
+    client = app.test_client()
+    token, other = _login(client), _login(client)
+    assert token != other
+    client.get('/api/auth/verify', headers={'Authorization': token})
+
+    assert client.post('/api/auth/logout', headers={'Authorization': token}).status_code == 200
+    rv = client.get('/api/auth/verify', headers={'Authorization': token})
+    assert rv.status_code == 401 and rv.get_json()['message'] == 'token已注销'
+    assert client.get('/api/auth/verify', headers={'Authorization': other}).status_code == 200
+    assert db.session.get(RevokedToken, token_digest(token)) is not None
+
+    # 其他进程的实例从数据库重新加载后同样拒绝
+    service = app.extensions['auth_service']
+    service.revocations = RevocationList()
+    service.reload_revocations()
+    assert not service.verify_token(token)[0]
+
+
+def test_login_password_not_logged(caplog):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'LOG_LEVEL': 'DEBUG',
+                      'LOG_REQUEST_SAMPLE_RATE': 1.0, 'PASSWORD_HASH_PARAMS': 'scrypt:1024:8:1'})
+    with app.app_context():
+        db.create_all()
+        with caplog.at_level('DEBUG'):
+            app.test_client().post('/api/auth/login', json={'username': 'admin', 'password': 'secret-pw-42'},
+                                   headers={'Authorization': 'Bearer secret-token-42'})
+        db.session.remove()
+    assert '登录用户: admin' in caplog.text
+    assert 'secret-pw-42' not in caplog.text and 'secret-token-42' not in caplog.text
@@ -0,0 +1,42 @@
+from benchmarks.report import compare, percentile, summarize
+from benchmarks.scenarios import build_scenarios
+
+
+def _report(mode, **stats):
+    base = {'requests': 100, 'errors': 0, 'p95_ms': 10.0, 'rps': 100.0}
+    base.update(stats)
+    return {'results': {mode: {'crew.get_one': base}}}
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 100) == 100
+    assert percentile([], 95) == 0.0
+
+
+def test_summarize():
+    stats = summarize([0.002, 0.001, 0.003, 0.004], errors=1, wall=0.5)
+    assert stats['requests'] == 4
+    assert stats['errors'] == 1
+    assert stats['p50_ms'] == 2.0
+    assert stats['max_ms'] == 4.0
+    assert stats['rps'] == 8.0
+
+
+def test_compare_detects_regressions():
+    baseline = _report('single')
+    assert compare(_report('single', p95_ms=12.0), baseline) == []
+    assert len(compare(_report('single', p95_ms=20.0), baseline)) == 1
+    assert len(compare(_report('single', errors=3), baseline)) == 1
+    # 亚毫秒级的差异不算回归
+    assert compare(_report('single', p95_ms=0.5), _report('single', p95_ms=0.2)) == []
+    # 并发模式阈值放宽，且比较吞吐
+    assert compare(_report('concurrent', p95_ms=14.0), _report('concurrent')) == []
+    assert len(compare(_report('concurrent', rps=40.0), _report('concurrent'))) == 1
+
+
+def test_scenario_names_unique():
+    names = [s.name for s in build_scenarios()]
+    assert len(names) == len(set(names))
@@ -0,0 +1,92 @@
+import pytest
+
+from onepiece.app import create_app
+from onepiece.models import CrewMember, PirateGroup, db
+from onepiece.utils.bounty import format_bounty, parse_bounty
+from onepiece.utils.data_version import ensure_rows
+
+
+def test_parse_bounty():
+    """悬赏金展示文本解析为整数贝里"""
+    assert parse_bounty('30亿贝里') == 3_000_000_000
+    assert parse_bounty('40.48亿贝里以上') == 4_048_000_000
+    assert parse_bounty('3.66亿贝里') == 366_000_000
+    assert parse_bounty('5千万贝里') == 50_000_000
+    assert parse_bounty('1000贝里') == 1000
+    assert parse_bounty('未知') is None
+    assert parse_bounty(None) is None
+
+
+def test_format_bounty():
+    """贝里数格式化为展示文本"""
+    assert format_bounty(8_816_000_000) == '88.16亿贝里'
+    assert format_bounty(15_000_000) == '1500万贝里'
+    assert format_bounty(1000) == '1000贝里'
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "bounty.db"}',
+                      'CACHE_BACKEND': 'none', 'LOG_LEVEL': 'WARNING'})
+    with app.app_context():
+        db.create_all()
+        ensure_rows()
+        db.session.remove()
+    client = app.test_client()
+    for name, captain in [('草帽海贼团', '路飞'), ('红发海贼团', '香克斯'), ('空船海贼团', '无')]:
+        client.post('/api/pirate-groups', json={'name': name, 'captain': captain})
+    for name, bounty, group_id in [('路飞', '30亿贝里', 1), ('乔巴', '1000贝里', 1), ('维薇', '未知', 1),
+                                   ('香克斯', '40.48亿贝里', 2), ('耶稣布', '5千万贝里', 2)]:
+        assert client.post('/api/crew', json={'name': name, 'role': '船员', 'bounty': bounty,
+                                              'pirate_group_id': group_id}).status_code == 201
+    return app
+
+
+def names(client, query):
+    body = client.get(f'/api/crew?{query}').get_json()
+    assert body['success'], body
+    return [m['name'] for m in body['data']]
+
+
+def test_bounty_range_filters(app):
+    client = app.test_client()
+    assert names(client, 'min_bounty=50000000&sort=bounty') == ['耶稣布', '路飞', '香克斯']
+    assert names(client, 'max_bounty=50000000&sort=bounty') == ['乔巴', '耶稣布']
+    assert names(client, 'min_bounty=1000&max_bounty=1000') == ['乔巴']
+    # 悬赏金未知（NULL）的船员不满足任何范围条件
+    assert '维薇' not in names(client, 'min_bounty=0')
+
+
+def test_sort_by_bounty_puts_unknown_first_ascending_last_descending(app):
+    client = app.test_client()
+    assert names(client, 'sort=bounty') == ['维薇', '乔巴', '耶稣布', '路飞', '香克斯']
+    assert names(client, 'sort=-bounty') == ['香克斯', '路飞', '耶稣布', '乔巴', '维薇']
+
+
+def test_bounty_totals(app):
+    rv = app.test_client().get('/api/pirate-groups/bounty-totals')
+    assert rv.status_code == 200
+    totals = [(t['pirate_group_name'], t['crew_bounty_total'], t['crew_bounty_total_text'], t['crew_count'])
+              for t in rv.get_json()['data']]
+    assert totals == [
+        ('红发海贼团', 4098000000, '40.98亿贝里', 2),
+        ('草帽海贼团', 3000001000, '30亿贝里', 3),
+        ('空船海贼团', 0, '0贝里', 0),
+    ]
+
+
+def test_backfill_bounty_command(app):
+    with app.app_context():
+        db.session.query(CrewMember).update({CrewMember.bounty_value: None})
+        db.session.query(PirateGroup).filter_by(id=1).update(
+            {PirateGroup.total_bounty: '30亿贝里', PirateGroup.total_bounty_value: None})
+        db.session.commit()
+        db.session.remove()
+    assert names(app.test_client(), 'min_bounty=0') == []
+
+    result = app.test_cli_runner().invoke(args=['backfill-bounty', '--batch-size', '2'])
+    assert result.exit_code == 0, result.output
+    assert 'crew_members: 已回填 5 行' in result.output
+    assert names(app.test_client(), 'min_bounty=0&sort=-bounty') == ['香克斯', '路飞', '耶稣布', '乔巴']
+    with app.app_context():
+        assert db.session.get(PirateGroup, 1).total_bounty_value == 3000000000
@@ -0,0 +1,98 @@
+import pytest
+
+from onepiece.app import create_app
+from onepiece.models import CrewMember, PirateGroup, db
+from onepiece.utils.bulk import is_id
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "bulk.db"}',
+                      'CACHE_BACKEND': 'none', 'LOG_LEVEL': 'WARNING'})
+    with app.app_context():
+        db.create_all()
+        group = PirateGroup(name='草帽海贼团', captain='路飞')
+        db.session.add(group)
+        db.session.flush()
+        db.session.add(CrewMember(name='路飞', role='船长', bounty='30亿', pirate_group_id=group.id))
+        db.session.commit()
+        db.session.remove()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def outcomes(rv):
+    assert rv.status_code == 200
+    return [(r['success'], r.get('message')) for r in rv.get_json()['data']['results']]
+
+
+def test_is_id():
+    assert is_id(1) and not is_id(True) and not is_id('1') and not is_id(1.0)
+
+
+def test_crew_bulk_create_reports_bad_items_individually(app, client):
+    rv = client.post('/api/crew/bulk', json=[
+        {'name': '索隆', 'role': '剑士', 'bounty': '11亿', 'pirate_group_id': 1},
+        {'name': '娜美', 'role': '航海士', 'bounty': {'value': 3}},
+        {'name': ['山治'], 'role': '厨师'},
+        {'name': '乌索普', 'role': '狙击手', 'pirate_group_id': True},
+        {'name': '乔' * 101, 'role': '船医'},
+        {'name': '罗宾', 'role': '考古学家', 'bounty': 930000000},
+    ])
+    assert outcomes(rv) == [
+        (True, None),
+        (False, 'bounty 应为字符串'),
+        (False, 'name 应为字符串'),
+        (False, 'pirate_group_id 应为整数'),
+        (False, 'name 不能超过 100 个字符'),
+        (True, None),
+    ]
+    with app.app_context():
+        robin = CrewMember.query.filter_by(name='罗宾').one()
+        assert robin.bounty_value == 930000000
+        assert CrewMember.query.count() == 3
+
+
+def test_crew_bulk_update_and_delete_reject_bool_ids(app, client):
+    rv = client.put('/api/crew/bulk', json=[
+        {'id': True, 'role': '船员'},
+        {'id': 1, 'role': ['船长']},
+        {'id': 1, 'bounty': '31亿'},
+    ])
+    assert outcomes(rv) == [(False, 'id 应为整数'), (False, 'role 应为字符串'), (True, None)]
+
+    rv = client.delete('/api/crew/bulk', json=[True, 'x', 99, 1])
+    assert outcomes(rv) == [(False, 'id 应为整数'), (False, 'id 应为整数'), (False, '船员不存在'), (True, None)]
+    with app.app_context():
+        assert CrewMember.query.count() == 0
+
+
+def test_group_bulk_endpoints_mixed_batches(app, client):
+    rv = client.post('/api/pirate-groups/bulk', json=[
+        {'name': '红发海贼团', 'captain': '香克斯', 'total_bounty': 4048900000},
+        {'name': 7, 'captain': '基德'},
+        {'name': '红心海贼团', 'captain': '罗', 'member_count': '20'},
+        {'name': '百兽海贼团', 'captain': '凯多', 'member_count': False},
+    ])
+    assert outcomes(rv) == [
+        (True, None),
+        (False, 'name 应为字符串'),
+        (False, 'member_count 应为整数'),
+        (False, 'member_count 应为整数'),
+    ]
+
+    rv = client.put('/api/pirate-groups/bulk', json=[
+        {'id': True, 'captain': '路飞'},
+        {'id': 1, 'ship_name': {'name': '千阳号'}},
+        {'id': 1, 'ship_name': '千阳号'},
+    ])
+    assert outcomes(rv) == [(False, 'id 应为整数'), (False, 'ship_name 应为字符串'), (True, None)]
+
+    rv = client.delete('/api/pirate-groups/bulk', json=[False, 2])
+    assert outcomes(rv) == [(False, 'id 应为整数'), (True, None)]
+    with app.app_context():
+        assert [g.name for g in PirateGroup.query.all()] == ['草帽海贼团']
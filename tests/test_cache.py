@@ -0,0 +1,91 @@
+import pytest
+
+from onepiece.utils.cache import MemoryBackend, RedisBackend, ServiceCache, resolve_backend
+
+
+class FakeRedis:
+    """redis-py 客户端的本地替身，只实现缓存用到的命令"""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def mget(self, keys):
+        return [self.store.get(k) for k in keys]
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.store:
+            return False
+        self.store[key] = str(value).encode() if isinstance(value, int) else value
+        return True
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+    def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1).encode()
+        return int(self.store[key])
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def cache(request):
+    cache = ServiceCache()
+    cache.backend = MemoryBackend(max_entries=2) if request.param == 'memory' else RedisBackend(FakeRedis())
+    return cache
+
+
+def make_service(cache):
+    class Service:
+        calls = 0
+
+        @cache.cached('svc.get', tags=lambda data, item_id: [f'item:{item_id}', 'item:list'])
+        def get(self, item_id):
+            Service.calls += 1
+            return True, {'id': item_id, 'calls': Service.calls}, 'ok'
+
+    return Service()
+
+
+def test_read_through_and_invalidate(cache):
+    """命中后不再调用原方法，按标签失效后重新加载"""
+    service = make_service(cache)
+    assert service.get(1) == (True, {'id': 1, 'calls': 1}, 'ok')
+    assert service.get(1) == (True, {'id': 1, 'calls': 1}, 'ok')
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.invalidate('item:2')
+    assert service.get(1)[1]['calls'] == 1
+
+    cache.invalidate('item:1')
+    assert service.get(1)[1]['calls'] == 2
+    assert cache.stats()['hit_rate'] == 0.5
+
+
+def test_memory_backend_lru_eviction():
+    """超过容量时淘汰最久未使用的条目"""
+    backend = MemoryBackend(max_entries=2)
+    backend.set('a', 1, ttl=60)
+    backend.set('b', 2, ttl=60)
+    backend.get('a')
+    backend.set('c', 3, ttl=60)
+    assert backend.get('b') is None
+    assert backend.get('a') == 1
+    assert backend.evictions == 1
+
+
+@pytest.mark.parametrize('backend, processes, redis_url, expected', [
+    ('auto', 1, '', 'memory'),
+    ('auto', 4, '', 'none'),
+    ('auto', 4, 'redis://cache:6379/0', 'redis'),
+    ('none', 1, '', 'none'),
+])
+def test_resolve_backend(backend, processes, redis_url, expected):
+    """auto 在多进程下不使用只对本进程失效的 memory 后端"""
+    assert resolve_backend(backend, processes, redis_url) == expected
+
+
+def test_memory_backend_with_multiple_processes_warns(caplog):
+    assert resolve_backend('memory', 4, '') == 'memory'
+    assert 'CACHE_BACKEND=memory' in caplog.text
@@ -0,0 +1,117 @@
+import subprocess
+import sys
+import time
+
+import pytest
+from sqlalchemy import event
+
+from onepiece.app import create_app
+from onepiece.models import CrewMember, PirateGroup, db
+from onepiece.utils.data_version import ensure_rows
+
+
+@pytest.fixture
+def uri(tmp_path):
+    uri = f'sqlite:///{tmp_path / "conditional.db"}'
+    app = create_app({'SQLALCHEMY_DATABASE_URI': uri, 'LOG_LEVEL': 'WARNING'})
+    with app.app_context():
+        db.create_all()
+        ensure_rows()
+        group = PirateGroup(name='草帽海贼团', captain='路飞')
+        db.session.add(group)
+        db.session.flush()
+        db.session.add(CrewMember(name='路飞', role='船长', bounty='30亿', pirate_group_id=group.id))
+        db.session.commit()
+        db.session.remove()
+    return uri
+
+
+@pytest.fixture
+def client(uri):
+    # 默认缓存配置（单进程为 memory），与开发服务器一致
+    return create_app({'SQLALCHEMY_DATABASE_URI': uri, 'LOG_LEVEL': 'WARNING'}).test_client()
+
+
+def test_not_modified_until_write(client):
+    rv = client.get('/api/crew/1')
+    etag = rv.headers['ETag']
+    assert rv.headers['Cache-Control'] == 'no-cache'
+
+    rv = client.get('/api/crew/1', headers={'If-None-Match': etag})
+    assert rv.status_code == 304 and rv.get_data() == b''
+
+    groups_etag = client.get('/api/pirate-groups').headers['ETag']
+    assert client.put('/api/crew/1', json={'bounty': '31亿'}).status_code == 200
+
+    rv = client.get('/api/crew/1', headers={'If-None-Match': etag})
+    assert rv.status_code == 200 and rv.headers['ETag'] != etag
+    assert rv.get_json()['data']['bounty'] == '31亿'
+    # 海贼团列表不依赖船员数据，ETag 不变
+    assert client.get('/api/pirate-groups', headers={'If-None-Match': groups_etag}).status_code == 304
+
+
+WRITER = '''
+import sys
+from onepiece.app import create_app
+app = create_app({'SQLALCHEMY_DATABASE_URI': sys.argv[1], 'LOG_LEVEL': 'WARNING'})
+rv = app.test_client().post('/api/crew', json={'name': '索隆', 'role': '剑士', 'pirate_group_id': 1})
+assert rv.status_code == 201, rv.get_json()
+'''
+
+
+def test_cached_versions_skip_database(uri, client):
+    """缓存中的版本号未过期时，条件 GET 不查询 data_versions；本进程写入立即生效"""
+    queries = []
+
+    def record(conn, cursor, statement, *args):
+        if 'data_versions' in statement and statement.lstrip().upper().startswith('SELECT'):
+            queries.append(statement)
+
+    etag = client.get('/api/crew/1').headers['ETag']
+    with client.application.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        for path in ['/api/crew/1', '/api/crew/1', '/api/pirate-groups']:
+            rv = client.get(path, headers={'If-None-Match': etag})
+        assert rv.status_code == 200 and queries == []
+        assert client.get('/api/crew/1', headers={'If-None-Match': etag}).status_code == 304
+        assert queries == []
+
+        assert client.put('/api/crew/1', json={'bounty': '31亿'}).status_code == 200
+        queries.clear()
+        rv = client.get('/api/crew/1', headers={'If-None-Match': etag})
+        assert rv.status_code == 200 and rv.headers['ETag'] != etag
+        assert len(queries) == 1
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+def test_write_in_other_process_changes_etag(uri):
+    """另一个进程（worker）写入后，版本号缓存过期即不再返回 304，也不返回进程内缓存中的旧数据"""
+    client = create_app({'SQLALCHEMY_DATABASE_URI': uri, 'LOG_LEVEL': 'WARNING',
+                         'CACHE_VERSION_TTL': 0.2}).test_client()
+    paths = ['/api/crew', '/api/pirate-groups/1?include_members=true']
+    etags = {}
+    for path in paths:
+        etags[path] = client.get(path).headers['ETag']
+        assert client.get(path, headers={'If-None-Match': etags[path]}).status_code == 304
+
+    started = time.monotonic()
+    subprocess.run([sys.executable, '-c', WRITER, uri], check=True)
+    time.sleep(max(0.0, 0.3 - (time.monotonic() - started)))
+
+    rv = client.get('/api/crew', headers={'If-None-Match': etags['/api/crew']})
+    assert rv.status_code == 200
+    assert [m['name'] for m in rv.get_json()['data']] == ['路飞', '索隆']
+    rv = client.get(paths[1], headers={'If-None-Match': etags[paths[1]]})
+    assert rv.status_code == 200 and len(rv.get_json()['data']['members']) == 2
+
+
+def test_no_etag_without_version_rows(tmp_path):
+    """未执行迁移（缺少版本行）时不做条件 GET"""
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "legacy.db"}', 'LOG_LEVEL': 'WARNING'})
+    with app.app_context():
+        db.create_all()
+    rv = app.test_client().get('/api/crew')
+    assert rv.status_code == 200 and 'ETag' not in rv.headers
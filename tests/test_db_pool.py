@@ -0,0 +1,14 @@
+from onepiece.utils.db_pool import InstrumentedQueuePool, engine_options
+
+
+def test_engine_options_from_config():
+    config = {'SQLALCHEMY_DATABASE_URI': 'mysql+pymysql://u:p@localhost/db', 'DB_POOL_SIZE': 8}
+    options = engine_options(config)
+    assert options['poolclass'] is InstrumentedQueuePool
+    assert options['pool_size'] == 8
+    assert options['pool_pre_ping'] is True
+
+
+def test_engine_options_skip_memory_sqlite():
+    assert engine_options({'SQLALCHEMY_DATABASE_URI': 'sqlite://'}) == {}
+    assert engine_options({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'}) == {}
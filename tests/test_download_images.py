@@ -0,0 +1,101 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from download_images import ImageFetcher, TokenBucket
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/characters/<id> 返回图片地址，/img/<id>.jpg 返回图片（带 ETag）"""
+
+    protocol_version = 'HTTP/1.1'
+    images = {}
+    requests = []
+    peers = set()
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        self.peers.add(self.client_address)
+        if self.path.startswith('/characters/'):
+            char_id = self.path.rsplit('/', 1)[1]
+            host = self.headers['Host']
+            body = json.dumps({'data': {'images': {'jpg': {'image_url': f'http://{host}/img/{char_id}.jpg'}}}})
+            return self._send(200, body.encode(), {})
+        char_id = self.path.rsplit('/', 1)[1].split('.')[0]
+        etag = f'"v{len(self.images[char_id])}"'
+        if self.headers.get('If-None-Match') == etag:
+            return self._send(304, b'', {'ETag': etag})
+        return self._send(200, self.images[char_id], {'ETag': etag})
+
+    def _send(self, status, body, headers):
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    StubHandler.images = {str(i): bytes([i]) * (1000 + i) for i in range(1, 9)}
+    StubHandler.requests, StubHandler.peers = [], set()
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_token_bucket_limits_rate():
+    now, slept = [0.0], []
+
+    def sleep(seconds):
+        slept.append(seconds)
+
+    bucket = TokenBucket(rate=2, burst=2, clock=lambda: now[0], sleep=sleep)
+    assert [bucket.acquire() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    now[0] = 10.0
+    assert bucket.acquire() == 0.0
+
+
+def test_fetch_resume_and_revalidate(server, tmp_path):
+    characters = {f'c{i}': i for i in range(1, 9)}
+    manifest = tmp_path / 'manifest.json'
+
+    def fetcher():
+        return ImageFetcher(str(tmp_path / 'images'), str(manifest), api_base=server + '/', rate=1000, burst=100,
+                            workers=3)
+
+    first = fetcher()
+    assert first.run(characters) == {'downloaded': 8, 'not_modified': 0, 'skipped': 0, 'failed': 0}
+    assert (tmp_path / 'images' / 'c3.jpg').read_bytes() == bytes([3]) * 1003
+    # keep-alive：16 个请求最多用 workers 条连接
+    assert len(StubHandler.requests) == 16 and first.pool.connections <= 3 and len(StubHandler.peers) <= 3
+    assert not list((tmp_path / 'images').glob('*.part'))
+
+    # 清单中已完成的直接跳过；丢失的文件重新下载
+    (tmp_path / 'images' / 'c1.jpg').unlink()
+    StubHandler.requests.clear()
+    assert fetcher().run(characters)['skipped'] == 7
+    assert StubHandler.requests == ['/characters/1', '/img/1.jpg']
+
+    # 条件请求：未变化返回 304，变化的重新下载
+    StubHandler.images['2'] = b'x' * 5000
+    stats = fetcher().run(characters, revalidate=True)
+    assert stats == {'downloaded': 1, 'not_modified': 7, 'skipped': 0, 'failed': 0}
+    assert json.loads(manifest.read_text())['c2']['size'] == 5000
+
+
+def test_failed_download_leaves_no_partial_file(server, tmp_path):
+    fetcher = ImageFetcher(str(tmp_path), str(tmp_path / 'manifest.json'), api_base=server, rate=1000, burst=100,
+                           retries=0)
+    stats = fetcher.run({'missing': 99})
+    assert stats['failed'] == 1
+    assert list(tmp_path.iterdir()) == []
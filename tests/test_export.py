@@ -0,0 +1,31 @@
+import csv
+import io
+import json
+
+from onepiece.utils.export import csv_stream, flatten, ndjson_stream
+
+
+def test_flatten_nested():
+    assert flatten({'a': 1, 'b': {'c': 2, 'd': None}}) == {'a': 1, 'b.c': 2, 'b.d': None}
+
+
+def test_ndjson_stream():
+    records = [{'id': i, 'name': f'路飞{i}'} for i in range(3)]
+    chunks = list(ndjson_stream(iter(records)))
+    # 首行单独产出，便于客户端尽早收到数据
+    assert chunks[0] == '{"id":0,"name":"路飞0"}\n'
+    lines = ''.join(chunks).splitlines()
+    assert [json.loads(line) for line in lines] == records
+
+
+def test_csv_stream():
+    records = [{'id': 1, 'abilities': {'devil_fruit': '橡胶果实'}, 'role': None}]
+    chunks = list(csv_stream(iter(records), ['id', 'role', 'abilities.devil_fruit']))
+    assert chunks[0] == 'id,role,abilities.devil_fruit\r\n'
+    rows = list(csv.reader(io.StringIO(''.join(chunks))))
+    assert rows == [['id', 'role', 'abilities.devil_fruit'], ['1', '', '橡胶果实']]
+
+
+def test_empty_streams():
+    assert list(ndjson_stream(iter([]))) == []
+    assert list(csv_stream(iter([]), ['id'])) == ['id\r\n']
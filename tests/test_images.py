@@ -0,0 +1,94 @@
+import io
+import os
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+from onepiece.app import create_app
+from onepiece.models import CrewMember
+from onepiece.utils.images import image_variants
+
+
+@pytest.fixture
+def app(tmp_path):
+    source = tmp_path / 'images'
+    source.mkdir()
+    Image.new('RGB', (800, 600), 'red').save(source / 'luffy.jpg')
+    return create_app({'LOG_LEVEL': 'WARNING', 'IMAGE_SOURCE_DIR': str(source),
+                       'IMAGE_CACHE_DIR': str(tmp_path / 'cache'), 'IMAGE_WIDTHS': (120, 240)})
+
+
+def test_variant_redirects_to_hashed_url_and_is_immutable(app):
+    client = app.test_client()
+    rv = client.get('/images/luffy.jpg?w=200&fmt=webp')
+    assert rv.status_code == 302
+    location = rv.headers['Location']
+    assert location == image_variants.url('/images/luffy.jpg', 200, 'webp')
+    assert '?w=240&fmt=webp&v=' in location
+
+    rv = client.get(location)
+    assert rv.status_code == 200 and rv.mimetype == 'image/webp'
+    assert 'immutable' in rv.headers['Cache-Control']
+    with Image.open(io.BytesIO(rv.data)) as image:
+        assert image.size == (240, 180)
+    rv.close()
+
+    hits = image_variants.lookups.value(('hit',))
+    client.get(location).close()
+    assert image_variants.lookups.value(('hit',)) == hits + 1
+
+    # 原图不带参数时原样返回
+    assert client.get('/images/luffy.jpg').status_code == 200
+    assert client.get('/images/luffy.jpg?fmt=gif').status_code == 400
+    assert client.get('/images/missing.jpg?w=120').status_code == 404
+
+
+def test_replaced_source_changes_url(app, tmp_path):
+    client = app.test_client()
+    old = image_variants.thumbnail_url('/images/luffy.jpg')
+    Image.new('RGB', (800, 600), 'blue').save(tmp_path / 'images' / 'luffy.jpg')
+    os.utime(tmp_path / 'images' / 'luffy.jpg', ns=(0, 1))
+    # 图片请求总是重新检查源文件并刷新缓存的哈希，旧地址跳转到新地址
+    new = client.get(old).headers['Location']
+    assert new != old
+    assert image_variants.thumbnail_url('/images/luffy.jpg') == new
+
+
+def test_digest_is_reused_without_stat(app, tmp_path, monkeypatch):
+    """序列化多行时源文件只 stat 一次"""
+    image_variants.digest_ttl = 60
+    source = str(tmp_path / 'images')
+    stat = os.stat
+    calls = []
+
+    def counting_stat(path, *args, **kwargs):
+        if str(path).startswith(source):
+            calls.append(path)
+        return stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, 'stat', counting_stat)
+    members = [CrewMember(id=i, name=f'船员{i}', role='船员', image_url='/images/luffy.jpg') for i in range(50)]
+    members.append(CrewMember(id=50, name='索隆', role='剑士', image_url='/images/missing.jpg'))
+    urls = [CrewMember.serialize(member, None)['thumbnail_url'] for member in members * 2]
+    assert len(set(urls[:50])) == 1 and urls[50] == '/images/missing.jpg'
+    assert len(calls) == 2
+
+
+def test_cache_evicts_least_recently_used(app, tmp_path):
+    with app.app_context():
+        digest = image_variants.source_digest('luffy.jpg')
+        first = image_variants.variant('luffy.jpg', 120, 'png', digest)
+        os.utime(first, (1, 1))
+        image_variants.max_bytes = os.path.getsize(first) + 1
+        second = image_variants.variant('luffy.jpg', 240, 'png', digest)
+    assert not os.path.exists(first) and os.path.exists(second)
+    assert image_variants.evicted.value() >= 1
+
+
+def test_serialized_crew_points_at_thumbnail(app):
+    member = CrewMember(id=1, name='路飞', role='船长', image_url='/images/luffy.jpg')
+    data = CrewMember.serialize(member, None)
+    assert data['thumbnail_url'].startswith('/images/luffy.jpg?w=240&fmt=webp&v=')
+    external = CrewMember(id=2, name='索隆', role='剑士', image_url='https://example.com/zoro.jpg')
+    assert CrewMember.serialize(external, None)['thumbnail_url'] == 'https://example.com/zoro.jpg'
@@ -0,0 +1,107 @@
+import io
+import json
+
+import pytest
+
+from onepiece.app import create_app
+from onepiece.models import CrewMember, PirateGroup, db
+from onepiece.services.import_service import ImportService, _strip_abilities, detect_format, iter_records
+from onepiece.utils import data_version
+from onepiece.utils.data_version import ensure_rows
+
+
+def test_detect_format():
+    assert detect_format('crew.csv') == 'csv'
+    assert detect_format('crew.NDJSON') == 'ndjson'
+    assert detect_format('crew.jsonl') == 'ndjson'
+    assert detect_format('crew.txt') is None
+
+
+def test_iter_records_csv_skips_empty_cells():
+    stream = io.StringIO('name,role,abilities.devil_fruit,pirate_group_id\r\n路飞,船长,橡胶果实,\r\n')
+    records = list(iter_records(stream, 'csv'))
+    assert records == [{'name': '路飞', 'role': '船长', 'abilities.devil_fruit': '橡胶果实'}]
+    assert _strip_abilities(records[0])['devil_fruit'] == '橡胶果实'
+
+
+def test_iter_records_ndjson_flattens_and_marks_bad_lines():
+    stream = io.StringIO('{"name": "索隆", "abilities": {"haki_types": "武装色"}}\n\nnot json\n[1]\n')
+    records = list(iter_records(stream, 'ndjson'))
+    assert records == [{'name': '索隆', 'abilities.haki_types': '武装色'}, None, [1]]
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "import.db"}',
+                      'CACHE_BACKEND': 'none', 'LOG_LEVEL': 'WARNING'})
+    with app.app_context():
+        db.create_all()
+        ensure_rows()
+        db.session.add(PirateGroup(name='草帽海贼团', captain='路飞'))
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+def ndjson(*records) -> io.StringIO:
+    return io.StringIO('\n'.join(r if isinstance(r, str) else json.dumps(r, ensure_ascii=False) for r in records))
+
+
+def test_import_crew_batches_and_rejects_per_row(app):
+    stream = ndjson(
+        {'name': '路飞', 'role': '船长', 'bounty': '30亿', 'pirate_group_id': 1},
+        {'name': ['索隆'], 'role': '剑士'},
+        'not json',
+        {'name': '娜美', 'role': '航海士', 'bounty': 366000000},
+        {'name': '乌索普', 'role': '狙击手', 'pirate_group_id': 9},
+        {'name': '山治', 'role': ['厨师']},
+        {'name': '乔巴', 'role': '船医', 'pirate_group_id': True},
+        {'name': '罗宾', 'role': '考古学家', 'abilities': {'devil_fruit': '花花果实'}},
+    )
+    progress = []
+    ok, stats, _ = ImportService(batch_size=3).import_crew(
+        iter_records(stream, 'ndjson'), on_batch=lambda s: progress.append(s['offset']))
+
+    assert ok and stats['inserted'] == 3 and stats['rejected'] == 5
+    assert progress == [3, 6, 8]
+    assert [(e['record'], e['message']) for e in stats['errors']] == [
+        (2, 'name 应为字符串'), (3, '数据格式错误'), (5, '指定的海贼团不存在'),
+        (6, 'role 应为字符串'), (7, '海贼团 id 格式错误'),
+    ]
+    rows = {m.name: m for m in CrewMember.query}
+    assert set(rows) == {'路飞', '娜美', '罗宾'}
+    assert rows['娜美'].bounty_value == 366000000 and rows['罗宾'].devil_fruit == '花花果实'
+
+
+def test_import_groups_dedupes_names(app):
+    stream = io.StringIO('name,captain,member_count\r\n草帽海贼团,路飞,9\r\n红发海贼团,香克斯,\r\n'
+                         '红发海贼团,香克斯,\r\n百兽海贼团,凯多,x\r\n')
+    ok, stats, _ = ImportService(batch_size=2).import_groups(iter_records(stream, 'csv'))
+    assert ok and stats['inserted'] == 1 and stats['rejected'] == 3
+    assert [(e['record'], e['message']) for e in stats['errors']] == [
+        (1, '海贼团 草帽海贼团 已存在'), (4, '船员数量格式错误'), (3, '海贼团 红发海贼团 已存在')
+    ]
+    assert PirateGroup.query.filter_by(name='红发海贼团').one().member_count == 0
+
+
+def test_failed_batch_resumes_from_offset(app, monkeypatch):
+    records = [{'name': f'船员{i}', 'role': '船员'} for i in range(5)] + [{'name': '', 'role': '船员'}]
+    bump = data_version.bump
+    calls = []
+
+    def fail_second_batch(*scopes):
+        calls.append(scopes)
+        if len(calls) == 2:
+            raise RuntimeError('连接断开')
+        return bump(*scopes)
+
+    monkeypatch.setattr(data_version, 'bump', fail_second_batch)
+    ok, stats, message = ImportService(batch_size=3).import_crew(records)
+    assert not ok and stats['offset'] == 3 and 'offset=3' in message
+    # 失败批次中的跳过统计已回退，续传时不会重复计入
+    assert stats['inserted'] == 3 and stats['rejected'] == 0 and stats['errors'] == []
+
+    ok, stats, _ = ImportService(batch_size=3).import_crew(records, offset=stats['offset'])
+    assert ok and stats['inserted'] == 2 and stats['rejected'] == 1
+    assert stats['errors'] == [{'record': 6, 'message': '船员名称和职位不能为空'}]
+    assert CrewMember.query.count() == 5
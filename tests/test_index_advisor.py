@@ -0,0 +1,27 @@
+from onepiece.utils.index_advisor import propose_index
+
+LIST_SQL = ('SELECT crew_members.id AS crew_members_id, crew_members.name AS crew_members_name, '
+            'pirate_groups.name AS pirate_group_name FROM crew_members LEFT OUTER JOIN pirate_groups '
+            'ON crew_members.pirate_group_id = pirate_groups.id WHERE crew_members.pirate_group_id = ? '
+            'AND crew_members.id > ? ORDER BY crew_members.id ASC, crew_members.id ASC LIMIT ? OFFSET ?')
+TOTALS_SQL = ('SELECT crew_members.pirate_group_id, sum(crew_members.bounty_value) AS total FROM crew_members '
+              'GROUP BY crew_members.pirate_group_id')
+
+
+def test_equality_then_order_columns():
+    # name 只有一列，补齐成覆盖索引
+    assert propose_index(LIST_SQL, 'crew_members', [['name']], ['id']) == ['pirate_group_id', 'id', 'name']
+
+
+def test_existing_prefix_suppresses_suggestion():
+    existing = [['pirate_group_id', 'id', 'name', 'role']]
+    assert propose_index(LIST_SQL, 'crew_members', existing, ['id']) is None
+
+
+def test_group_by_covering_index():
+    assert propose_index(TOTALS_SQL, 'crew_members', [], ['id']) == ['pirate_group_id', 'bounty_value']
+
+
+def test_primary_key_only_is_not_suggested():
+    sql = 'SELECT pirate_groups.id FROM pirate_groups ORDER BY pirate_groups.id LIMIT ?'
+    assert propose_index(sql, 'pirate_groups', [], ['id']) is None
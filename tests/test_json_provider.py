@@ -0,0 +1,60 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from onepiece.app import create_app
+from onepiece.utils.json_provider import json_codec, select_dumps, stdlib_dumps
+from onepiece.utils.response import success
+
+PAYLOAD = {
+    'name': '蒙奇·D·路飞', 'quote': '"海贼王"\n\t\x01 \\', 'id': 1, 'ratio': 0.25, 'none': None,
+    'nested': [{'b': 2, 'a': 1}], 'at': datetime(2024, 1, 1, 12, 0), 'price': Decimal('1.50'), 'big': 2 ** 70
+}
+
+
+def test_orjson_matches_stdlib_bytes():
+    pytest.importorskip('orjson')
+    encoded = select_dumps('orjson')(PAYLOAD)
+    assert encoded == stdlib_dumps(PAYLOAD)
+    assert '路飞'.encode('utf-8') in encoded and b'"at":"Mon, 01 Jan 2024 12:00:00 GMT"' in encoded
+
+
+FLOATS = [0.25, 1 / 3, -0.0, 1e15, 1e16, -2.5e22, 1.7976931348623157e308, 1e-4, 1.5e-5, 1e-7, 5e-324]
+
+
+@pytest.mark.parametrize('value', FLOATS)
+def test_floats_match_json_dumps(value):
+    pytest.importorskip('orjson')
+    dumps = select_dumps('orjson')
+    for obj in (value, [value], {'ratio': value, 'note': ':1e5,0.00001'}):
+        expected = json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        assert dumps(obj) == expected
+
+
+def test_envelope_matches_full_encoding():
+    fields = {'success': True, 'data': [PAYLOAD], 'next_cursor': None, 'message': '成功'}
+    assert json_codec.envelope(fields) == json_codec.dumps(fields) + b'\n'
+
+
+def test_envelope_empty_and_single_field():
+    assert json_codec.envelope({}) == b'{}\n'
+    assert json_codec.envelope({'a': 1}) == b'{"a":1}\n'
+
+
+@pytest.mark.parametrize('provider', ['stdlib', 'auto'])
+def test_success_body_is_sorted_utf8(provider):
+    app = create_app({'JSON_PROVIDER': provider, 'LOG_LEVEL': 'WARNING'})
+    with app.test_request_context():
+        response = success(data={'名称': '索隆', 'bounty': 1}, message='ok', next_cursor='c')
+        error_body = app.json.response({'message': '不存在'}).get_data()
+    assert response.mimetype == 'application/json'
+    assert response.get_data() == (
+        '{"data":{"bounty":1,"名称":"索隆"},"message":"ok","next_cursor":"c","success":true}\n'.encode('utf-8'))
+    assert json.loads(error_body) == {'message': '不存在'} and '不存在'.encode('utf-8') in error_body
+
+
+def test_unknown_provider_rejected():
+    with pytest.raises(RuntimeError):
+        select_dumps('ujson')
@@ -0,0 +1,72 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from onepiece.app import create_app
+from onepiece.models import CrewMember, PirateGroup, db
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "queries.db"}',
+                      'CACHE_BACKEND': 'none', 'LOG_LEVEL': 'WARNING'})
+    with app.app_context():
+        db.create_all()
+        for name, size in [('草帽海贼团', 2), ('红发海贼团', 30)]:
+            group = PirateGroup(name=name, captain=name[:2])
+            db.session.add(group)
+            db.session.flush()
+            for i in range(size):
+                db.session.add(CrewMember(name=f'{name}船员{i}', role='船员', bounty=i, pirate_group_id=group.id))
+        db.session.commit()
+        db.session.remove()
+    return app
+
+
+@contextmanager
+def count_statements(app):
+    """统计块内执行的 SQL 条数（条件 GET 的数据版本号查询不计入）"""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if 'data_versions' not in statement:
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+@pytest.mark.parametrize('small, large', [
+    ('/api/crew?pirate_group_id=1', '/api/crew?pirate_group_id=2&limit=30'),
+    ('/api/pirate-groups/1?include_members=true', '/api/pirate-groups/2?include_members=true'),
+    ('/api/pirate-groups/1/members', '/api/pirate-groups/2/members'),
+])
+def test_list_query_count_independent_of_rows(app, small, large):
+    """船员列表带出海贼团名称，不随行数增加查询"""
+    client = app.test_client()
+    counts = []
+    for path in (small, large):
+        with count_statements(app) as statements:
+            rv = client.get(path)
+        assert rv.status_code == 200
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1] <= 2
+    data = rv.get_json()['data']
+    members = data if isinstance(data, list) else data['members']
+    assert len(members) == 30 and members[0]['pirate_group_name'] == '红发海贼团'
+
+
+def test_crew_detail_single_query(app):
+    client = app.test_client()
+    with count_statements(app) as statements:
+        rv = client.get('/api/crew/3')
+    assert rv.get_json()['data']['pirate_group_name'] == '红发海贼团'
+    # 船员 + 所属海贼团名称
+    assert len(statements) == 2
@@ -0,0 +1,48 @@
+import json
+import logging
+import queue
+import sys
+
+from onepiece.utils.log_config import JsonFormatter, _DeferredQueueHandler
+
+
+def test_json_formatter_includes_extra_fields():
+    record = logging.makeLogRecord({
+        'name': 'onepiece.test', 'levelname': 'WARNING', 'msg': '慢查询 %sms',
+        'args': (12,), 'endpoint': 'crew.get_all'
+    })
+    data = json.loads(JsonFormatter().format(record))
+    assert data['message'] == '慢查询 12ms'
+    assert data['level'] == 'WARNING'
+    assert data['endpoint'] == 'crew.get_all'
+
+
+def test_deferred_handler_freezes_message_on_enqueue():
+    handler = _DeferredQueueHandler(queue.SimpleQueue())
+    handler.setFormatter(logging.Formatter('never %(message)s'))
+    logger = logging.getLogger('onepiece.test.deferred')
+    logger.addHandler(handler)
+    logger.propagate = False
+    items = ['路飞']
+    try:
+        logger.warning('crew=%s', items)
+    finally:
+        logger.removeHandler(handler)
+    # 入队之后参数被修改，不影响已记录的消息
+    items.append('索隆')
+
+    record = handler.queue.get_nowait()
+    assert record.msg == "crew=['路飞']" and record.args is None
+    assert record.getMessage() == "crew=['路飞']"
+
+
+def test_deferred_handler_renders_exception_text():
+    handler = _DeferredQueueHandler(queue.SimpleQueue())
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        record = logging.LogRecord('x', logging.ERROR, __file__, 1, 'failed', (), sys.exc_info())
+    prepared = handler.prepare(record)
+    assert prepared.exc_info is None
+    assert 'ValueError: boom' in prepared.exc_text
+    assert 'ValueError: boom' in json.loads(JsonFormatter().format(prepared))['exception']
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from onepiece.app import create_app
+from onepiece.utils.metrics import Counter, Gauge, Histogram, Registry, metrics
+
+
+def test_histogram_cumulative_buckets():
+    hist = Histogram('wait', 'doc', buckets=(0.01, 0.1))
+    for seconds in (0.001, 0.05, 0.05, 3):
+        hist.observe(seconds)
+    snapshot = hist.snapshot()
+    assert snapshot['buckets'] == [[0.01, 1], [0.1, 3], ['+Inf', 4]]
+    assert snapshot['count'] == 4
+    assert abs(snapshot['sum'] - 3.101) < 1e-9
+
+
+def test_counter_and_gauge():
+    counter = Counter('c', 'doc', ('status',))
+    counter.inc(labels=('200',))
+    counter.inc(2, labels=('200',))
+    assert counter.value(('200',)) == 3
+    assert counter.value(('500',)) == 0
+
+    gauge = Gauge('g', 'doc')
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    assert gauge.value() == 1
+
+
+def test_render_text_format():
+    registry = Registry()
+    registry.counter('req_total', '请求数', ('endpoint',)).inc(labels=('crew."get"',))
+    registry.gauge('pool', '回调', function=lambda: [((), 7)])
+    registry.histogram('lat', '耗时', buckets=(0.1,)).observe(0.05)
+
+    text = registry.render()
+    assert '# TYPE req_total counter\nreq_total{endpoint="crew.\\"get\\""} 1\n' in text
+    assert 'pool 7\n' in text
+    assert 'lat_bucket{le="0.1"} 1\n' in text
+    assert 'lat_bucket{le="+Inf"} 1\n' in text
+    assert 'lat_count 1\n' in text
+
+
+def test_register_duplicate_name():
+    registry = Registry()
+    registry.counter('x', 'doc')
+    try:
+        registry.counter('x', 'doc')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('重复注册应报错')
+
+
+def test_failed_statement_leaves_no_timing_state():
+    """出错的语句不触发 after 事件，计时不应残留在连接上"""
+    create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'LOG_LEVEL': 'WARNING'})
+    engine = create_engine('sqlite://')
+    before = metrics.queries.value(), metrics.query_time.snapshot()['count']
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text('SELECT * FROM missing'))
+        conn.execute(text('SELECT 1'))
+        assert not conn.info.get('_metrics_query_start')
+        assert not conn.info.get('_query_monitor_start')
+    assert metrics.queries.value() == before[0] + 1
+    assert metrics.query_time.snapshot()['count'] == before[1] + 1
@@ -0,0 +1,77 @@
+import pytest
+
+from onepiece.app import create_app
+from onepiece.migrations import MIGRATIONS, applied_versions, load_migrations, migrate
+from onepiece.models import db
+
+
+@pytest.fixture
+def app():
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'LOG_LEVEL': 'WARNING'})
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+def _columns(table):
+    return {c['name'] for c in db.inspect(db.engine).get_columns(table)}
+
+
+def _indexes(table):
+    return {i['name'] for i in db.inspect(db.engine).get_indexes(table)}
+
+
+def test_versions_are_ordered():
+    assert [m.VERSION for m in load_migrations()] == list(range(1, len(MIGRATIONS) + 1))
+
+
+def test_migrate_upgrades_existing_tables(app):
+    db.create_all()
+    # 模拟迁移之前建好的旧表：没有数值悬赏金列和复合索引
+    with db.engine.begin() as conn:
+        for name in _indexes('crew_members'):
+            conn.execute(db.text(f'DROP INDEX {name}'))
+        conn.execute(db.text('ALTER TABLE crew_members DROP COLUMN bounty_value'))
+
+    done = migrate()
+    assert [d['version'] for d in done] == [m.VERSION for m in load_migrations()]
+    assert 'bounty_value' in _columns('crew_members')
+    assert {'ix_crew_members_pirate_group_id_id', 'ix_crew_members_created_at_id',
+            'ix_crew_members_bounty_value'} <= _indexes('crew_members')
+    assert set(applied_versions()) == {m.VERSION for m in load_migrations()}
+    # 已执行的迁移不会重复执行
+    assert migrate() == []
+
+
+def test_migrate_on_fresh_database(app):
+    db.create_all()
+    assert len(migrate()) == len(MIGRATIONS)
+
+
+def test_plaintext_passwords_are_hashed(app):
+    from onepiece.models import User
+    from onepiece.utils.password import check_password
+
+    db.create_all()
+    db.session.add(User(username='legacy', password='secret'))
+    db.session.commit()
+    migrate()
+    stored = db.session.query(User.password).filter_by(username='legacy').scalar()
+    assert stored.startswith('scrypt$') and check_password('secret', stored)
+
+
+def test_bounty_values_are_backfilled(app):
+    from onepiece.models import CrewMember, PirateGroup
+
+    db.create_all()
+    # 加列之后、回填之前写入的历史数据：数值列为空
+    with db.engine.begin() as conn:
+        conn.execute(db.text("INSERT INTO pirate_groups (name, captain, total_bounty) "
+                             "VALUES ('草帽海贼团', '路飞', '88.16亿贝里')"))
+        conn.execute(db.text("INSERT INTO crew_members (name, role, bounty) VALUES ('路飞', '船长', '30亿贝里'), "
+                             "('乔巴', '船医', '1000贝里'), ('维薇', '公主', '未知')"))
+
+    migrate()
+    values = dict(db.session.query(CrewMember.name, CrewMember.bounty_value))
+    assert values == {'路飞': 3000000000, '乔巴': 1000, '维薇': None}
+    assert db.session.query(PirateGroup.total_bounty_value).scalar() == 8816000000
@@ -0,0 +1,105 @@
+from datetime import datetime
+
+import pytest
+
+from onepiece.app import create_app
+from onepiece.models import CrewMember, PirateGroup, db
+from onepiece.utils.pagination import (
+    CursorError, clamp_limit, decode_cursor, encode_cursor, parse_sort
+)
+
+
+def test_cursor_roundtrip():
+    """游标编码后可以原样解码"""
+    payload = {'k': 'name', 'd': True, 'v': '娜美', 'id': 3}
+    cursor = encode_cursor(payload)
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == payload
+
+
+def test_invalid_cursor():
+    """非法游标抛出 CursorError"""
+    with pytest.raises(CursorError):
+        decode_cursor('not-a-cursor!')
+
+
+def test_parse_sort_and_limit():
+    """排序参数与分页大小解析"""
+    allowed = {'id': None, 'name': None}
+    assert parse_sort('-name', allowed) == ('name', True)
+    assert parse_sort(None, allowed) == ('id', False)
+    with pytest.raises(CursorError):
+        parse_sort('password', allowed)
+    assert clamp_limit(None) == 50
+    assert clamp_limit(100000) == 500
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "pages.db"}',
+                      'CACHE_BACKEND': 'none', 'LOG_LEVEL': 'WARNING'})
+    with app.app_context():
+        db.create_all()
+        # 重复的悬赏金 / 创建时间与 NULL 悬赏金，检验平局与 NULL 的翻页条件
+        same_time = datetime(2024, 1, 1)
+        for i in range(60):
+            db.session.add(PirateGroup(name=f'海贼团{i % 7}-{i}', captain='船长', created_at=same_time))
+        for i in range(70):
+            bounty = None if i % 5 == 0 else (i % 4) * 1000
+            db.session.add(CrewMember(name=f'船员{i % 9}', role='船员', bounty='未知' if bounty is None else str(bounty),
+                                      bounty_value=bounty, created_at=same_time if i % 2 else None))
+        db.session.commit()
+        db.session.remove()
+    return app.test_client()
+
+
+def walk(client, path, sort, limit):
+    ids, after = [], None
+    while True:
+        query = f'{path}?sort={sort}&limit={limit}' + (f'&after={after}' if after else '')
+        body = client.get(query).get_json()
+        assert body['success'], body
+        ids += [row['id'] for row in body['data']]
+        after = body['next_cursor']
+        if not after:
+            return ids
+
+
+@pytest.mark.parametrize('path, sort', [
+    ('/api/crew', 'id'), ('/api/crew', '-id'), ('/api/crew', 'name'), ('/api/crew', '-name'),
+    ('/api/crew', 'bounty'), ('/api/crew', '-bounty'), ('/api/crew', 'created_at'), ('/api/crew', '-created_at'),
+    ('/api/pirate-groups', 'name'), ('/api/pirate-groups', '-name'), ('/api/pirate-groups', '-created_at'),
+])
+def test_walk_every_page(client, path, sort):
+    """逐页翻完与一次取完的结果相同：不重复、不遗漏，顺序一致"""
+    everything = walk(client, path, sort, 500)
+    assert len(everything) == (70 if path == '/api/crew' else 60)
+    assert walk(client, path, sort, 7) == everything
+
+
+def test_null_bounty_order(client):
+    # 升序时 NULL 在最前，降序时在最后（同值按 id 排）
+    rows = client.get('/api/crew?sort=bounty&limit=500').get_json()['data']
+    nulls = [r['id'] for r in rows if r['bounty'] == '未知']
+    assert len(nulls) == 14 and [r['id'] for r in rows[:14]] == nulls == sorted(nulls)
+    desc = client.get('/api/crew?sort=-bounty&limit=500').get_json()['data']
+    assert [r['id'] for r in desc[-14:]] == sorted(nulls, reverse=True)
+
+
+def test_default_page_and_limit(client):
+    body = client.get('/api/pirate-groups').get_json()
+    assert len(body['data']) == 50 and body['next_cursor']
+
+
+@pytest.mark.parametrize('payload', [
+    {'k': 'created_at', 'd': False, 'v': 123, 'id': 1},
+    {'k': 'created_at', 'd': False, 'v': ['2024-01-01'], 'id': 1},
+    {'k': 'created_at', 'd': False, 'v': 'not a date', 'id': 1},
+    {'k': 'name', 'd': False, 'v': {'x': 1}, 'id': 1},
+    {'k': 'name', 'd': False, 'v': 'a', 'id': 'x'},
+])
+def test_tampered_cursor_is_rejected(client, caplog, payload):
+    with caplog.at_level('ERROR'):
+        rv = client.get(f'/api/crew?sort={payload["k"]}&after={encode_cursor(payload)}')
+    assert rv.status_code == 400 and rv.get_json()['message'] == '无效的分页游标'
+    assert not [r for r in caplog.records if r.levelname == 'ERROR']
@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+from onepiece.utils.metrics import Registry
+from onepiece.utils.password import (
+    PasswordHasher, PasswordHasherBusy, check_password, hash_password, parse_params
+)
+
+# 测试用低代价参数
+FAST = ('scrypt', 1024, 8, 1)
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(Registry())
+    hasher._params = FAST
+    hasher.workers, hasher.max_pending = 1, 1
+    return hasher
+
+
+def test_hash_round_trip():
+    encoded = hash_password('路飞123', FAST)
+    assert encoded.startswith('scrypt$1024$8$1$')
+    assert check_password('路飞123', encoded)
+    assert not check_password('路飞124', encoded)
+    assert hash_password('路飞123', FAST) != encoded
+
+
+def test_pbkdf2_and_plaintext_are_verified():
+    assert check_password('pw', hash_password('pw', parse_params('pbkdf2_sha256:1000')))
+    assert check_password('admin123', 'admin123')
+
+
+def test_needs_rehash_only_upgrades(hasher):
+    assert hasher.needs_rehash('admin123')
+    assert hasher.needs_rehash(hash_password('pw', ('scrypt', 512, 8, 1)))
+    assert hasher.needs_rehash(hash_password('pw', ('pbkdf2_sha256', 1000)))
+    assert not hasher.needs_rehash(hash_password('pw', FAST))
+    # 其他机器调出的更高代价不降级
+    assert not hasher.needs_rehash(hash_password('pw', ('scrypt', 2048, 8, 1)))
+
+
+def test_verify_unknown_user_runs_dummy_hash(hasher):
+    assert not hasher.verify('pw', None)
+    assert hasher.verify('pw', hash_password('pw', FAST))
+
+
+def test_warm_up_prepares_params_and_dummy_hash(hasher):
+    assert hasher._dummy is None
+    assert hasher.warm_up() == FAST
+    assert hasher._dummy.startswith('scrypt$1024$8$1$')
+
+
+def test_bounded_pending_rejects(hasher):
+    release = threading.Event()
+    future = hasher.submit(release.wait)
+    with pytest.raises(PasswordHasherBusy):
+        hasher.verify('pw', hash_password('pw', FAST))
+    release.set()
+    future.result()
+    assert hasher.verify('pw', hash_password('pw', FAST))
+
+
+def test_inline_verify_skips_executor(hasher):
+    """同步 worker：直接在调用线程中计算，不受 max_pending 限制"""
+    hasher.inline = True
+    hasher._ensure_executor()[1].acquire()
+    assert hasher.verify('pw', hash_password('pw', FAST))
+    assert hasher.rejected.value() == 0
@@ -0,0 +1,17 @@
+from onepiece.utils.query_monitor import fingerprint
+
+
+def test_fingerprint_normalizes_params_and_literals():
+    mysql = "SELECT * FROM crew_members WHERE id = %(id_1)s AND name = 'It''s' LIMIT 10"
+    sqlite = 'SELECT * FROM crew_members WHERE id = ? AND name = ? LIMIT ?'
+    assert fingerprint(mysql) == fingerprint(sqlite) == sqlite
+
+
+def test_fingerprint_collapses_in_lists_and_whitespace():
+    short = 'SELECT id FROM t WHERE id IN (%(id_1_1)s, %(id_1_2)s)'
+    long = 'SELECT id\n  FROM t WHERE id IN (%(id_1_1)s, %(id_1_2)s, %(id_1_3)s, %(id_1_4)s)'
+    assert fingerprint(short) == fingerprint(long) == 'SELECT id FROM t WHERE id IN (?+)'
+
+
+def test_fingerprint_keeps_identifiers_with_digits():
+    assert fingerprint('SELECT t1.col2 FROM t1') == 'SELECT t1.col2 FROM t1'
@@ -0,0 +1,126 @@
+import subprocess
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+from onepiece.app import create_app
+from onepiece.models import CrewMember, db
+from onepiece.utils.data_version import current, ensure_rows
+from onepiece.utils.search_index import InvertedIndex, crew_index, tokenize
+
+
+def test_tokenize_cjk_bigrams():
+    """CJK 文本切分为单字与 bigram，拉丁字母按前缀与 trigram 切分"""
+    assert tokenize('橡胶果实') == ['橡', '胶', '果', '实', '橡胶', '胶果', '果实']
+    assert tokenize('橡胶果实', for_query=True) == ['橡胶', '胶果', '果实']
+    assert tokenize('ONE PIECE·娜美') == [
+        'o', 'on', 'one', 'p', 'pi', 'pie', 'iec', 'ece', '娜', '美', '娜美'
+    ]
+    assert tokenize('D Luffy', for_query=True) == ['d', 'luf', 'uff', 'ffy']
+
+
+def test_latin_substring_and_prefix():
+    """与原来的 ILIKE 一样，单词中的片段也能查到"""
+    index = InvertedIndex({'name': 1.0})
+    index.build([(1, SimpleNamespace(name='Monkey D Luffy')), (2, SimpleNamespace(name='Roronoa Zoro'))])
+    assert index.search('luf') == ([1], 1)
+    assert index.search('ffy') == ([1], 1)
+    assert index.search('LUFFY') == ([1], 1)
+    assert index.search('zo') == ([2], 1)
+    assert index.search('ro') == ([2], 1)
+    assert index.search('luffy zoro') == ([], 0)
+
+
+def test_build_does_not_block_searches():
+    """新索引在锁外构建：构建期间搜索返回旧索引的结果"""
+    index = InvertedIndex({'name': 1.0})
+    index.build([(1, SimpleNamespace(name='路飞'))], version=1)
+    reading, release = threading.Event(), threading.Event()
+
+    def docs():
+        yield 1, SimpleNamespace(name='路飞')
+        reading.set()
+        release.wait(5)
+        yield 2, SimpleNamespace(name='路飞二号')
+
+    builder = threading.Thread(target=index.build, args=(docs(), 2))
+    builder.start()
+    assert reading.wait(5)
+    assert index.search('路飞') == ([1], 1) and index.version == 1
+    release.set()
+    builder.join(5)
+    assert index.search('路飞')[1] == 2 and index.version == 2
+
+
+def test_search_ranking_and_updates():
+    """按字段权重排序，增删改后索引同步"""
+    index = InvertedIndex({'name': 3.0, 'devil_fruit': 1.0})
+    index.build([
+        (1, SimpleNamespace(name='蒙奇·D·路飞', devil_fruit='橡胶果实')),
+        (2, SimpleNamespace(name='果实收藏家', devil_fruit='无')),
+        (3, SimpleNamespace(name='妮可·罗宾', devil_fruit='花花果实')),
+    ])
+    assert index.search('果实') == ([2, 1, 3], 3)
+    assert index.search('果实', offset=1, limit=1) == ([1], 3)
+
+    index.remove(2)
+    index.add(3, SimpleNamespace(name='妮可·罗宾', devil_fruit='无'))
+    assert index.search('果实') == ([1], 1)
+    assert index.search('罗') == ([3], 1)
+
+
+def test_version_tracks_local_writes():
+    """本进程的写入版本号连续时索引保持最新，出现跳号（其他进程写入过）时判定为过期"""
+    index = InvertedIndex({'name': 1.0})
+    index.build([(1, SimpleNamespace(name='路飞'))], version=3)
+    assert index.is_current(3) and not index.is_current(4)
+
+    index.add(2, SimpleNamespace(name='索隆'), version=4)
+    index.add(3, SimpleNamespace(name='娜美'), version=4)
+    assert index.is_current(4)
+
+    index.remove(2, version=6)
+    assert not index.is_current(6)
+    # 版本号未知（未执行迁移）时只要求已构建
+    assert index.is_current(None)
+
+
+WRITER = '''
+import sys
+from onepiece.app import create_app
+app = create_app({'SQLALCHEMY_DATABASE_URI': sys.argv[1], 'CACHE_BACKEND': 'none', 'LOG_LEVEL': 'WARNING'})
+rv = app.test_client().post('/api/crew', json={'name': '乌索普', 'role': '狙击手'})
+assert rv.status_code == 201, rv.get_json()
+'''
+
+
+def test_search_sees_writes_from_other_process(tmp_path):
+    """其他进程（worker、flask import-data）写入后，本进程搜索前按版本号重建索引"""
+    uri = f'sqlite:///{tmp_path / "search.db"}'
+    app = create_app({'SQLALCHEMY_DATABASE_URI': uri, 'CACHE_BACKEND': 'none', 'LOG_LEVEL': 'WARNING'})
+    with app.app_context():
+        db.create_all()
+        ensure_rows()
+        db.session.add(CrewMember(name='路飞', role='船长', bounty='30亿'))
+        db.session.commit()
+        db.session.remove()
+
+    client = app.test_client()
+    assert client.get('/api/crew/search?q=狙击').get_json()['message'] == '搜索到 0 名船员'
+
+    subprocess.run([sys.executable, '-c', WRITER, uri], check=True)
+    # 发现版本号变化后在后台重建，重建完成前使用旧索引
+    client.get('/api/crew/search?q=狙击')
+    deadline = time.monotonic() + 5
+    with app.app_context():
+        while not crew_index.is_current(current()['crew']) and time.monotonic() < deadline:
+            time.sleep(0.01)
+    rv = client.get('/api/crew/search?q=狙击')
+    assert rv.get_json()['message'] == '搜索到 1 名船员'
+    assert rv.get_json()['data'][0]['name'] == '乌索普'
+
+    # 本进程的写入增量更新索引，不触发重建
+    assert client.post('/api/crew', json={'name': '山治', 'role': '厨师'}).status_code == 201
+    with app.app_context():
+        assert crew_index.is_current(current()['crew'])
@@ -0,0 +1,27 @@
+from onepiece.services.seed_service import SyntheticData
+from onepiece.utils.bounty import parse_bounty
+
+
+def test_same_seed_same_data():
+    a, b = SyntheticData(7), SyntheticData(7)
+    assert [a.crew() for _ in range(50)] == [b.crew() for _ in range(50)]
+    assert SyntheticData(8).crew() != SyntheticData(7).crew()
+
+
+def test_bounty_text_matches_value():
+    data = SyntheticData(1)
+    for _ in range(2000):
+        text, value = data.bounty()
+        assert parse_bounty(text) == value
+
+
+def test_group_names_unique_and_totals():
+    data = SyntheticData(3)
+    taken = {'赤鲨海贼团'}
+    for index in range(500):
+        members = [data.crew(is_captain=i == 0) for i in range(3)]
+        group = data.group(index, taken, members)
+        assert group['captain'] == members[0]['name']
+        assert group['member_count'] == 3
+        assert group['total_bounty_value'] == (sum(m['bounty_value'] or 0 for m in members) or None)
+    assert len(taken) == 501